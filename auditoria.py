@@ -0,0 +1,168 @@
+# Historial de acciones persistente (tabla 'auditoria')
+
+import atexit
+import datetime
+import json
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from colorama import Fore, Style
+import base_de_datos
+
+INTERVALO_VOLCADO = 2.0 # Segundos entre escrituras en segundo plano
+TAMANO_LOTE_VOLCADO = 100 # Con esta cantidad de acciones pendientes se escribe sin esperar al intervalo
+MAXIMO_PENDIENTES = 10000 # Si la base no está disponible, se conservan a lo sumo estas acciones para reintentar
+TAMANO_HISTORIAL_EN_MEMORIA = 200 # Últimas acciones de la sesión que se muestran sin consultar la base
+
+SQL_INSERTAR_ACCION = "INSERT INTO auditoria (Fecha, Accion, Cliente_ID, Datos, Sesion) VALUES (?, ?, ?, ?, ?)"
+
+
+class RegistroAuditoria:
+    """
+    Registra acciones en memoria y las escribe en la tabla 'auditoria' por lotes, desde un hilo en segundo plano,
+    cada INTERVALO_VOLCADO segundos (o antes si se acumulan TAMANO_LOTE_VOLCADO) y al salir del programa.
+    Las últimas acciones de la sesión quedan en un buffer circular acotado para mostrarlas al instante.
+    """
+
+    def __init__(self, intervalo=INTERVALO_VOLCADO, tamano_lote=TAMANO_LOTE_VOLCADO, tamano_memoria=TAMANO_HISTORIAL_EN_MEMORIA):
+        self.intervalo = intervalo
+        self.tamano_lote = tamano_lote
+        self.sesion = uuid.uuid4().hex[:12]
+        self._recientes = deque(maxlen=tamano_memoria)
+        self._pendientes = []
+        self._lock = threading.Lock()
+        self._lock_volcado = threading.Lock() # Un solo volcado a la vez (hilo de fondo, consultas y cierre)
+        self._hay_lote = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def _iniciar_hilo(self):
+        """Arranca el hilo de volcado la primera vez que se registra una acción (debe llamarse con el lock tomado)."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle_volcado, name="auditoria", daemon=True)
+            self._hilo.start()
+
+    def _bucle_volcado(self):
+        while not self._detener.is_set():
+            self._hay_lote.wait(self.intervalo)
+            self._hay_lote.clear()
+            self.volcar()
+
+    def registrar(self, accion, datos=None, cliente_id=None):
+        """Agrega una acción al historial. No escribe en disco: retorna enseguida."""
+        registro = {"accion": accion, "timestamp": datetime.datetime.now().isoformat()}
+        if datos:
+            registro["datos"] = datos
+        if cliente_id is None and isinstance(datos, dict) and isinstance(datos.get("ID"), int):
+            cliente_id = datos["ID"]
+        registro["cliente_id"] = cliente_id
+        with self._lock:
+            self._recientes.append(registro)
+            self._pendientes.append(registro)
+            pendientes = len(self._pendientes)
+            self._iniciar_hilo()
+        if pendientes >= self.tamano_lote:
+            self._hay_lote.set()
+
+    def volcar(self):
+        """Escribe las acciones pendientes en una sola transacción. Retorna la cantidad escrita."""
+        with self._lock_volcado:
+            with self._lock:
+                lote, self._pendientes = self._pendientes, []
+            if not lote:
+                return 0
+            filas = [
+                (r["timestamp"], r["accion"], r["cliente_id"],
+                 json.dumps(r["datos"], ensure_ascii=False, default=str) if "datos" in r else None, self.sesion)
+                for r in lote
+            ]
+            try:
+                with base_de_datos.transaccion() as conn:
+                    conn.executemany(SQL_INSERTAR_ACCION, filas)
+                return len(filas)
+            except sqlite3.Error as e:
+                with self._lock: # Se reintentan en el próximo volcado, sin crecer sin límite
+                    self._pendientes = (lote + self._pendientes)[-MAXIMO_PENDIENTES:]
+                print(Fore.RED + f"❌ Error al guardar el historial de acciones: {e}" + Style.RESET_ALL)
+                return 0
+
+    def cerrar(self):
+        """Detiene el hilo de fondo y escribe lo pendiente (se llama automáticamente al salir)."""
+        self._detener.set()
+        self._hay_lote.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=5)
+        self.volcar()
+
+    def recientes(self):
+        """Últimas acciones de esta sesión, de la más antigua a la más nueva."""
+        with self._lock:
+            return list(self._recientes)
+
+
+# Historial compartido por toda la aplicación
+historial = RegistroAuditoria()
+atexit.register(historial.cerrar) # Se ejecuta antes que el cierre del pool (atexit corre en orden inverso)
+
+def registrar_accion(accion, datos=None, cliente_id=None):
+    historial.registrar(accion, datos, cliente_id)
+
+def acciones_recientes():
+    return historial.recientes()
+
+def _fila_a_registro(fila):
+    registro = {"id": fila["ID"], "accion": fila["Accion"], "timestamp": fila["Fecha"],
+                "cliente_id": fila["Cliente_ID"], "sesion": fila["Sesion"]}
+    if fila["Datos"] is not None:
+        registro["datos"] = json.loads(fila["Datos"])
+    return registro
+
+def consultar_historial(desde=None, hasta=None, accion=None, cliente_id=None, antes_de=None, limite=100):
+    """
+    Consulta el historial guardado, del más nuevo al más viejo. Primero se escribe lo pendiente.
+    - desde / hasta: fechas u horas ISO ('2025-06-01' o '2025-06-01T10:00:00'); 'hasta' incluye todo ese día si es solo fecha.
+    - accion: texto exacto de la acción (ej. 'Agregar cliente'). cliente_id: acciones sobre ese cliente.
+    - antes_de: paginación, (timestamp, id) del último registro ya mostrado.
+    Retorna una lista de diccionarios con id, accion, timestamp, cliente_id, sesion y datos.
+    """
+    historial.volcar()
+    condiciones, parametros = [], []
+    if desde:
+        condiciones.append("Fecha >= ?")
+        parametros.append(desde)
+    if hasta:
+        condiciones.append("Fecha < ?" if len(hasta) > 10 else "Fecha < ? || 'U'") # 'U' > 'T': incluye el día completo
+        parametros.append(hasta)
+    if accion:
+        condiciones.append("Accion = ?")
+        parametros.append(accion)
+    if cliente_id is not None:
+        condiciones.append("Cliente_ID = ?")
+        parametros.append(cliente_id)
+    if antes_de is not None:
+        condiciones.append("(Fecha, ID) < (?, ?)")
+        parametros.extend(antes_de)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    try:
+        with base_de_datos.conexion() as conn:
+            filas = conn.execute(
+                f"SELECT ID, Fecha, Accion, Cliente_ID, Datos, Sesion FROM auditoria {where} ORDER BY Fecha DESC, ID DESC LIMIT ?",
+                [*parametros, limite]
+            ).fetchall()
+        return [_fila_a_registro(fila) for fila in filas]
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al consultar el historial de acciones: {e}" + Style.RESET_ALL)
+        return []
+
+def acciones_registradas():
+    """Tipos de acción presentes en el historial con su cantidad (para elegir un filtro)."""
+    historial.volcar()
+    try:
+        with base_de_datos.conexion() as conn:
+            return [(fila[0], fila[1]) for fila in conn.execute(
+                "SELECT Accion, COUNT(*) FROM auditoria GROUP BY Accion ORDER BY COUNT(*) DESC"
+            )]
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al consultar el historial de acciones: {e}" + Style.RESET_ALL)
+        return []
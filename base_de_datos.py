@@ -2,75 +2,200 @@
 
 import sqlite3
 import os
+import atexit
+import functools
+import gzip
+import io
+import json
+import re
+import shutil
+import threading
+from contextlib import contextmanager, nullcontext
 from colorama import Fore, Style
 import datetime
+from pool_conexiones import ColaEscritura, PoolConexiones
+import metricas
+from cache_clientes import CacheClientes
+from modelo_cliente import COLUMNAS_CLIENTE, fabrica_cliente
 
 # Ruta de la base de datos SQLite
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_FILE_PATH = os.path.join(BASE_DIR, 'clientes.db')
 
-def get_db_connection():
-    """Establece una conexión a la base de datos y configura row_factory para obtener resultados como diccionarios."""
-    conn = sqlite3.connect(DB_FILE_PATH)
-    conn.row_factory = sqlite3.Row # Permite acceder a las columnas por nombre
-    return conn
+# Pool compartido de conexiones (se reutilizan entre llamadas en lugar de abrir una por operación).
+# Las conexiones son instrumentadas: cada sentencia se mide en metricas.registro.
+pool = PoolConexiones(
+    DB_FILE_PATH, factory=metricas.ConexionInstrumentada, al_medir=metricas.medir_evento, al_contar=metricas.contar_evento
+)
 
-def inicializar_db():
+# Caché de lecturas por ID / Email. Se invalida en cada inserción, actualización o eliminación.
+cache = CacheClientes()
+
+def configurar_cache(tamano=None, ttl=None):
+    """Cambia el tamaño máximo (0 la desactiva) y/o el TTL en segundos de la caché de clientes."""
+    if tamano is not None:
+        cache.tamano = tamano
+    if ttl is not None:
+        cache.ttl = ttl
+    cache.limpiar()
+
+def estadisticas_cache():
+    """Retorna aciertos, fallos, porcentaje de aciertos y clientes en la caché."""
+    return cache.estadisticas()
+
+def estadisticas_rendimiento():
+    """Métricas de la sesión: tiempos por función y por sentencia SQL, filas, commits, consultas lentas y caché."""
+    return {**metricas.registro.instantanea(), "cache": estadisticas_cache()}
+
+def configurar_base_de_datos(ruta=None, tamano_pool=None, pragmas=None, reintentos=None, espera_reintento=None):
+    """
+    Reemplaza el pool de conexiones, por ejemplo para apuntar a otro archivo, cambiar los PRAGMAs
+    (journal_mode, synchronous, cache_size, mmap_size, busy_timeout en ms) o los reintentos ante
+    "database is locked" (cantidad y espera base en segundos, ver pool_conexiones.REINTENTOS_POR_DEFECTO).
+    """
+    global pool, DB_FILE_PATH
+    nuevo_pool = PoolConexiones(
+        ruta or pool.ruta_db,
+        tamano=tamano_pool or pool.tamano,
+        pragmas={**pool.pragmas, **(pragmas or {})},
+        factory=pool.factory,
+        al_medir=pool.al_medir,
+        al_contar=pool.al_contar,
+        reintentos=pool.reintentos if reintentos is None else reintentos,
+        espera_reintento=pool.espera_reintento if espera_reintento is None else espera_reintento,
+        cached_statements=pool.cached_statements
+    )
+    cola_activa = cola_escritura is not None
+    if cola_activa:
+        configurar_cola_escritura(False)
+    pool.cerrar()
+    pool = nuevo_pool
+    cache.limpiar()
+    DB_FILE_PATH = pool.ruta_db
+    if cola_activa: # La cola escribe con el pool nuevo
+        configurar_cola_escritura(True)
+    return pool
+
+# Conexión que reemplaza al pool en las lecturas del hilo actual (ver lecturas_desde)
+_lecturas = threading.local()
+
+def conexion():
+    """Conexión del pool para lecturas: `with conexion() as conn: ...` (o la de lecturas_desde, si hay una)."""
+    conn = getattr(_lecturas, "conn", None)
+    return pool.conexion() if conn is None else nullcontext(conn)
+
+@contextmanager
+def lecturas_desde(conn):
     """
-    Crea la tabla 'clientes' con todas sus columnas si no existe,
-    y añade las columnas que se hayan agregado en actualizaciones posteriores.
+    Dentro del bloque, las lecturas de este hilo usan `conn` (por ejemplo, una réplica en memoria para reportes)
+    en lugar del pool. Las escrituras siguen yendo al pool. Con conn=None se vuelve a leer del pool.
     """
-    conn = None # Inicializa conn a None
+    anterior = getattr(_lecturas, "conn", None)
+    _lecturas.conn = conn
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS clientes (
-                ID INTEGER PRIMARY KEY AUTOINCREMENT,
-                Nombre TEXT NOT NULL,
-                Apellido TEXT NOT NULL,
-                Edad INTEGER,
-                Email TEXT UNIQUE NOT NULL,
-                Telefono TEXT NOT NULL,
-                Fuero TEXT NOT NULL,
-                Tipo_de_caso TEXT NOT NULL,
-                Fecha_registro TEXT
-            )
-        ''')
-        
-        # Lógica de ALTER TABLE para compatibilidad con bases de datos antiguas
-        # Esto asegura que las columnas se añadan si el usuario tiene una versión anterior de la DB.
-        try:
-            cursor.execute("ALTER TABLE clientes ADD COLUMN Fecha_registro TEXT")
-        except sqlite3.OperationalError: pass # Columna ya existe
+        yield conn
+    finally:
+        _lecturas.conn = anterior
 
-        try:
-            cursor.execute("ALTER TABLE clientes ADD COLUMN Edad INTEGER") 
-        except sqlite3.OperationalError: pass # Columna ya existe
-        
-        conn.commit()
-        print(Fore.GREEN + "✔️ Base de datos SQLite inicializada o actualizada correctamente." + Style.RESET_ALL)
+def _leyendo_del_pool():
+    """False si las lecturas del hilo van a otra conexión: sus filas pueden estar desactualizadas y no se guardan en la caché."""
+    return getattr(_lecturas, "conn", None) is None
+
+def transaccion():
+    """Transacción explícita: COMMIT al salir del bloque o ROLLBACK si ocurre un error."""
+    return pool.transaccion()
+
+# Escritor único opcional (ver configurar_cola_escritura). Con None cada hilo escribe en su propia transacción.
+cola_escritura = None
+MAX_LOTE_ESCRITURA = 64
+
+def configurar_cola_escritura(activa=True, max_lote=MAX_LOTE_ESCRITURA):
+    """
+    Activa o desactiva el escritor único con commits agrupados (pool_conexiones.ColaEscritura) para las altas,
+    modificaciones y bajas de a un cliente. Conviene cuando muchos hilos del mismo proceso escriben a la vez
+    (por ejemplo, la API HTTP): en lugar de competir por el bloqueo de escritura, las escrituras concurrentes
+    se confirman juntas. Retorna la cola activa o None.
+    """
+    global cola_escritura
+    if cola_escritura is not None:
+        cola_escritura.cerrar()
+        cola_escritura = None
+    if activa:
+        cola_escritura = ColaEscritura(
+            pool, max_lote=max_lote, al_medir=metricas.medir_evento, al_contar=metricas.contar_evento,
+            contexto_lote=cache.repetir_invalidaciones
+        )
+    return cola_escritura
+
+def _escritura(funcion):
+    """Decorador de las escrituras de un cliente: con la cola de escritura activa se ejecutan en el hilo escritor."""
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        cola = cola_escritura
+        if cola is None:
+            return funcion(*args, **kwargs)
+        return cola.ejecutar(funcion, *args, **kwargs)
+    return envoltura
+
+atexit.register(lambda: pool.cerrar())
+atexit.register(lambda: configurar_cola_escritura(False)) # atexit corre en orden inverso: se vacía la cola antes de cerrar el pool
+
+# Proyección común de las consultas de clientes. Las filas se devuelven como registros Cliente
+# (la fecha formateada se calcula en Python solo si se muestra).
+SELECT_CLIENTES = f'SELECT {", ".join("clientes." + columna for columna in COLUMNAS_CLIENTE)} FROM clientes'
+
+def _cursor_clientes(conn):
+    """Cursor cuyo row_factory construye un Cliente por fila (para consultas con SELECT_CLIENTES)."""
+    cursor = conn.cursor()
+    cursor.row_factory = fabrica_cliente
+    return cursor
+
+def inicializar_db():
+    """
+    Lleva el esquema a la última versión aplicando las migraciones pendientes (ver migraciones.py).
+    Si el esquema ya está al día solo se consulta PRAGMA user_version.
+    """
+    import migraciones # Import diferido: migraciones usa este módulo
+    try:
+        if migraciones.aplicar_migraciones():
+            print(Fore.GREEN + "✔️ Base de datos SQLite inicializada o actualizada correctamente." + Style.RESET_ALL)
     except sqlite3.Error as e:
         print(Fore.RED + f"❌ Error al inicializar la base de datos: {e}" + Style.RESET_ALL)
-    finally:
-        if conn:
-            conn.close()
+        return
+    _vaciar_claves_pendientes()
+
+def _vaciar_claves_pendientes():
+    """
+    Calcula las claves de duplicados que quedaron en cola (por ejemplo, las de los clientes que ya existían al
+    aplicar la migración 5), para que ninguna alta tenga que hacerlo. Si la cola está vacía solo es una lectura.
+    """
+    import duplicados # Import diferido: duplicados usa este módulo
+    procesados = duplicados.actualizar_claves_pendientes()
+    if procesados:
+        print(Fore.CYAN + f"🔧 Índice de duplicados actualizado para {procesados} clientes." + Style.RESET_ALL)
+
+def _actualizar_claves_duplicados(conn):
+    """Mantiene el índice de duplicados en la misma transacción de la escritura (ver duplicados.aplicar_claves_pendientes)."""
+    import duplicados # Import diferido: duplicados usa este módulo
+    duplicados.aplicar_claves_pendientes(conn)
 
 # Operaciones CRUD para Clientes
 
+SQL_INSERTAR_CLIENTE = '''
+    INSERT INTO clientes (Nombre, Apellido, Edad, Email, Telefono, Fuero, Tipo_de_caso, Fecha_registro)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+@_escritura
+@metricas.medir
 def insertar_cliente(nombre, apellido, edad, email, telefono, fuero, tipo_caso):
     """Inserta un nuevo cliente en la base de datos."""
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
         fecha_registro = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-        
-        cursor.execute('''
-            INSERT INTO clientes (Nombre, Apellido, Edad, Email, Telefono, Fuero, Tipo_de_caso, Fecha_registro)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (nombre, apellido, edad, email, telefono, fuero, tipo_caso, fecha_registro))
-        conn.commit()
+        with transaccion() as conn:
+            cursor = conn.execute(SQL_INSERTAR_CLIENTE, (nombre, apellido, edad, email, telefono, fuero, tipo_caso, fecha_registro))
+            _actualizar_claves_duplicados(conn)
+        cache.invalidar(cursor.lastrowid, email)
         return cursor.lastrowid # Retorna el ID del nuevo cliente
     except sqlite3.IntegrityError:
         print(Fore.RED + "❌ Error: Ya existe un cliente con este email." + Style.RESET_ALL)
@@ -78,73 +203,410 @@ def insertar_cliente(nombre, apellido, edad, email, telefono, fuero, tipo_caso):
     except sqlite3.Error as e: # Captura otros errores de SQLite
         print(Fore.RED + f"❌ Error de base de datos al insertar cliente: {e}" + Style.RESET_ALL)
         return None
-    finally:
-        if conn:
-            conn.close()
 
+def _fila_insercion(cliente, fecha_registro):
+    """Convierte un diccionario de cliente en la tupla de parámetros de SQL_INSERTAR_CLIENTE."""
+    return (
+        cliente.get('Nombre'), cliente.get('Apellido'), cliente.get('Edad'), cliente.get('Email'),
+        cliente.get('Telefono'), cliente.get('Fuero'), cliente.get('Tipo_de_caso'),
+        cliente.get('Fecha_registro') or fecha_registro
+    )
+
+# Alta o actualización por Email (upsert). Reglas para combinar cada columna cuando el Email ya existe:
+REGLAS_FUSION = {
+    "reemplazar": "excluded.{c}",                            # Siempre el valor nuevo
+    "no_vacio": "COALESCE(NULLIF(excluded.{c}, ''), clientes.{c})", # El valor nuevo, salvo que venga vacío
+    "completar": "COALESCE(NULLIF(clientes.{c}, ''), excluded.{c})", # Solo completa si el actual está vacío
+    "conservar": "clientes.{c}",                             # Nunca se modifica
+}
+REGLAS_FUSION_POR_DEFECTO = {
+    "Nombre": "no_vacio", "Apellido": "no_vacio", "Edad": "no_vacio", "Telefono": "no_vacio",
+    "Fuero": "no_vacio", "Tipo_de_caso": "no_vacio", "Fecha_registro": "conservar",
+}
+
+@functools.lru_cache(maxsize=32)
+def _sql_upsert(reglas):
+    """
+    Arma el INSERT ... ON CONFLICT(Email) DO UPDATE para las reglas dadas (tupla de pares columna, regla).
+    El WHERE final evita reescribir la fila (y disparar los triggers) cuando no cambia ningún valor.
+    """
+    expresiones = {columna: REGLAS_FUSION[regla].format(c=columna) for columna, regla in reglas}
+    asignaciones = ", ".join(f"{columna} = {expresion}" for columna, expresion in expresiones.items())
+    actuales = ", ".join(f"clientes.{columna}" for columna in expresiones)
+    return (
+        f"{SQL_INSERTAR_CLIENTE} ON CONFLICT(Email) DO UPDATE SET {asignaciones} "
+        f"WHERE ({actuales}) IS NOT ({', '.join(expresiones.values())})"
+    )
+
+def _reglas_fusion(reglas=None):
+    """Combina las reglas indicadas con las por defecto y las valida. Retorna una tupla ordenada (para la caché)."""
+    combinadas = {**REGLAS_FUSION_POR_DEFECTO, **(reglas or {})}
+    for columna, regla in combinadas.items():
+        if columna not in REGLAS_FUSION_POR_DEFECTO or regla not in REGLAS_FUSION:
+            raise ValueError(f"Regla de fusión inválida: {columna}={regla}")
+    return tuple(sorted(combinadas.items()))
+
+@_escritura
+@metricas.medir
+def insertar_o_actualizar_cliente(nombre, apellido, edad, email, telefono, fuero, tipo_caso, reglas=None):
+    """
+    Inserta el cliente o, si ya existe uno con el mismo Email, actualiza sus datos según las reglas de fusión
+    (por defecto REGLAS_FUSION_POR_DEFECTO: los valores nuevos no vacíos reemplazan a los actuales).
+    Retorna (ID, estado) con estado 'insertado', 'actualizado' o 'sin_cambios', o (None, None) si hubo un error.
+    """
+    try:
+        sql = _sql_upsert(_reglas_fusion(reglas))
+        fecha_registro = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        with transaccion() as conn:
+            existente = conn.execute('SELECT ID FROM clientes WHERE Email = ?', (email,)).fetchone()
+            cursor = conn.execute(sql, (nombre, apellido, edad, email, telefono, fuero, tipo_caso, fecha_registro))
+            _actualizar_claves_duplicados(conn)
+        if existente is None:
+            cliente_id, estado = cursor.lastrowid, "insertado"
+        else:
+            cliente_id, estado = existente[0], "actualizado" if cursor.rowcount else "sin_cambios"
+        cache.invalidar(cliente_id, email)
+        return cliente_id, estado
+    except (sqlite3.Error, ValueError) as e:
+        print(Fore.RED + f"❌ Error de base de datos al insertar o actualizar cliente: {e}" + Style.RESET_ALL)
+        return None, None
+
+def _insertar_bloque(bloque, fecha_registro, reglas=None):
+    """
+    Inserta un bloque de (indice, cliente) en una sola transacción.
+    Intenta primero con executemany; si alguna fila viola una restricción (por ejemplo, Email duplicado)
+    deshace el intento y reinserta fila por fila para rechazar solo las filas problemáticas.
+    Con `reglas` (tupla de _reglas_fusion) los Email existentes se actualizan en lugar de rechazarse.
+    Retorna (cantidad_insertada, cantidad_actualizada, lista_de_rechazos).
+    """
+    filas = [_fila_insercion(cliente, fecha_registro) for _, cliente in bloque]
+    sql = SQL_INSERTAR_CLIENTE if reglas is None else _sql_upsert(reglas)
+    rechazados = []
+    with transaccion() as conn:
+        existentes = set()
+        if reglas is not None: # Emails ya registrados: permite separar altas de actualizaciones
+            emails = list({fila[3] for fila in filas if fila[3] is not None})
+            for inicio in range(0, len(emails), 500):
+                parte = emails[inicio:inicio + 500]
+                existentes.update(fila[0] for fila in conn.execute(
+                    f'SELECT Email FROM clientes WHERE Email IN ({", ".join("?" * len(parte))})', parte
+                ))
+        try:
+            with transaccion(): # SAVEPOINT: si falla, se deshace solo el executemany
+                cursor = conn.executemany(sql, filas)
+            _actualizar_claves_duplicados(conn)
+            insertados = len({fila[3] for fila in filas} - existentes) if reglas is not None else len(filas)
+            return insertados, (cursor.rowcount - insertados if reglas is not None else 0), rechazados
+        except sqlite3.IntegrityError:
+            pass
+
+        insertados = actualizados = 0
+        for (indice, cliente), fila in zip(bloque, filas):
+            try:
+                cursor = conn.execute(sql, fila)
+            except sqlite3.IntegrityError as e:
+                rechazados.append((indice, cliente, str(e)))
+                continue
+            if fila[3] in existentes:
+                actualizados += cursor.rowcount
+            else:
+                insertados += 1
+                existentes.add(fila[3]) # Un Email repetido dentro del mismo archivo actualiza al primero
+        _actualizar_claves_duplicados(conn)
+    return insertados, actualizados, rechazados
+
+@metricas.medir
+def insertar_clientes_lote(clientes, tamano_lote=1000, actualizar_existentes=False, reglas=None):
+    """
+    Inserta muchos clientes (iterable de diccionarios con las columnas de la tabla) usando executemany,
+    con una transacción cada `tamano_lote` filas. Las filas rechazadas no interrumpen el lote.
+    Con actualizar_existentes=True los clientes cuyo Email ya existe se actualizan (upsert) según `reglas`
+    (ver REGLAS_FUSION_POR_DEFECTO) en lugar de rechazarse.
+    Retorna {"insertados": int, "actualizados": int, "rechazados": [(indice, cliente, motivo), ...]} donde indice empieza en 1.
+    """
+    resultado = {"insertados": 0, "actualizados": 0, "rechazados": []}
+    fecha_registro = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+    reglas = _reglas_fusion(reglas) if actualizar_existentes else None
+    bloque = []
+
+    def procesar(bloque):
+        try:
+            insertados, actualizados, rechazados = _insertar_bloque(bloque, fecha_registro, reglas)
+        except sqlite3.Error as e:
+            print(Fore.RED + f"❌ Error de base de datos al insertar un lote de clientes: {e}" + Style.RESET_ALL)
+            insertados, actualizados, rechazados = 0, 0, [(indice, cliente, str(e)) for indice, cliente in bloque]
+        resultado["insertados"] += insertados
+        resultado["actualizados"] += actualizados
+        resultado["rechazados"].extend(rechazados)
+        if actualizados:
+            cache.limpiar() # Se modificaron clientes existentes cuyo ID no se conoce aquí
+        else:
+            for _, cliente in bloque:
+                cache.invalidar(email=cliente.get('Email'))
+
+    for indice, cliente in enumerate(clientes, 1):
+        bloque.append((indice, cliente))
+        if len(bloque) >= tamano_lote:
+            procesar(bloque)
+            bloque = []
+    if bloque:
+        procesar(bloque)
+    return resultado
+
+# Listados paginados por keyset (WHERE ID > ? ORDER BY ID LIMIT ?)
+
+def _filtro_clientes(fuero=None, edad_min=None, edad_max=None, tipo_de_caso=None, fecha_desde=None, fecha_hasta=None):
+    """
+    Arma las condiciones WHERE y sus parámetros para los filtros de listado.
+    Las edades son inclusivas; las fechas (ISO 'YYYY-MM-DD...') filtran Fecha_registro en [fecha_desde, fecha_hasta).
+    """
+    condiciones, parametros = [], []
+    if fuero is not None:
+        condiciones.append("Fuero = ?")
+        parametros.append(fuero)
+    if tipo_de_caso is not None:
+        condiciones.append("Tipo_de_caso = ?")
+        parametros.append(tipo_de_caso)
+    if edad_min is not None:
+        condiciones.append("Edad >= ?")
+        parametros.append(edad_min)
+    if edad_max is not None:
+        condiciones.append("Edad <= ?")
+        parametros.append(edad_max)
+    if fecha_desde is not None:
+        condiciones.append("Fecha_registro >= ?")
+        parametros.append(fecha_desde)
+    if fecha_hasta is not None:
+        condiciones.append("Fecha_registro < ?")
+        parametros.append(fecha_hasta)
+    return condiciones, parametros
+
+_proyecciones = {}
+
+def _proyeccion(columnas=None):
+    """
+    'SELECT <columnas> FROM clientes' para las columnas pedidas (None = todas, como SELECT_CLIENTES).
+    El texto se arma una vez por combinación: siempre el mismo texto, siempre la misma sentencia preparada.
+    """
+    clave = None if columnas is None else tuple(columnas)
+    texto = _proyecciones.get(clave)
+    if texto is None:
+        desconocidas = [columna for columna in clave or () if columna not in COLUMNAS_CLIENTE]
+        if desconocidas:
+            raise ValueError(f"Columnas desconocidas: {', '.join(desconocidas)}")
+        texto = SELECT_CLIENTES if clave is None else f'SELECT {", ".join("clientes." + columna for columna in clave)} FROM clientes'
+        _proyecciones[clave] = texto
+    return texto
+
+class ClienteRepositorio:
+    """
+    Lecturas de clientes con una sola proyección y un solo manejo de conexión y errores.
+    Usa las conexiones del pool, que duran toda la sesión y guardan cada una hasta
+    pool_conexiones.CACHE_SENTENCIAS_POR_DEFECTO sentencias preparadas: las consultas frecuentes no se recompilan.
+    Con `columnas` (tupla) se leen solo esas columnas y las filas son sqlite3.Row en lugar de registros Cliente,
+    para listas y verificaciones que no necesitan la fila completa.
+    """
+
+    def _leer(self, descripcion, por_defecto, consulta, columnas=None):
+        """Ejecuta consulta(cursor) con una conexión de lectura; ante un error lo informa y retorna por_defecto."""
+        try:
+            with conexion() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = fabrica_cliente if columnas is None else sqlite3.Row
+                return consulta(cursor)
+        except sqlite3.Error as e:
+            print(Fore.RED + f"❌ Error de base de datos al {descripcion}: {e}" + Style.RESET_ALL)
+            return por_defecto
+
+    def obtener_por(self, columna, valor, columnas=None):
+        """Cliente con ID o Email igual a `valor`, o None. Las filas completas pasan por la caché."""
+        if columnas is None:
+            cliente = cache.obtener_por_id(valor) if columna == "ID" else cache.obtener_por_email(valor)
+            if cliente is not None:
+                return cliente
+        generacion = cache.generacion() # Antes del SELECT: si una escritura invalida mientras tanto, la fila no se guarda
+        fila = self._leer(
+            f"obtener cliente por {columna}", None,
+            lambda cursor: cursor.execute(f'{_proyeccion(columnas)} WHERE {columna} = ?', (valor,)).fetchone(), columnas
+        )
+        if fila is not None and columnas is None and _leyendo_del_pool():
+            cache.guardar(fila, generacion)
+        return fila
+
+    def existe(self, columna, valor):
+        """True si hay un cliente con ese ID o Email (solo consulta el índice, sin leer la fila)."""
+        return self._leer(
+            "verificar si existe el cliente", False,
+            lambda cursor: cursor.execute(f'SELECT 1 FROM clientes WHERE {columna} = ? LIMIT 1', (valor,)).fetchone() is not None, ()
+        )
+
+    def obtener_pagina(self, despues_de_id=0, tamano_pagina=20, columnas=None, **filtros):
+        """Hasta `tamano_pagina` clientes con ID mayor a `despues_de_id` que cumplen los filtros, ordenados por ID ([] ante un error)."""
+        condiciones, parametros = _filtro_clientes(**filtros)
+        condiciones.insert(0, "ID > ?")
+        sql = f'{_proyeccion(columnas)} WHERE {" AND ".join(condiciones)} ORDER BY ID ASC LIMIT ?'
+        return self._leer(
+            "obtener una página de clientes", [],
+            lambda cursor: cursor.execute(sql, [despues_de_id, *parametros, tamano_pagina]).fetchall(), columnas
+        )
+
+    def contar(self, **filtros):
+        """Cantidad de clientes que cumplen los filtros (0 ante un error)."""
+        condiciones, parametros = _filtro_clientes(**filtros)
+        where = f'WHERE {" AND ".join(condiciones)}' if condiciones else ''
+        return self._leer(
+            "contar clientes", 0, lambda cursor: cursor.execute(f'SELECT COUNT(*) FROM clientes {where}', parametros).fetchone()[0], ()
+        )
+
+    def id_previo_a_pagina(self, numero_pagina, tamano_pagina=20, **filtros):
+        """ID del último cliente de la página anterior a `numero_pagina` (para pedirla por keyset), o None si no existe."""
+        condiciones, parametros = _filtro_clientes(**filtros)
+        where = f'WHERE {" AND ".join(condiciones)}' if condiciones else ''
+        fila = self._leer(
+            f"buscar la página {numero_pagina}", None,
+            lambda cursor: cursor.execute(
+                f'SELECT ID FROM clientes {where} ORDER BY ID ASC LIMIT 1 OFFSET ?',
+                [*parametros, (numero_pagina - 1) * tamano_pagina - 1]
+            ).fetchone(), ()
+        )
+        return fila[0] if fila else None
+
+repositorio = ClienteRepositorio()
+
+@metricas.medir
+def obtener_pagina_clientes(despues_de_id=0, tamano_pagina=20, columnas=None, **filtros):
+    """
+    Obtiene una página de clientes con ID mayor a `despues_de_id`, ordenada por ID.
+    Para pedir la página siguiente se pasa el ID del último cliente de la página actual.
+    Los filtros disponibles son los de _filtro_clientes; `columnas` limita la proyección (ver ClienteRepositorio).
+    """
+    return repositorio.obtener_pagina(despues_de_id, tamano_pagina, columnas, **filtros)
+
+def iterar_clientes(tamano_pagina=500, desde_id=0, columnas=None, **filtros):
+    """
+    Generador que recorre los clientes (con ID mayor a `desde_id`) página por página,
+    sin cargar toda la tabla en memoria. La conexión solo se usa mientras se lee cada página.
+    Si se indican `columnas`, deben incluir ID (se usa para pedir la página siguiente).
+    """
+    if columnas is not None and "ID" not in columnas:
+        raise ValueError("Para recorrer los clientes por páginas las columnas deben incluir ID")
+    ultimo_id = desde_id
+    while True:
+        pagina = obtener_pagina_clientes(ultimo_id, tamano_pagina, columnas, **filtros)
+        yield from pagina
+        if len(pagina) < tamano_pagina:
+            return
+        ultimo_id = pagina[-1]['ID']
+
+@metricas.medir
+def contar_clientes(**filtros):
+    """Cuenta los clientes que cumplen los filtros."""
+    return repositorio.contar(**filtros)
+
+@metricas.medir
+def id_previo_a_pagina(numero_pagina, tamano_pagina=20, **filtros):
+    """
+    Retorna el ID a usar como `despues_de_id` para saltar directamente a la página `numero_pagina` (desde 1).
+    Solo recorre el índice de IDs, sin leer las filas completas. Retorna None si la página no existe.
+    """
+    if numero_pagina <= 1:
+        return 0
+    return repositorio.id_previo_a_pagina(numero_pagina, tamano_pagina, **filtros)
+
+@metricas.medir
 def obtener_todos_los_clientes():
     """Obtiene todos los clientes de la base de datos con la fecha de registro formateada."""
-    conn = None
-    clientes_db = []
+    return list(iterar_clientes())
+
+@metricas.medir
+def obtener_cliente_por_id(cliente_id, columnas=None):
+    """Obtiene un cliente (registro Cliente) por su ID, o None. Usa la caché si está vigente."""
+    return repositorio.obtener_por("ID", cliente_id, columnas)
+
+@metricas.medir
+def obtener_cliente_por_email(email, columnas=None):
+    """Obtiene un cliente (registro Cliente) por su email, o None. Usa la caché si está vigente."""
+    return repositorio.obtener_por("Email", email, columnas)
+
+@metricas.medir
+def existe_cliente(cliente_id=None, email=None):
+    """True si existe un cliente con ese ID (o, si no se indica ID, con ese email)."""
+    if cliente_id is not None:
+        return repositorio.existe("ID", cliente_id)
+    return repositorio.existe("Email", email)
+
+# Búsqueda por texto (FTS5)
+
+def _consulta_fts(texto):
+    """Convierte el texto ingresado en una consulta FTS5: cada palabra como prefijo, todas obligatorias."""
+    palabras = re.findall(r'\w+', texto)
+    return " ".join(f'"{palabra}"*' for palabra in palabras)
+
+@metricas.medir
+def buscar_clientes_texto(texto, limite=20):
+    """
+    Busca clientes cuyo nombre, apellido, email, teléfono o tipo de caso contengan palabras que
+    empiecen con las ingresadas (ej. 'marq kar' encuentra a 'Karina Marquez'), ordenados por relevancia.
+    """
+    consulta = _consulta_fts(texto)
+    if not consulta:
+        return []
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        # Selecciona todos los campos y formatea la fecha de registro para una mejor visualización
-        cursor.execute('SELECT *, strftime("%d-%m-%Y %H:%M:%S", Fecha_registro) AS Fecha_registro_formateada FROM clientes ORDER BY ID ASC')
-        clientes_db = [dict(row) for row in cursor.fetchall()] # Convierte sqlite3.Row a diccionario
+        with conexion() as conn:
+            cursor = _cursor_clientes(conn).execute(
+                f'{SELECT_CLIENTES} JOIN clientes_fts ON clientes.ID = clientes_fts.rowid '
+                'WHERE clientes_fts MATCH ? ORDER BY rank LIMIT ?', (consulta, limite)
+            )
+            return cursor.fetchall()
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            print(Fore.RED + f"❌ Error de base de datos al buscar clientes por texto: {e}" + Style.RESET_ALL)
+            return []
     except sqlite3.Error as e:
-        print(Fore.RED + f"❌ Error de base de datos al obtener todos los clientes: {e}" + Style.RESET_ALL)
-    finally:
-        if conn:
-            conn.close()
-    return clientes_db
-
-def obtener_cliente_por_id(cliente_id):
-    """Obtiene un cliente por su ID, con la fecha de registro formateada."""
-    conn = None
-    cliente_db = None
+        print(Fore.RED + f"❌ Error de base de datos al buscar clientes por texto: {e}" + Style.RESET_ALL)
+        return []
+
+    # Sin FTS5: búsqueda por prefijo con LIKE (recorre la tabla)
+    condiciones, parametros = [], []
+    for palabra in re.findall(r'\w+', texto):
+        condiciones.append("(Nombre LIKE ? OR Apellido LIKE ? OR Email LIKE ? OR Telefono LIKE ? OR Tipo_de_caso LIKE ?)")
+        parametros.extend([f"{palabra}%"] * 5)
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        # Modificación: Agregamos strftime para formatear la fecha
-        cursor.execute('SELECT *, strftime("%d-%m-%Y %H:%M:%S", Fecha_registro) AS Fecha_registro_formateada FROM clientes WHERE ID = ?', (cliente_id,))
-        cliente_db = cursor.fetchone()
+        with conexion() as conn:
+            cursor = _cursor_clientes(conn).execute(
+                f'{SELECT_CLIENTES} WHERE {" AND ".join(condiciones)} ORDER BY Apellido, Nombre LIMIT ?', [*parametros, limite]
+            )
+            return cursor.fetchall()
     except sqlite3.Error as e:
-        print(Fore.RED + f"❌ Error de base de datos al obtener cliente por ID: {e}" + Style.RESET_ALL)
-    finally:
-        if conn:
-            conn.close()
-    return dict(cliente_db) if cliente_db else None
-
-def obtener_cliente_por_email(email):
-    """Obtiene un cliente por su email, con la fecha de registro formateada."""
-    conn = None
-    cliente_db = None
+        print(Fore.RED + f"❌ Error de base de datos al buscar clientes por texto: {e}" + Style.RESET_ALL)
+        return []
+
+@metricas.medir
+def reconstruir_indice_busqueda():
+    """Reconstruye y optimiza el índice FTS5 a partir de la tabla 'clientes' (útil en bases de datos existentes)."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        # Modificación: Agregamos strftime para formatear la fecha
-        cursor.execute('SELECT *, strftime("%d-%m-%Y %H:%M:%S", Fecha_registro) AS Fecha_registro_formateada FROM clientes WHERE Email = ?', (email,))
-        cliente_db = cursor.fetchone()
+        with transaccion() as conn:
+            conn.execute("INSERT INTO clientes_fts(clientes_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO clientes_fts(clientes_fts) VALUES ('optimize')")
+        print(Fore.GREEN + "✔️  Índice de búsqueda por texto reconstruido." + Style.RESET_ALL)
+        return True
     except sqlite3.Error as e:
-        print(Fore.RED + f"❌ Error de base de datos al obtener cliente por Email: {e}" + Style.RESET_ALL)
-    finally:
-        if conn:
-            conn.close()
-    return dict(cliente_db) if cliente_db else None
+        print(Fore.RED + f"❌ Error al reconstruir el índice de búsqueda: {e}" + Style.RESET_ALL)
+        return False
 
+@_escritura
+@metricas.medir
 def actualizar_cliente_db(cliente_id, nombre, apellido, edad, email, telefono, fuero, tipo_caso):
     """Actualiza la información de un cliente en la base de datos."""
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE clientes
-            SET Nombre = ?, Apellido = ?, Edad = ?, Email = ?, Telefono = ?, Fuero = ?, Tipo_de_caso = ?
-            WHERE ID = ?
-        ''', (nombre, apellido, edad, email, telefono, fuero, tipo_caso, cliente_id))
-        conn.commit()
+        with transaccion() as conn:
+            cursor = conn.execute('''
+                UPDATE clientes
+                SET Nombre = ?, Apellido = ?, Edad = ?, Email = ?, Telefono = ?, Fuero = ?, Tipo_de_caso = ?
+                WHERE ID = ?
+            ''', (nombre, apellido, edad, email, telefono, fuero, tipo_caso, cliente_id))
+            _actualizar_claves_duplicados(conn)
+        cache.invalidar(cliente_id, email)
         return cursor.rowcount > 0 # Retorna True si se actualizó una fila
     except sqlite3.IntegrityError:
         print(Fore.RED + "❌ Error: Ya existe un cliente con este email al intentar actualizar." + Style.RESET_ALL)
@@ -152,122 +614,232 @@ def actualizar_cliente_db(cliente_id, nombre, apellido, edad, email, telefono, f
     except sqlite3.Error as e:
         print(Fore.RED + f"❌ Error de base de datos al actualizar cliente: {e}" + Style.RESET_ALL)
         return False
-    finally:
-        if conn:
-            conn.close()
 
+@_escritura
+@metricas.medir
 def eliminar_cliente_db(cliente_id):
     """Elimina un cliente de la base de datos por su ID."""
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM clientes WHERE ID = ?', (cliente_id,))
-        conn.commit()
+        with transaccion() as conn:
+            cursor = conn.execute('DELETE FROM clientes WHERE ID = ?', (cliente_id,))
+            _actualizar_claves_duplicados(conn)
+        cache.invalidar(cliente_id)
         return cursor.rowcount > 0 # Retorna True si se eliminó una fila
     except sqlite3.Error as e:
         print(Fore.RED + f"❌ Error de base de datos al eliminar cliente: {e}" + Style.RESET_ALL)
         return False
-    finally:
-        if conn:
-            conn.close()
 
-def buscar_clientes_por_fuero(fuero):
-    """Busca clientes por el fuero especificado."""
-    conn = None
-    clientes_db = []
+# Operaciones masivas por filtro (una sola sentencia y una sola transacción)
+
+# Columnas que se pueden cambiar en lote (Email es único por cliente, por eso no se incluye)
+COLUMNAS_ACTUALIZABLES_EN_LOTE = ("Nombre", "Apellido", "Edad", "Telefono", "Fuero", "Tipo_de_caso")
+
+def _where_obligatorio(filtros):
+    """Condiciones WHERE de los filtros; retorna None si no hay ninguno (nunca se modifica la tabla entera)."""
+    condiciones, parametros = _filtro_clientes(**filtros)
+    if not condiciones:
+        print(Fore.RED + "❌ Error: Debe indicar al menos un filtro (fuero, tipo de caso, edad o fecha)." + Style.RESET_ALL)
+        return None
+    return " AND ".join(condiciones), parametros
+
+@metricas.medir
+def actualizar_clientes_por_filtro(cambios, simular=False, **filtros):
+    """
+    Actualiza en una sola transacción todos los clientes que cumplen los filtros de _filtro_clientes
+    (fuero, tipo_de_caso, edad_min, edad_max, fecha_desde, fecha_hasta).
+    `cambios` es un diccionario {columna: nuevo_valor} con columnas de COLUMNAS_ACTUALIZABLES_EN_LOTE.
+    Con simular=True solo cuenta los clientes que se modificarían.
+    Retorna la cantidad de clientes afectados o None si hubo un error.
+    """
+    invalidas = [columna for columna in cambios if columna not in COLUMNAS_ACTUALIZABLES_EN_LOTE]
+    if not cambios or invalidas:
+        print(Fore.RED + f"❌ Error: Columnas inválidas para actualizar en lote: {invalidas or 'ninguna indicada'}" + Style.RESET_ALL)
+        return None
+    where = _where_obligatorio(filtros)
+    if where is None:
+        return None
+    if simular:
+        return contar_clientes(**filtros)
+    asignaciones = ", ".join(f"{columna} = ?" for columna in cambios)
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT *, strftime("%d-%m-%Y %H:%M:%S", Fecha_registro) AS Fecha_registro_formateada FROM clientes WHERE Fuero = ? ORDER BY ID ASC', (fuero,))
-        clientes_db = [dict(row) for row in cursor.fetchall()]
+        with transaccion() as conn:
+            cursor = conn.execute(f'UPDATE clientes SET {asignaciones} WHERE {where[0]}', [*cambios.values(), *where[1]])
+            _actualizar_claves_duplicados(conn)
+        cache.limpiar()
+        return cursor.rowcount
     except sqlite3.Error as e:
-        print(Fore.RED + f"❌ Error de base de datos al buscar clientes por fuero: {e}" + Style.RESET_ALL)
-    finally:
-        if conn:
-            conn.close()
-    return clientes_db
-    
+        print(Fore.RED + f"❌ Error de base de datos al actualizar clientes en lote: {e}" + Style.RESET_ALL)
+        return None
+
+@metricas.medir
+def eliminar_clientes_por_filtro(simular=False, **filtros):
+    """
+    Elimina en una sola transacción todos los clientes que cumplen los filtros de _filtro_clientes.
+    Con simular=True solo cuenta los clientes que se eliminarían.
+    Retorna la cantidad de clientes afectados o None si hubo un error.
+    """
+    where = _where_obligatorio(filtros)
+    if where is None:
+        return None
+    if simular:
+        return contar_clientes(**filtros)
+    try:
+        with transaccion() as conn:
+            cursor = conn.execute(f'DELETE FROM clientes WHERE {where[0]}', where[1])
+            _actualizar_claves_duplicados(conn)
+        cache.limpiar()
+        return cursor.rowcount
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error de base de datos al eliminar clientes en lote: {e}" + Style.RESET_ALL)
+        return None
+
+@metricas.medir
+def buscar_clientes_por_fuero(fuero):
+    """Busca clientes por el fuero especificado."""
+    return list(iterar_clientes(fuero=fuero))
+
 # filtrar por edad
+@metricas.medir
 def obtener_clientes_mayores_de_edad():
     """Obtiene todos los clientes con 18 años o más."""
-    conn = None
-    clientes_db = []
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT *, strftime("%d-%m-%Y %H:%M:%S", Fecha_registro) AS Fecha_registro_formateada FROM clientes WHERE Edad >= 18 ORDER BY ID ASC')
-        clientes_db = [dict(row) for row in cursor.fetchall()]
-    except sqlite3.Error as e:
-        print(Fore.RED + f"❌ Error de base de datos al obtener clientes mayores de edad: {e}" + Style.RESET_ALL)
-    finally:
-        if conn:
-            conn.close()
-    return clientes_db
+    return list(iterar_clientes(edad_min=18))
 
+@metricas.medir
 def obtener_clientes_menores_de_edad():
     """Obtiene todos los clientes menores de 18 años."""
-    conn = None
-    clientes_db = []
+    return list(iterar_clientes(edad_max=17))
+
+# Respaldo en texto
+
+NOMBRE_RESPALDO = "respaldo_clientes.txt"
+TAMANO_BUFFER_RESPALDO = 1024 * 1024 # 1 MB: pocas llamadas al sistema por respaldo
+
+def _formatear_cliente_txt(cliente):
+    """Arma el bloque de texto de un Cliente para el respaldo (una sola escritura por cliente)."""
+    return (
+        f"ID: {cliente.ID}\n"
+        f"Nombre Completo: {cliente.Nombre} {cliente.Apellido}\n"
+        f"Edad: {cliente.Edad if cliente.Edad is not None else 'N/A'}\n"
+        f"Email: {cliente.Email}\n"
+        f"Teléfono: {cliente.Telefono}\n"
+        f"Fuero: {cliente.Fuero}\n"
+        f"Tipo de caso: {cliente.Tipo_de_caso}\n"
+        f"Fecha de registro: {cliente.Fecha_registro_formateada or 'N/A'}\n"
+        + "-" * 40 + "\n" # Separador entre clientes
+    )
+
+def _leer_marca_respaldo(ruta_marca):
+    """Lee la marca de agua (Fecha_registro, ID) del último respaldo, o None si no existe."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT *, strftime("%d-%m-%Y %H:%M:%S", Fecha_registro) AS Fecha_registro_formateada FROM clientes WHERE Edad < 18 ORDER BY ID ASC')
-        clientes_db = [dict(row) for row in cursor.fetchall()]
-    except sqlite3.Error as e:
-        print(Fore.RED + f"❌ Error de base de datos al obtener clientes menores de edad: {e}" + Style.RESET_ALL)
+        with open(ruta_marca, encoding='utf-8') as archivo:
+            marca = json.load(archivo)
+        return marca["Fecha_registro"], marca["ID"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _sincronizar_a_disco(ruta):
+    """Fuerza a disco el contenido del archivo antes de reemplazar el respaldo anterior."""
+    descriptor = os.open(ruta, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
     finally:
-        if conn:
-            conn.close()
-    return clientes_db
-    
-def generar_respaldo_txt():
+        os.close(descriptor)
+
+def _escribir_atomico(ruta_destino, escribir):
+    """
+    Llama a escribir(ruta_temporal) y luego reemplaza ruta_destino con os.replace.
+    Si algo falla, el archivo anterior queda intacto y se borra el temporal.
+    """
+    ruta_temporal = f"{ruta_destino}.tmp-{os.getpid()}"
+    try:
+        escribir(ruta_temporal)
+        os.replace(ruta_temporal, ruta_destino)
+    finally:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+
+@metricas.medir
+def generar_respaldo_txt(comprimir=False, incremental=False, directorio=None):
     """
     Genera un archivo de respaldo con la información de todos los clientes en el mismo directorio del proyecto.
-    Sobrescribe cualquier respaldo anterior llamado 'respaldo_clientes.txt'.
+    Los clientes se leen con un cursor y se escriben en un archivo temporal que reemplaza al respaldo
+    anterior solo cuando terminó de escribirse, por lo que un corte a mitad de camino no deja sin respaldo.
+    - comprimir: genera 'respaldo_clientes.txt.gz' con gzip.
+    - incremental: agrega al respaldo existente solo los clientes registrados después de la última marca
+      (Fecha_registro, ID) guardada en '<respaldo>.marca'. Si no hay respaldo previo se hace uno completo.
+    Retorna la ruta del respaldo o None si no se generó.
     """
+    nombre_archivo = NOMBRE_RESPALDO + (".gz" if comprimir else "")
+    ruta_archivo = os.path.join(directorio or BASE_DIR, nombre_archivo)
+    ruta_marca = ruta_archivo + ".marca"
+
+    marca = _leer_marca_respaldo(ruta_marca) if incremental and os.path.exists(ruta_archivo) else None
+    if incremental and marca is None:
+        print(Fore.YELLOW + "⚠️ No hay un respaldo previo con marca: se generará un respaldo completo." + Style.RESET_ALL)
+
+    if marca:
+        consulta = (f'{SELECT_CLIENTES} WHERE (Fecha_registro, ID) > (?, ?) ORDER BY Fecha_registro, ID', marca)
+    else:
+        consulta = (f'{SELECT_CLIENTES} ORDER BY ID ASC', ())
+
+    fecha_creacion = datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S')
+    resultado = {"clientes": 0, "marca": marca}
+
+    def escribir(ruta_temporal):
+        if marca:
+            shutil.copyfile(ruta_archivo, ruta_temporal) # Se agrega al final de una copia del respaldo actual
+        modo = 'a' if marca else 'w'
+        if comprimir: # Al agregar se crea un nuevo miembro gzip; gzip lee los miembros concatenados
+            archivo = io.TextIOWrapper(
+                io.BufferedWriter(gzip.open(ruta_temporal, modo + 'b'), TAMANO_BUFFER_RESPALDO), encoding='utf-8'
+            )
+        else:
+            archivo = open(ruta_temporal, modo, encoding='utf-8', buffering=TAMANO_BUFFER_RESPALDO)
+        with archivo, conexion() as conn:
+            if marca:
+                archivo.write(f"\nRespaldo incremental - Fecha: {fecha_creacion}\n" + "-" * 55 + "\n\n")
+            else:
+                archivo.write("\nReporte de Clientes - Estudio Jurídico M&M y Asociados\n")
+                archivo.write(f"Fecha de Creación: {fecha_creacion}\n")
+                archivo.write("-" * 55 + "\n\n")
+            cursor = _cursor_clientes(conn).execute(*consulta)
+            while True:
+                filas = cursor.fetchmany(1000)
+                if not filas:
+                    break
+                archivo.write("".join(_formatear_cliente_txt(fila) for fila in filas))
+                resultado["clientes"] += len(filas)
+                for fila in filas:
+                    if fila.Fecha_registro is not None:
+                        ultima = (fila.Fecha_registro, fila.ID)
+                        if resultado["marca"] is None or ultima > tuple(resultado["marca"]):
+                            resultado["marca"] = ultima
+        _sincronizar_a_disco(ruta_temporal)
+
     try:
-        # Define el nombre de archivo fijo sin timestamp
-        nombre_archivo = "respaldo_clientes.txt"
-        ruta_archivo = os.path.join(BASE_DIR, nombre_archivo)
-        
-        # Eliminar el archivo de respaldo anterior si existe
-        if os.path.exists(ruta_archivo):
-            try:
-                os.remove(ruta_archivo)
-                print(Fore.YELLOW + f"🗑️  Archivo de respaldo anterior eliminado: {nombre_archivo}" + Style.RESET_ALL)
-            except OSError as e:
-                print(Fore.RED + f"❌ Error al eliminar el archivo de respaldo anterior {nombre_archivo}: {e}" + Style.RESET_ALL)
-                # Si no se puede eliminar el archivo anterior, podría haber un problema de permisos
-                # Se podría decidir si continuar y intentar escribir o abortar. 
-
-        # Generar el nuevo respaldo
-        clientes = obtener_todos_los_clientes()
-        if not clientes:
+        if not marca and contar_clientes() == 0:
             print(Fore.YELLOW + "⚠️ No hay clientes para generar el respaldo." + Style.RESET_ALL)
-            return
+            return None
+        if marca:
+            with conexion() as conn:
+                nuevos = conn.execute('SELECT COUNT(*) FROM clientes WHERE (Fecha_registro, ID) > (?, ?)', marca).fetchone()[0]
+            if nuevos == 0:
+                print(Fore.YELLOW + "⚠️ No hay clientes nuevos desde el último respaldo." + Style.RESET_ALL)
+                return ruta_archivo
 
-        with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
-            archivo.write("\nReporte de Clientes - Estudio Jurídico M&M y Asociados\n")
-            archivo.write(f"Fecha de Creación: {datetime.datetime.now().strftime('%d-%m-%Y %H:%M:%S')}\n")
-            archivo.write("-" * 55 + "\n\n")
-            
-            for cliente in clientes:
-                # Escribe cada cliente en el archivo
-                archivo.write(f"ID: {cliente.get('ID', 'N/A')}\n")
-                archivo.write(f"Nombre Completo: {cliente.get('Nombre', '')} {cliente.get('Apellido', '')}\n")
-                archivo.write(f"Edad: {cliente.get('Edad', 'N/A')}\n")
-                archivo.write(f"Email: {cliente.get('Email', '')}\n")
-                archivo.write(f"Teléfono: {cliente.get('Telefono', '')}\n")
-                archivo.write(f"Fuero: {cliente.get('Fuero', '')}\n")
-                archivo.write(f"Tipo de caso: {cliente.get('Tipo_de_caso', '')}\n")
-                archivo.write(f"Fecha de registro: {cliente.get('Fecha_registro_formateada', 'N/A')}\n")
-                archivo.write("-" * 40 + "\n") # Separador entre clientes
-
-        print(Fore.GREEN + f"✔️  Respaldo creado con éxito en el archivo: {ruta_archivo}" + Style.RESET_ALL)
-    
-    except Exception as e: # Captura cualquier otra excepción general
-        print(Fore.RED + f"❌ Ocurrió un error al generar el respaldo: {e}" + Style.RESET_ALL)
+        _escribir_atomico(ruta_archivo, escribir)
+        if resultado["marca"]:
+            def escribir_marca(ruta_temporal):
+                with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+                    json.dump({"Fecha_registro": resultado["marca"][0], "ID": resultado["marca"][1]}, archivo)
+            _escribir_atomico(ruta_marca, escribir_marca)
 
+        if marca:
+            print(Fore.GREEN + f"✔️  Respaldo incremental: {resultado['clientes']} clientes nuevos agregados a {ruta_archivo}" + Style.RESET_ALL)
+        else:
+            print(Fore.GREEN + f"✔️  Respaldo creado con éxito en el archivo: {ruta_archivo}" + Style.RESET_ALL)
+        return ruta_archivo
 
-        
\ No newline at end of file
+    except Exception as e: # Captura cualquier otra excepción general
+        print(Fore.RED + f"❌ Ocurrió un error al generar el respaldo: {e}" + Style.RESET_ALL)
+        return None
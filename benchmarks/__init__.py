@@ -0,0 +1,2 @@
+# Benchmarks de base_de_datos: generador de datos sintéticos y suite de mediciones
+# Uso: python -m benchmarks --help
@@ -0,0 +1,35 @@
+# python -m benchmarks [--tamanos 10000,100000] [--repeticiones 1000] [--salida archivo.json]
+# python -m benchmarks --comparar base.json nuevo.json
+
+import argparse
+from colorama import Fore, Style
+from benchmarks import suite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks de base_de_datos con datos sintéticos.")
+    parser.add_argument("--tamanos", default=",".join(str(t) for t in suite.TAMANOS_POR_DEFECTO),
+                        help="Cantidades de clientes separadas por coma")
+    parser.add_argument("--repeticiones", type=int, default=suite.REPETICIONES_POR_DEFECTO,
+                        help="Repeticiones de las operaciones puntuales")
+    parser.add_argument("--repeticiones-pesadas", type=int, default=suite.REPETICIONES_PESADAS_POR_DEFECTO,
+                        help="Repeticiones de listados y respaldos")
+    parser.add_argument("--semilla", type=int, default=2025)
+    parser.add_argument("--directorio", help="Directorio para las bases temporales (por defecto, el temporal del sistema)")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, benchmarks/resultados/)")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVO"), help="Comparar dos archivos de resultados")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        suite.comparar_resultados(*args.comparar)
+        return 0
+    tamanos = [int(t) for t in args.tamanos.split(",") if t.strip()]
+    resultado = suite.ejecutar_suite(tamanos, args.repeticiones, args.repeticiones_pesadas, args.semilla, args.directorio)
+    suite.mostrar_resultado(resultado)
+    ruta = suite.guardar_resultado(resultado, args.salida)
+    print(Fore.GREEN + f"\n✔️  Resultados guardados en {ruta}" + Style.RESET_ALL)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+# Generador reproducible de clientes sintéticos
+
+import datetime
+import random
+import unicodedata
+from gestor_clientes import tipos_por_fuero
+
+NOMBRES = (
+    "Juan", "María", "José", "Ana", "Carlos", "Lucía", "Jorge", "Sofía", "Luis", "Valentina", "Miguel", "Camila",
+    "Diego", "Martina", "Pablo", "Florencia", "Martín", "Julieta", "Sebastián", "Agustina", "Hernán", "Paula",
+    "Nicolás", "Romina", "Facundo", "Carolina", "Gustavo", "Verónica", "Matías", "Silvia",
+)
+APELLIDOS = (
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García", "Sánchez",
+    "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Ramírez", "Flores", "Acosta", "Benítez", "Medina",
+    "Herrera", "Suárez", "Aguirre", "Giménez", "Gutiérrez", "Pereyra", "Molina", "Castro", "Ortiz", "Silva",
+)
+DOMINIOS = ("gmail.com", "hotmail.com", "yahoo.com.ar", "outlook.com", "live.com.ar")
+
+# Distribución aproximada de la cartera del estudio: peso de cada fuero y de cada tipo de caso dentro del fuero
+PESOS_FUERO = {"Penal": 20, "Civil": 35, "Laboral": 30, "Familia": 15}
+PESOS_TIPO = (5, 3, 2) # El primer tipo de caso de cada fuero es el más frecuente
+
+PROPORCION_MENORES = 0.06 # Casos de menores (mayormente Familia)
+DIAS_DE_HISTORIA = 3 * 365 # Las fechas de registro se reparten en los últimos 3 años
+
+
+def _sin_acentos(texto):
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+def _edad(azar, fuero):
+    if azar.random() < (PROPORCION_MENORES * 3 if fuero == "Familia" else PROPORCION_MENORES / 2):
+        return azar.randint(0, 17)
+    return min(99, max(18, round(azar.triangular(18, 90, 38))))
+
+def generar_clientes(cantidad, semilla=2025, hasta=None):
+    """
+    Genera `cantidad` diccionarios de cliente con las columnas de la tabla, siempre iguales para la misma semilla.
+    Los Emails son únicos (llevan el número de fila) y Fecha_registro va en orden creciente,
+    como si los clientes se hubieran registrado de a uno hasta la fecha `hasta` (por defecto, 01-01-2025).
+    """
+    azar = random.Random(semilla)
+    hasta = hasta or datetime.datetime(2025, 1, 1)
+    desde = hasta - datetime.timedelta(days=DIAS_DE_HISTORIA)
+    paso = (hasta - desde) / max(cantidad, 1)
+    fueros, pesos_fuero = list(PESOS_FUERO), list(PESOS_FUERO.values())
+    for numero in range(cantidad):
+        fuero = azar.choices(fueros, pesos_fuero)[0]
+        nombre, apellido = azar.choice(NOMBRES), azar.choice(APELLIDOS)
+        yield {
+            "Nombre": nombre,
+            "Apellido": apellido,
+            "Edad": _edad(azar, fuero),
+            "Email": f"{_sin_acentos(nombre)}.{_sin_acentos(apellido)}{numero}@{azar.choice(DOMINIOS)}".lower(),
+            "Telefono": f"221{azar.randrange(10**7):07d}",
+            "Fuero": fuero,
+            "Tipo_de_caso": azar.choices(tipos_por_fuero[fuero], PESOS_TIPO)[0],
+            "Fecha_registro": (desde + paso * numero).strftime("%Y-%m-%dT%H:%M:%S"),
+        }
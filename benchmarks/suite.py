@@ -0,0 +1,228 @@
+# Suite de mediciones de las funciones públicas de base_de_datos
+
+import contextlib
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from colorama import Fore, Style
+
+try:
+    import resource # No existe en Windows: allí no se informa el pico de memoria
+except ImportError:
+    resource = None
+
+import base_de_datos
+from benchmarks.generador import generar_clientes, PESOS_FUERO
+
+TAMANOS_POR_DEFECTO = (10_000, 100_000, 1_000_000)
+REPETICIONES_POR_DEFECTO = 1000 # Operaciones puntuales (por ID, por Email, altas, modificaciones, bajas)
+REPETICIONES_PESADAS_POR_DEFECTO = 5 # Operaciones que recorren muchas filas (listados, respaldo)
+DIRECTORIO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+
+def _rss_pico_kb():
+    """Pico de memoria residente del proceso en KB (ru_maxrss está en bytes en macOS)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico // 1024 if sys.platform == "darwin" else pico
+
+def _percentil(tiempos_ordenados, porcentaje):
+    indice = min(len(tiempos_ordenados) - 1, max(0, round(len(tiempos_ordenados) * porcentaje / 100) - 1))
+    return tiempos_ordenados[indice]
+
+def _resumen(tiempos, filas=0):
+    """Latencias en milisegundos, operaciones por segundo y filas por segundo (si la operación devuelve filas)."""
+    ordenados = sorted(tiempos)
+    total = sum(tiempos)
+    resumen = {
+        "repeticiones": len(tiempos),
+        "p50_ms": _percentil(ordenados, 50) * 1000,
+        "p95_ms": _percentil(ordenados, 95) * 1000,
+        "p99_ms": _percentil(ordenados, 99) * 1000,
+        "max_ms": ordenados[-1] * 1000,
+        "operaciones_por_segundo": len(tiempos) / total if total else None,
+        "rss_pico_kb": _rss_pico_kb(),
+    }
+    if filas:
+        resumen["filas_por_segundo"] = filas / total if total else None
+    return resumen
+
+def _medir(funcion, argumentos, preparar=None):
+    """
+    Llama a funcion(*args) para cada args de `argumentos` y retorna (tiempos, filas_devueltas).
+    `preparar` se ejecuta antes de cada llamada, fuera de la medición (por ejemplo, vaciar la caché).
+    """
+    tiempos, filas = [], 0
+    for args in argumentos:
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+        if isinstance(resultado, list):
+            filas += len(resultado)
+    return tiempos, filas
+
+
+def medir_tamano(cantidad, repeticiones=REPETICIONES_POR_DEFECTO, repeticiones_pesadas=REPETICIONES_PESADAS_POR_DEFECTO,
+                 semilla=2025, directorio=None):
+    """
+    Crea una base temporal con `cantidad` clientes sintéticos y mide cada función pública de base_de_datos.
+    Se ejecuta en un proceso propio para que el pico de memoria (RSS) corresponda a este tamaño.
+    """
+    directorio_temporal = tempfile.mkdtemp(prefix=f"benchmark_{cantidad}_", dir=directorio)
+    base_de_datos.configurar_base_de_datos(ruta=os.path.join(directorio_temporal, "clientes.db"))
+    azar = random.Random(semilla)
+    resultados = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # Los mensajes de base_de_datos no son parte de la medición
+            base_de_datos.inicializar_db()
+
+            inicio = time.perf_counter()
+            carga = base_de_datos.insertar_clientes_lote(generar_clientes(cantidad, semilla))
+            segundos = time.perf_counter() - inicio
+            resultados["insertar_clientes_lote"] = {
+                "filas": carga["insertados"], "segundos": segundos,
+                "filas_por_segundo": carga["insertados"] / segundos, "rss_pico_kb": _rss_pico_kb(),
+            }
+
+            ids = [azar.randint(1, cantidad) for _ in range(repeticiones)]
+            with base_de_datos.conexion() as conn:
+                emails = [fila[0] for fila in conn.execute(
+                    f"SELECT Email FROM clientes WHERE ID IN ({','.join('?' * len(set(ids)))})", list(set(ids))
+                )]
+            emails = [azar.choice(emails) for _ in range(repeticiones)]
+            vaciar_cache = base_de_datos.cache.limpiar
+
+            mediciones = {
+                "obtener_cliente_por_id": (base_de_datos.obtener_cliente_por_id, [(i,) for i in ids], vaciar_cache),
+                "obtener_cliente_por_id (caché)": (base_de_datos.obtener_cliente_por_id, [(i,) for i in ids], None),
+                "obtener_cliente_por_email": (base_de_datos.obtener_cliente_por_email, [(e,) for e in emails], vaciar_cache),
+                "obtener_cliente_por_email (caché)": (base_de_datos.obtener_cliente_por_email, [(e,) for e in emails], None),
+                "obtener_pagina_clientes": (
+                    base_de_datos.obtener_pagina_clientes, [(azar.randint(0, cantidad), 20) for _ in range(repeticiones)], None
+                ),
+                "buscar_clientes_texto": (
+                    base_de_datos.buscar_clientes_texto, [(azar.choice(("gonz", "mar", "lopez", "221", "sofia")),) for _ in range(repeticiones)], None
+                ),
+                "contar_clientes": (
+                    base_de_datos.contar_clientes, [()] * repeticiones_pesadas, None
+                ),
+            }
+            for nombre, (funcion, argumentos, preparar) in mediciones.items():
+                if nombre.endswith("(caché)"): # La primera pasada llena la caché; se mide la segunda
+                    _medir(funcion, argumentos)
+                resultados[nombre] = _resumen(*_medir(funcion, argumentos, preparar))
+
+            # Altas, modificaciones y bajas: se eliminan los mismos clientes que se agregan para no cambiar el tamaño
+            altas = [
+                (c["Nombre"], c["Apellido"], c["Edad"], f"bench{numero}_{c['Email']}", c["Telefono"], c["Fuero"], c["Tipo_de_caso"])
+                for numero, c in enumerate(generar_clientes(repeticiones, semilla + 1))
+            ]
+            nuevos_ids = []
+            tiempos = []
+            for args in altas:
+                inicio = time.perf_counter()
+                nuevos_ids.append(base_de_datos.insertar_cliente(*args))
+                tiempos.append(time.perf_counter() - inicio)
+            resultados["insertar_cliente"] = _resumen(tiempos)
+
+            modificaciones = [
+                (cliente_id, *args[:2], (args[2] + 1) % 100, *args[3:]) for cliente_id, args in zip(nuevos_ids, altas)
+            ]
+            resultados["actualizar_cliente_db"] = _resumen(*_medir(base_de_datos.actualizar_cliente_db, modificaciones))
+            resultados["eliminar_cliente_db"] = _resumen(*_medir(base_de_datos.eliminar_cliente_db, [(i,) for i in nuevos_ids]))
+
+            fueros = list(PESOS_FUERO)
+            pesadas = {
+                "buscar_clientes_por_fuero": (base_de_datos.buscar_clientes_por_fuero, [(fueros[n % len(fueros)],) for n in range(repeticiones_pesadas)]),
+                "obtener_clientes_mayores_de_edad": (base_de_datos.obtener_clientes_mayores_de_edad, [()] * repeticiones_pesadas),
+                "obtener_clientes_menores_de_edad": (base_de_datos.obtener_clientes_menores_de_edad, [()] * repeticiones_pesadas),
+                "obtener_todos_los_clientes": (base_de_datos.obtener_todos_los_clientes, [()] * repeticiones_pesadas),
+                "generar_respaldo_txt": (base_de_datos.generar_respaldo_txt, [(False, False, directorio_temporal)] * repeticiones_pesadas),
+                "generar_respaldo_txt (gzip)": (base_de_datos.generar_respaldo_txt, [(True, False, directorio_temporal)] * repeticiones_pesadas),
+            }
+            for nombre, (funcion, argumentos) in pesadas.items():
+                tiempos, filas = _medir(funcion, argumentos)
+                if nombre.startswith("generar_respaldo_txt"):
+                    filas = cantidad * len(argumentos)
+                resultados[nombre] = _resumen(tiempos, filas)
+    finally:
+        base_de_datos.pool.cerrar()
+        shutil.rmtree(directorio_temporal, ignore_errors=True)
+    return {"clientes": cantidad, "funciones": resultados, "rss_pico_kb": _rss_pico_kb()}
+
+
+def ejecutar_suite(tamanos=TAMANOS_POR_DEFECTO, repeticiones=REPETICIONES_POR_DEFECTO,
+                   repeticiones_pesadas=REPETICIONES_PESADAS_POR_DEFECTO, semilla=2025, directorio=None):
+    """Mide cada tamaño en un proceso nuevo y retorna el resultado completo (serializable a JSON)."""
+    resultado = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "semilla": semilla,
+        "repeticiones": repeticiones,
+        "repeticiones_pesadas": repeticiones_pesadas,
+        "tamanos": [],
+    }
+    contexto = multiprocessing.get_context("spawn")
+    for cantidad in tamanos:
+        print(Fore.CYAN + f"Midiendo con {cantidad:,} clientes..." + Style.RESET_ALL, file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as proceso:
+            resultado["tamanos"].append(
+                proceso.submit(medir_tamano, cantidad, repeticiones, repeticiones_pesadas, semilla, directorio).result()
+            )
+    return resultado
+
+def guardar_resultado(resultado, ruta=None):
+    """Guarda el resultado en JSON (por defecto en benchmarks/resultados/) y retorna la ruta."""
+    if ruta is None:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        marca = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        ruta = os.path.join(DIRECTORIO_RESULTADOS, f"benchmark_{marca}.json")
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+    return ruta
+
+def mostrar_resultado(resultado):
+    """Imprime una tabla con p50/p95/p99 y rendimiento por función y tamaño."""
+    for medicion in resultado["tamanos"]:
+        pico = medicion["rss_pico_kb"]
+        print(Fore.MAGENTA + f"\n--- {medicion['clientes']:,} clientes"
+              + (f" (pico de memoria: {pico / 1024:.1f} MB)" if pico else "") + " ---" + Style.RESET_ALL)
+        print(f"{'Función':<36} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10} {'filas/s':>11}")
+        for nombre, datos in medicion["funciones"].items():
+            if "p50_ms" not in datos: # Carga inicial
+                print(f"{nombre:<36} {'':>9} {'':>9} {'':>9} {'':>10} {datos['filas_por_segundo']:>11,.0f}")
+                continue
+            filas = datos.get("filas_por_segundo")
+            print(f"{nombre:<36} {datos['p50_ms']:>9.3f} {datos['p95_ms']:>9.3f} {datos['p99_ms']:>9.3f} "
+                  f"{datos['operaciones_por_segundo'] or 0:>10,.0f} {format(filas, ',.0f') if filas else '':>11}")
+
+def comparar_resultados(ruta_base, ruta_nueva, umbral=0.10):
+    """Compara el p50 de dos corridas; marca en rojo lo que empeoró más que `umbral` y en verde lo que mejoró."""
+    with open(ruta_base, encoding="utf-8") as archivo:
+        base = {m["clientes"]: m["funciones"] for m in json.load(archivo)["tamanos"]}
+    with open(ruta_nueva, encoding="utf-8") as archivo:
+        nueva = {m["clientes"]: m["funciones"] for m in json.load(archivo)["tamanos"]}
+    for cantidad in sorted(base.keys() & nueva.keys()):
+        print(Fore.MAGENTA + f"\n--- {cantidad:,} clientes (p50 base -> nuevo) ---" + Style.RESET_ALL)
+        for nombre in [n for n in base[cantidad] if n in nueva[cantidad]]:
+            antes, despues = base[cantidad][nombre].get("p50_ms"), nueva[cantidad][nombre].get("p50_ms")
+            if antes is None: # Carga inicial: se compara el rendimiento en filas/s
+                antes, despues = 1 / base[cantidad][nombre]["filas_por_segundo"], 1 / nueva[cantidad][nombre]["filas_por_segundo"]
+            cambio = (despues - antes) / antes if antes else 0.0
+            color = Fore.RED if cambio > umbral else Fore.GREEN if cambio < -umbral else ""
+            print(color + f"{nombre:<36} {cambio:+8.1%}" + (Style.RESET_ALL if color else ""))
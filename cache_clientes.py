@@ -0,0 +1,142 @@
+# Caché LRU de clientes (lecturas por ID y por Email)
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+TAMANO_POR_DEFECTO = 1024 # Cantidad máxima de clientes en caché
+TTL_POR_DEFECTO = 60 # Segundos que un cliente se considera vigente (otras sesiones pueden modificarlo)
+
+
+class CacheClientes:
+    """
+    Caché LRU acotada de clientes, accesible por ID y por Email.
+    Cada cliente se guarda una sola vez y se indexa por ambas claves; al invalidar un ID
+    también se descarta su Email. Cuenta aciertos (hits) y fallos (misses).
+    Cada invalidación aumenta una generación: una lectura que empezó antes no puede volver a guardar su fila
+    (ver guardar), porque pudo leer la versión anterior a una escritura confirmada mientras tanto.
+    """
+
+    def __init__(self, tamano=TAMANO_POR_DEFECTO, ttl=TTL_POR_DEFECTO):
+        self.tamano = tamano
+        self.ttl = ttl
+        self._por_id = OrderedDict() # ID -> (vencimiento, cliente), en orden de uso
+        self._id_por_email = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._generacion = 0 # Aumenta con cada invalidación o limpieza
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _vigente(self, cliente_id):
+        """Retorna el cliente si está en caché y no venció (debe llamarse con el lock tomado)."""
+        entrada = self._por_id.get(cliente_id)
+        if entrada is None:
+            return None
+        vencimiento, cliente = entrada
+        if vencimiento < time.monotonic():
+            self._descartar(cliente_id)
+            return None
+        self._por_id.move_to_end(cliente_id)
+        return cliente
+
+    def _descartar(self, cliente_id):
+        entrada = self._por_id.pop(cliente_id, None)
+        if entrada is not None:
+            email = entrada[1].get("Email")
+            if self._id_por_email.get(email) == cliente_id:
+                del self._id_por_email[email]
+
+    def obtener_por_id(self, cliente_id):
+        """Retorna el cliente con ese ID o None si no está en caché."""
+        with self._lock:
+            cliente = self._vigente(cliente_id)
+            if cliente is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            return cliente
+
+    def obtener_por_email(self, email):
+        """Retorna el cliente con ese Email o None si no está en caché."""
+        with self._lock:
+            cliente_id = self._id_por_email.get(email)
+            cliente = self._vigente(cliente_id) if cliente_id is not None else None
+            if cliente is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            return cliente
+
+    def generacion(self):
+        """Generación actual: se toma antes de leer un cliente de la base y se pasa a guardar()."""
+        with self._lock:
+            return self._generacion
+
+    def guardar(self, cliente, generacion=None):
+        """
+        Guarda un cliente leído de la base de datos (los registros Cliente son inmutables, no hace falta copiarlos).
+        Si se indica la `generacion` tomada antes de la lectura y desde entonces hubo una invalidación, no lo guarda:
+        la fila leída puede ser anterior a esa escritura.
+        """
+        if self.tamano <= 0:
+            return
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return
+            self._descartar(cliente["ID"])
+            otro_id = self._id_por_email.get(cliente.get("Email")) # Entrada vieja de otro cliente con ese Email
+            if otro_id is not None:
+                self._descartar(otro_id)
+            self._por_id[cliente["ID"]] = (time.monotonic() + self.ttl, cliente)
+            self._id_por_email[cliente.get("Email")] = cliente["ID"]
+            while len(self._por_id) > self.tamano:
+                self._descartar(next(iter(self._por_id))) # Descarta el menos usado
+
+    def invalidar(self, cliente_id=None, email=None):
+        """Descarta el cliente con ese ID y/o Email (tras una inserción, actualización o eliminación)."""
+        pendientes = getattr(self._local, "pendientes", None)
+        if pendientes is not None:
+            pendientes.append((cliente_id, email))
+        with self._lock:
+            self._generacion += 1
+            if email is not None:
+                id_de_email = self._id_por_email.pop(email, None)
+                if id_de_email is not None:
+                    self._descartar(id_de_email)
+            if cliente_id is not None:
+                self._descartar(cliente_id)
+
+    @contextmanager
+    def repetir_invalidaciones(self):
+        """
+        Anota las invalidaciones hechas en el bloque por este hilo y las repite al salir. Se usa alrededor de
+        un lote de escrituras agrupadas: las funciones invalidan antes del COMMIT del lote, y otro hilo podría
+        volver a guardar la versión anterior del cliente antes de que el cambio sea visible.
+        """
+        self._local.pendientes = []
+        try:
+            yield
+        finally:
+            pendientes, self._local.pendientes = self._local.pendientes, None
+            for cliente_id, email in pendientes:
+                self.invalidar(cliente_id, email)
+
+    def limpiar(self):
+        """Vacía la caché (por ejemplo, después de cambios masivos o de restaurar una instantánea)."""
+        with self._lock:
+            self._generacion += 1
+            self._por_id.clear()
+            self._id_por_email.clear()
+
+    def estadisticas(self):
+        """Retorna tamaño actual, aciertos, fallos y porcentaje de aciertos."""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "clientes_en_cache": len(self._por_id),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "porcentaje_aciertos": 100.0 * self.aciertos / consultas if consultas else 0.0,
+            }
@@ -0,0 +1,318 @@
+# Detección de clientes posiblemente duplicados (mismo nombre con distinto email)
+
+import functools
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+from colorama import Fore, Style
+import base_de_datos
+import metricas
+from modelo_cliente import fabrica_cliente
+
+UMBRAL_SIMILITUD = 0.7 # Similitud mínima (0 a 1) para considerar dos nombres como posibles duplicados
+SIMILITUD_FONETICA = 0.85 # Similitud asignada a nombres que suenan igual aunque se escriban distinto
+MAX_FRECUENCIA_TRIGRAMA = 25 # En el reporte solo se cruzan trigramas poco frecuentes (los comunes no discriminan)
+MIN_TRIGRAMAS_COMPARTIDOS = 3
+MAX_FRECUENCIA_BUSQUEDA = 1000 # Al buscar parecidos a un nombre: tope de candidatos por clave (los trigramas más frecuentes se ignoran)
+MAX_TAMANO_BLOQUE = 100 # En el reporte, los bloques 'i:' de hasta este tamaño se comparan par a par
+TAMANO_LOTE_CLAVES = 5000 # Clientes pendientes procesados por transacción al actualizar el índice
+
+# Reglas fonéticas para español, aplicadas en orden sobre cada palabra ya normalizada (minúsculas, sin tildes)
+_REGLAS_FONETICAS = [
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"ch"), "C"), # Marcador temporal: la 'x' todavía se reemplaza más abajo
+    (re.compile(r"ll"), "y"),
+    (re.compile(r"qu"), "k"),
+    (re.compile(r"g(?=[ei])"), "j"),
+    (re.compile(r"gu(?=[ei])"), "g"),
+    (re.compile(r"c(?=[ei])"), "s"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"x"), "ks"),
+    (re.compile(r"[vw]"), "b"),
+    (re.compile(r"h"), ""),
+    (re.compile(r"y(?![aeiou])"), "i"), # 'y' final o ante consonante suena como 'i'
+    (re.compile(r"C"), "x"),
+]
+_REPETIDAS = re.compile(r"(.)\1+")
+_NO_LETRAS = re.compile(r"[^a-z ]+")
+
+
+def normalizar_nombre(texto):
+    """Minúsculas, sin tildes ni diéresis ('ñ' pasa a 'n') y solo letras separadas por un espacio."""
+    texto = unicodedata.normalize("NFD", (texto or "").lower()).encode("ascii", "ignore").decode("ascii")
+    return " ".join(_NO_LETRAS.sub(" ", texto).split())
+
+@functools.lru_cache(maxsize=20000)
+def _palabras(texto):
+    """Palabras normalizadas de un nombre o apellido. Se cachea: los nombres se repiten mucho entre clientes."""
+    return tuple(normalizar_nombre(texto).split())
+
+@functools.lru_cache(maxsize=20000)
+def clave_fonetica(palabra):
+    """
+    Clave fonética de una palabra normalizada: unifica grafías que suenan igual en español (c/k/qu, s/z/c,
+    b/v, g/j, ll/y, h muda) y colapsa letras repetidas. Las vocales se conservan: sin ellas nombres
+    distintos como 'luis' y 'lucia' coincidirían; los errores de tipeo los cubren los trigramas.
+    Ej.: 'karina' y 'carina' -> 'karina'; 'marquez' y 'marques' -> 'markes'.
+    """
+    for patron, reemplazo in _REGLAS_FONETICAS:
+        palabra = patron.sub(reemplazo, palabra)
+    return _REPETIDAS.sub(r"\1", palabra)
+
+@functools.lru_cache(maxsize=20000)
+def _trigramas_palabra(palabra):
+    palabra = f"_{palabra}_"
+    return frozenset(palabra[i:i + 3] for i in range(len(palabra) - 2))
+
+def trigramas(nombre, apellido=""):
+    """Trigramas de cada palabra del nombre completo, con bordes marcados ('_ka', 'kar', ..., 'na_')."""
+    return frozenset().union(*(_trigramas_palabra(palabra) for palabra in _palabras(nombre) + _palabras(apellido)))
+
+def clave_fonetica_nombre(nombre, apellido):
+    """Clave fonética del nombre completo. Las palabras se ordenan, así nombre y apellido invertidos coinciden."""
+    return " ".join(sorted(clave_fonetica(palabra) for palabra in _palabras(nombre) + _palabras(apellido)))
+
+def claves_cliente(nombre, apellido):
+    """
+    Claves de bloqueo de un cliente, en este orden: 't:' + cada trigrama, 'i:' + inicial del nombre y clave
+    fonética del apellido (cubre errores de tipeo en el nombre) y 'f:' + clave fonética del nombre completo.
+    """
+    claves = [f"t:{trigrama}" for trigrama in trigramas(nombre, apellido)]
+    palabras_nombre, palabras_apellido = _palabras(nombre), _palabras(apellido)
+    if palabras_nombre and palabras_apellido:
+        claves.append(f"i:{palabras_nombre[0][0]} {' '.join(clave_fonetica(palabra) for palabra in palabras_apellido)}")
+    if claves:
+        claves.append(f"f:{clave_fonetica_nombre(nombre, apellido)}")
+    return claves
+
+def similitud(nombre_a, apellido_a, nombre_b, apellido_b):
+    """
+    Similitud entre dos nombres completos (0 a 1): coeficiente de Dice de sus trigramas, con un mínimo de
+    SIMILITUD_FONETICA si tienen la misma clave fonética. Ej.: 'Lusi Suárez' y 'Luis Suárez' -> 0.7.
+    """
+    trigramas_a = trigramas(nombre_a, apellido_a)
+    trigramas_b = trigramas(nombre_b, apellido_b)
+    if not trigramas_a or not trigramas_b:
+        return 0.0
+    valor = 2 * len(trigramas_a & trigramas_b) / (len(trigramas_a) + len(trigramas_b))
+    if valor < SIMILITUD_FONETICA and clave_fonetica_nombre(nombre_a, apellido_a) == clave_fonetica_nombre(nombre_b, apellido_b):
+        valor = SIMILITUD_FONETICA
+    return valor
+
+
+def aplicar_claves_pendientes(conn, limite=None):
+    """
+    Actualiza el índice con los clientes encolados por los triggers (altas, cambios de nombre y bajas), dentro
+    de la transacción abierta en `conn`: borra las claves del nombre anterior y agrega las del actual.
+    base_de_datos la llama en cada escritura, así la cola solo contiene lo que escribió esa transacción.
+    Retorna la cantidad de clientes procesados (como mucho `limite`).
+    """
+    filas = conn.execute(
+        'SELECT p.Cliente_ID, p.Nombre_anterior, p.Apellido_anterior, c.Nombre, c.Apellido '
+        'FROM clientes_claves_pendientes p LEFT JOIN clientes c ON c.ID = p.Cliente_ID '
+        'ORDER BY p.Cliente_ID LIMIT ?',
+        (-1 if limite is None else limite,)
+    ).fetchall()
+    if not filas:
+        return 0
+    # Ordenadas por clave: las escrituras en el índice quedan contiguas
+    conn.executemany('DELETE FROM clientes_claves WHERE Clave = ? AND Cliente_ID = ?', sorted(
+        (clave, fila[0]) for fila in filas if fila[1] is not None for clave in claves_cliente(fila[1], fila[2])
+    ))
+    conn.executemany('INSERT OR IGNORE INTO clientes_claves (Clave, Cliente_ID) VALUES (?, ?)', sorted(
+        (clave, fila[0]) for fila in filas if fila[3] is not None for clave in claves_cliente(fila[3], fila[4])
+    ))
+    conn.executemany('DELETE FROM clientes_claves_pendientes WHERE Cliente_ID = ?', [(fila[0],) for fila in filas])
+    return len(filas)
+
+@metricas.medir
+def actualizar_claves_pendientes(tamano_lote=TAMANO_LOTE_CLAVES):
+    """
+    Vacía la cola de claves pendientes en transacciones de `tamano_lote` clientes. Las escrituras de base_de_datos
+    mantienen el índice al día; la cola solo se acumula con los clientes que existían al aplicar la migración 5
+    (o con cambios hechos por fuera de la aplicación), y se vacía al iniciar (base_de_datos.inicializar_db).
+    Si la cola está vacía solo hace una lectura, sin tomar el bloqueo de escritura. Retorna la cantidad de clientes procesados.
+    """
+    procesados = 0
+    try:
+        while True:
+            with base_de_datos.conexion() as conn:
+                if conn.execute('SELECT 1 FROM clientes_claves_pendientes LIMIT 1').fetchone() is None:
+                    return procesados
+            with base_de_datos.transaccion() as conn:
+                cantidad = aplicar_claves_pendientes(conn, tamano_lote)
+            procesados += cantidad
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al actualizar el índice de duplicados: {e}" + Style.RESET_ALL)
+        return procesados
+
+def _obtener_clientes(conn, ids):
+    """Clientes (registros Cliente) con los IDs dados, consultados en bloques, como diccionario por ID."""
+    ids = list(ids)
+    clientes = {}
+    for inicio in range(0, len(ids), 500):
+        parte = ids[inicio:inicio + 500]
+        cursor = conn.cursor()
+        cursor.row_factory = fabrica_cliente
+        cursor.execute(f'{base_de_datos.SELECT_CLIENTES} WHERE ID IN ({", ".join("?" * len(parte))})', parte)
+        clientes.update((cliente.ID, cliente) for cliente in cursor)
+    return clientes
+
+@metricas.medir
+def buscar_posibles_duplicados(nombre, apellido, excluir_id=None, umbral=UMBRAL_SIMILITUD, limite=5):
+    """
+    Clientes cuyo nombre completo se parece a (nombre, apellido), sin comparar contra toda la tabla:
+    los candidatos salen del índice de claves (mismas claves fonéticas o varios trigramas poco frecuentes
+    en común) y se confirman con `similitud`.
+    Retorna [(cliente, similitud), ...] de mayor a menor similitud.
+    """
+    claves = claves_cliente(nombre, apellido)
+    if not claves:
+        return []
+    try:
+        with base_de_datos.conexion() as conn:
+            # Mismo sonido o misma inicial y apellido: bloques de las claves 'f:' e 'i:' (búsqueda por clave primaria)
+            candidatos = set()
+            for clave in (clave for clave in claves if clave[0] in "fi"):
+                candidatos.update(fila[0] for fila in conn.execute(
+                    'SELECT Cliente_ID FROM clientes_claves WHERE Clave = ? LIMIT ?', (clave, MAX_FRECUENCIA_BUSQUEDA)
+                ))
+            # Errores de tipeo: solo trigramas poco frecuentes; contar hasta el tope cuesta como mucho ese tope
+            raros = [clave for clave in claves if clave.startswith("t:") and conn.execute(
+                'SELECT COUNT(*) FROM (SELECT 1 FROM clientes_claves WHERE Clave = ? LIMIT ?)',
+                (clave, MAX_FRECUENCIA_BUSQUEDA)
+            ).fetchone()[0] < MAX_FRECUENCIA_BUSQUEDA]
+            if raros:
+                candidatos.update(fila[0] for fila in conn.execute(
+                    f'SELECT Cliente_ID FROM clientes_claves WHERE Clave IN ({", ".join("?" * len(raros))}) '
+                    'GROUP BY Cliente_ID HAVING COUNT(*) >= ? ORDER BY COUNT(*) DESC LIMIT ?',
+                    [*raros, max(1, round(len(raros) * umbral / 2)), limite * 20]
+                ))
+            candidatos.discard(excluir_id)
+            clientes = _obtener_clientes(conn, candidatos)
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al buscar posibles duplicados: {e}" + Style.RESET_ALL)
+        return []
+    resultado = []
+    for cliente in clientes.values():
+        valor = similitud(nombre, apellido, cliente.Nombre, cliente.Apellido)
+        if valor >= umbral:
+            resultado.append((cliente, valor))
+    resultado.sort(key=lambda par: (-par[1], par[0].ID))
+    return resultado[:limite]
+
+
+class _Grupos:
+    """Unión de conjuntos (union-find) para agrupar los pares de candidatos."""
+
+    def __init__(self):
+        self.padre = {}
+
+    def raiz(self, elemento):
+        raiz = self.padre.setdefault(elemento, elemento)
+        while self.padre[raiz] != raiz:
+            raiz = self.padre[raiz]
+        while self.padre[elemento] != raiz: # Compresión de caminos
+            self.padre[elemento], elemento = raiz, self.padre[elemento]
+        return raiz
+
+    def unir(self, a, b):
+        raiz_a, raiz_b = self.raiz(a), self.raiz(b)
+        if raiz_a != raiz_b:
+            self.padre[max(raiz_a, raiz_b)] = min(raiz_a, raiz_b)
+            return True
+        return False
+
+    def grupos(self):
+        """Grupos de al menos dos elementos (los consultados que no se unieron a nadie no cuentan)."""
+        resultado = {}
+        for elemento in self.padre:
+            resultado.setdefault(self.raiz(elemento), []).append(elemento)
+        return [sorted(miembros) for miembros in resultado.values() if len(miembros) > 1]
+
+@metricas.medir
+def reporte_duplicados(umbral=UMBRAL_SIMILITUD, max_grupos=100):
+    """
+    Agrupa los clientes que podrían ser la misma persona, en dos pasadas sobre el índice de claves:
+    1. bloques por clave fonética 'f:' (un GROUP BY; todo el bloque es un grupo, sin generar pares);
+    2. pares de errores de tipeo, confirmados con `similitud` >= umbral: dentro de los bloques 'i:' de hasta
+       MAX_TAMANO_BLOQUE clientes y entre clientes que comparten al menos MIN_TRIGRAMAS_COMPARTIDOS trigramas
+       poco frecuentes.
+    Nunca compara todos contra todos. Retorna un diccionario con 'grupos' (hasta `max_grupos` listas de Cliente,
+    los más grandes primero), 'total_grupos', 'clientes_involucrados' y 'segundos', o None si hubo un error.
+    """
+    inicio = time.perf_counter()
+    actualizar_claves_pendientes() # Solo una lectura si la cola está vacía
+    grupos = _Grupos()
+    try:
+        with base_de_datos.conexion() as conn:
+            for (ids,) in conn.execute(
+                "SELECT group_concat(Cliente_ID) FROM clientes_claves WHERE Clave >= 'f:' AND Clave < 'f;' "
+                "GROUP BY Clave HAVING COUNT(*) > 1"
+            ):
+                primero, *resto = (int(cliente_id) for cliente_id in ids.split(","))
+                for cliente_id in resto:
+                    grupos.unir(primero, cliente_id)
+
+            pares = set()
+            for (ids,) in conn.execute(
+                "SELECT group_concat(Cliente_ID) FROM clientes_claves WHERE Clave >= 'i:' AND Clave < 'i;' "
+                "GROUP BY Clave HAVING COUNT(*) BETWEEN 2 AND ?", (MAX_TAMANO_BLOQUE,)
+            ):
+                bloque = [int(cliente_id) for cliente_id in ids.split(",")]
+                pares.update((a, b) for posicion, a in enumerate(bloque) for b in bloque[posicion + 1:])
+            pares.update(conn.execute('''
+                WITH raros AS (
+                    SELECT Clave FROM clientes_claves WHERE Clave >= 't:' AND Clave < 't;'
+                    GROUP BY Clave HAVING COUNT(*) BETWEEN 2 AND ?
+                )
+                SELECT a.Cliente_ID, b.Cliente_ID FROM raros
+                JOIN clientes_claves a ON a.Clave = raros.Clave
+                JOIN clientes_claves b ON b.Clave = raros.Clave AND b.Cliente_ID > a.Cliente_ID
+                GROUP BY a.Cliente_ID, b.Cliente_ID HAVING COUNT(*) >= ?
+            ''', (MAX_FRECUENCIA_TRIGRAMA, MIN_TRIGRAMAS_COMPARTIDOS)))
+            pares = [(a, b) for a, b in pares if grupos.raiz(a) != grupos.raiz(b)]
+            if pares:
+                nombres = _obtener_clientes(conn, {cliente_id for par in pares for cliente_id in par})
+                for a, b in sorted(pares):
+                    if a in nombres and b in nombres and similitud(
+                        nombres[a].Nombre, nombres[a].Apellido, nombres[b].Nombre, nombres[b].Apellido
+                    ) >= umbral:
+                        grupos.unir(a, b)
+
+            todos = sorted(grupos.grupos(), key=lambda miembros: (-len(miembros), miembros[0]))
+            seleccion = todos[:max_grupos]
+            clientes = _obtener_clientes(conn, (cliente_id for miembros in seleccion for cliente_id in miembros))
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al generar el reporte de duplicados: {e}" + Style.RESET_ALL)
+        return None
+    return {
+        "grupos": [[clientes[cliente_id] for cliente_id in miembros if cliente_id in clientes] for miembros in seleccion],
+        "total_grupos": len(todos),
+        "clientes_involucrados": sum(len(miembros) for miembros in todos),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+def mostrar_reporte_duplicados(reporte, max_grupos=20):
+    """Imprime el reporte de posibles duplicados, mostrando como máximo `max_grupos` grupos."""
+    if reporte is None:
+        return
+    if not reporte["total_grupos"]:
+        print(Fore.GREEN + "✔️  No se encontraron posibles clientes duplicados." + Style.RESET_ALL)
+        return
+    print(Fore.YELLOW + f"⚠️  {reporte['total_grupos']} grupos de posibles duplicados "
+          f"({reporte['clientes_involucrados']} clientes) en {reporte['segundos']:.2f} s:" + Style.RESET_ALL)
+    for numero, grupo in enumerate(reporte["grupos"][:max_grupos], start=1):
+        print(Fore.CYAN + f"\nGrupo {numero} ({len(grupo)} clientes)" + Style.RESET_ALL)
+        for cliente in grupo:
+            print(f"   ID {cliente.ID}: {cliente.Nombre} {cliente.Apellido} <{cliente.Email}> - {cliente.Telefono}")
+    if reporte["total_grupos"] > max_grupos:
+        print(f"\n... y {reporte['total_grupos'] - max_grupos} grupos más.")
+
+
+if __name__ == "__main__":
+    base_de_datos.inicializar_db()
+    mostrar_reporte_duplicados(reporte_duplicados(), max_grupos=int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,208 @@
+# Exportación de clientes para análisis (CSV/JSONL por partes, en paralelo)
+
+import argparse
+import csv
+import datetime
+import gzip
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from colorama import Fore, Style
+import base_de_datos
+import metricas
+from modelo_cliente import COLUMNAS_CLIENTE
+
+DIRECTORIO_EXPORTACIONES = os.path.join(base_de_datos.BASE_DIR, "exportaciones")
+NOMBRE_MANIFIESTO = "manifiesto.json"
+FORMATOS = ("csv", "jsonl")
+FILAS_POR_LECTURA = 5000 # fetchmany: memoria acotada por proceso, sin importar el tamaño de la tabla
+NIVEL_GZIP = 6 # El nivel 9 casi no reduce más el tamaño y es bastante más lento
+TAMANO_BUFFER = 1024 * 1024
+
+
+def calcular_fragmentos(cantidad):
+    """
+    Divide el rango de ID en hasta `cantidad` fragmentos [desde_id, hasta_id) con una cantidad de filas
+    parecida (los huecos que dejan las bajas no desbalancean las partes). El último fragmento termina en
+    el MAX(ID) leído al comenzar: los clientes agregados durante la exportación no se incluyen.
+    Retorna (total_de_filas, [(desde_id, hasta_id), ...]).
+    """
+    with base_de_datos.conexion() as conn:
+        minimo, maximo, total = conn.execute("SELECT MIN(ID), MAX(ID), COUNT(*) FROM clientes").fetchone()
+        if not total:
+            return 0, []
+        cantidad = max(1, min(cantidad, total))
+        limites = [minimo] + [
+            conn.execute("SELECT ID FROM clientes ORDER BY ID LIMIT 1 OFFSET ?", (total * numero // cantidad,)).fetchone()[0]
+            for numero in range(1, cantidad)
+        ] + [maximo + 1]
+    return total, [(desde, hasta) for desde, hasta in zip(limites, limites[1:]) if desde < hasta]
+
+def _sha256(ruta):
+    hash_archivo = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(TAMANO_BUFFER), b""):
+            hash_archivo.update(bloque)
+    return hash_archivo.hexdigest()
+
+def _exportar_fragmento(ruta_db, desde_id, hasta_id, ruta_parte, formato, comprimir):
+    """
+    Escribe los clientes con desde_id <= ID < hasta_id en `ruta_parte`. Corre en un proceso del pool
+    con su propia conexión de solo lectura (WAL: no bloquea a la aplicación). Retorna la entrada del manifiesto.
+    """
+    inicio = time.perf_counter()
+    ruta_temporal = f"{ruta_parte}.tmp"
+    conn = sqlite3.connect(f"file:{ruta_db}?mode=ro", uri=True)
+    filas_escritas = 0
+    try:
+        conn.execute("PRAGMA mmap_size = 268435456")
+        cursor = conn.execute(
+            f'SELECT {", ".join(COLUMNAS_CLIENTE)} FROM clientes WHERE ID >= ? AND ID < ? ORDER BY ID', (desde_id, hasta_id)
+        )
+        if comprimir:
+            archivo = gzip.open(ruta_temporal, "wt", encoding="utf-8", newline="", compresslevel=NIVEL_GZIP)
+        else:
+            archivo = open(ruta_temporal, "w", encoding="utf-8", newline="", buffering=TAMANO_BUFFER)
+        with archivo:
+            if formato == "csv":
+                escritor = csv.writer(archivo)
+                escritor.writerow(COLUMNAS_CLIENTE) # Cada parte tiene encabezado: se puede leer por separado
+            while True:
+                filas = cursor.fetchmany(FILAS_POR_LECTURA)
+                if not filas:
+                    break
+                if formato == "csv":
+                    escritor.writerows(filas)
+                else:
+                    archivo.write("".join(
+                        json.dumps(dict(zip(COLUMNAS_CLIENTE, fila)), ensure_ascii=False) + "\n" for fila in filas
+                    ))
+                filas_escritas += len(filas)
+        os.replace(ruta_temporal, ruta_parte)
+    finally:
+        conn.close()
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+    return {
+        "archivo": os.path.basename(ruta_parte),
+        "desde_id": desde_id,
+        "hasta_id": hasta_id,
+        "filas": filas_escritas,
+        "bytes": os.path.getsize(ruta_parte),
+        "sha256": _sha256(ruta_parte),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+@metricas.medir
+def exportar_clientes(formato="csv", comprimir=False, fragmentos=None, procesos=None, directorio=None):
+    """
+    Exporta todos los clientes a archivos por partes en un directorio nuevo, sin cargar la tabla en memoria:
+    el rango de ID se divide en `fragmentos` y cada uno se lee y escribe en un proceso del pool (`procesos`,
+    por defecto uno por CPU). Al final se escribe 'manifiesto.json' con columnas, partes (filas, bytes,
+    sha256) y rendimiento; su presencia indica que la exportación terminó.
+    Retorna el manifiesto (con la clave 'directorio') o None si no hay clientes o hubo un error.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+    procesos = procesos or os.cpu_count() or 1
+    fragmentos = fragmentos or procesos * 2 # Más partes que procesos: si una tarda más, las otras siguen
+    marca = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    directorio = directorio or os.path.join(DIRECTORIO_EXPORTACIONES, f"exportacion_{marca}")
+    extension = formato + (".gz" if comprimir else "")
+    inicio = time.perf_counter()
+    try:
+        total, rangos = calcular_fragmentos(fragmentos)
+        if not total:
+            print(Fore.YELLOW + "⚠️ No hay clientes para exportar." + Style.RESET_ALL)
+            return None
+        os.makedirs(directorio, exist_ok=True)
+        tareas = [
+            (base_de_datos.DB_FILE_PATH, desde, hasta, os.path.join(directorio, f"clientes-{numero:05d}.{extension}"), formato, comprimir)
+            for numero, (desde, hasta) in enumerate(rangos, start=1)
+        ]
+        with ProcessPoolExecutor(max_workers=min(procesos, len(tareas)), mp_context=multiprocessing.get_context("spawn")) as pool:
+            partes = list(pool.map(_exportar_fragmento, *zip(*tareas)))
+    except (OSError, sqlite3.Error) as e:
+        print(Fore.RED + f"❌ Error al exportar los clientes: {e}" + Style.RESET_ALL)
+        return None
+
+    segundos = time.perf_counter() - inicio
+    filas = sum(parte["filas"] for parte in partes)
+    total_bytes = sum(parte["bytes"] for parte in partes)
+    manifiesto = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "formato": formato,
+        "comprimido": comprimir,
+        "columnas": list(COLUMNAS_CLIENTE),
+        "filas": filas,
+        "bytes": total_bytes,
+        "procesos": min(procesos, len(tareas)),
+        "segundos": segundos,
+        "filas_por_segundo": filas / segundos if segundos > 0 else None,
+        "mb_por_segundo": total_bytes / 1_048_576 / segundos if segundos > 0 else None,
+        "partes": partes,
+    }
+    ruta_manifiesto = os.path.join(directorio, NOMBRE_MANIFIESTO)
+    with open(f"{ruta_manifiesto}.tmp", "w", encoding="utf-8") as archivo:
+        json.dump(manifiesto, archivo, ensure_ascii=False, indent=2)
+    os.replace(f"{ruta_manifiesto}.tmp", ruta_manifiesto)
+    return {**manifiesto, "directorio": directorio}
+
+def verificar_exportacion(directorio):
+    """
+    Comprueba una exportación contra su manifiesto: que cada parte exista, tenga el sha256 indicado y la
+    cantidad de filas declarada. Retorna la lista de problemas encontrados (vacía si está todo bien).
+    """
+    with open(os.path.join(directorio, NOMBRE_MANIFIESTO), encoding="utf-8") as archivo:
+        manifiesto = json.load(archivo)
+    problemas = []
+    for parte in manifiesto["partes"]:
+        ruta = os.path.join(directorio, parte["archivo"])
+        if not os.path.exists(ruta):
+            problemas.append(f"{parte['archivo']}: no existe")
+            continue
+        if _sha256(ruta) != parte["sha256"]:
+            problemas.append(f"{parte['archivo']}: el sha256 no coincide")
+            continue
+        abrir = gzip.open if manifiesto["comprimido"] else open
+        with abrir(ruta, "rt", encoding="utf-8", newline="") as archivo:
+            filas = sum(1 for _ in csv.reader(archivo)) - 1 if manifiesto["formato"] == "csv" else sum(1 for _ in archivo)
+        if filas != parte["filas"]:
+            problemas.append(f"{parte['archivo']}: {filas} filas, el manifiesto indica {parte['filas']}")
+    return problemas
+
+def mostrar_resumen_exportacion(manifiesto):
+    """Imprime el resultado de una exportación: directorio, partes, filas y rendimiento."""
+    if manifiesto is None:
+        return
+    print(Fore.GREEN + f"✔️  Exportación finalizada en: {manifiesto['directorio']}" + Style.RESET_ALL)
+    print(f"{manifiesto['filas']:,} clientes en {len(manifiesto['partes'])} partes {manifiesto['formato'].upper()}"
+          f"{' (gzip)' if manifiesto['comprimido'] else ''}, {manifiesto['bytes'] / 1_048_576:.1f} MB, "
+          f"{manifiesto['procesos']} procesos")
+    print(f"Tiempo: {manifiesto['segundos']:.2f} s ({manifiesto['filas_por_segundo']:,.0f} filas/s, "
+          f"{manifiesto['mb_por_segundo']:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta los clientes a CSV o JSONL por partes, en paralelo.")
+    parser.add_argument("--formato", choices=FORMATOS, default="csv")
+    parser.add_argument("--gzip", action="store_true", help="Comprimir cada parte con gzip")
+    parser.add_argument("--fragmentos", type=int, help="Cantidad de partes (por defecto, el doble de procesos)")
+    parser.add_argument("--procesos", type=int, help="Procesos en paralelo (por defecto, uno por CPU)")
+    parser.add_argument("--directorio", help="Directorio de salida (por defecto, exportaciones/exportacion_<fecha>)")
+    parser.add_argument("--verificar", metavar="DIRECTORIO", help="Verificar una exportación existente contra su manifiesto")
+    args = parser.parse_args()
+    if args.verificar:
+        problemas = verificar_exportacion(args.verificar)
+        for problema in problemas:
+            print(Fore.RED + f"❌ {problema}" + Style.RESET_ALL)
+        if not problemas:
+            print(Fore.GREEN + "✔️  La exportación coincide con su manifiesto." + Style.RESET_ALL)
+        sys.exit(1 if problemas else 0)
+    base_de_datos.inicializar_db()
+    mostrar_resumen_exportacion(exportar_clientes(args.formato, args.gzip, args.fragmentos, args.procesos, args.directorio))
@@ -1,5 +1,7 @@
 # Gestor de clientes
 
+import datetime
+import os
 from colorama import Fore, Style
 # Importa las funciones de utilidades.py
 from utilidades_funciones import (
@@ -9,6 +11,14 @@ from utilidades_funciones import (
     MAX_LEN_NOMBRE_APELLIDO, MAX_LEN_EMAIL, MAX_LEN_TELEFONO, MAX_LEN_FUERO_TIPO_CASO # Constantes importadas
 )
 import base_de_datos # Importa módulo de la base de datos
+import duplicados
+from modelo_cliente import Cliente
+import importador_clientes
+import instantaneas
+import metricas
+import replica_lectura
+import reportes
+import sincronizacion
 
 # Fueros
 tipos_por_fuero = {
@@ -21,20 +31,70 @@ tipos_por_fuero = {
 def mostrar_cliente(cliente):
     """Imprime los detalles de un cliente de forma legible."""
     
-    if isinstance(cliente, dict):
-        print(f"ID: {cliente.get('ID', 'N/A')}")
-        print(f"Nombre: {cliente.get('Nombre', '')}")
-        print(f"Apellido: {cliente.get('Apellido', '')}")
-        print(f"Edad: {cliente.get('Edad', 'N/A')}")
-        print(f"Email: {cliente.get('Email', '')}")
-        print(f"Telefono: {cliente.get('Telefono', '')}")
-        print(f"Fuero: {cliente.get('Fuero', '')}")
-        print(f"Tipo de caso: {cliente.get('Tipo_de_caso', '')}")
-        print(f"Fecha de registro: {cliente.get('Fecha_registro_formateada', 'N/A')}")
+    if isinstance(cliente, Cliente):
+        print(f"ID: {cliente.ID}\n"
+              f"Nombre: {cliente.Nombre}\n"
+              f"Apellido: {cliente.Apellido}\n"
+              f"Edad: {cliente.Edad if cliente.Edad is not None else 'N/A'}\n"
+              f"Email: {cliente.Email}\n"
+              f"Telefono: {cliente.Telefono}\n"
+              f"Fuero: {cliente.Fuero}\n"
+              f"Tipo de caso: {cliente.Tipo_de_caso}\n"
+              f"Fecha de registro: {cliente.Fecha_registro_formateada or 'N/A'}")
     else:
         print(Fore.RED + "Error: Formato de cliente inválido." + Style.RESET_ALL)
 
 
+TAMANO_PAGINA = 10 # Clientes por página en los listados
+
+def mostrar_clientes_paginados(titulo, tamano_pagina=TAMANO_PAGINA, **filtros):
+    """
+    Muestra los clientes que cumplen los filtros de a una página por vez,
+    permitiendo avanzar, retroceder o saltar a una página. Retorna False si no hay resultados.
+    """
+    total = base_de_datos.contar_clientes(**filtros)
+    if total == 0:
+        return False
+    total_paginas = (total + tamano_pagina - 1) // tamano_pagina
+    cursores = {1: 0} # número de página -> ID previo al primer cliente de esa página
+    pagina = 1
+
+    while True:
+        if pagina not in cursores:
+            cursores[pagina] = base_de_datos.id_previo_a_pagina(pagina, tamano_pagina, **filtros)
+        clientes = base_de_datos.obtener_pagina_clientes(cursores[pagina], tamano_pagina, **filtros)
+        if clientes:
+            cursores[pagina + 1] = clientes[-1]['ID']
+
+        print(Fore.MAGENTA + f"\n--- {titulo} (página {pagina} de {total_paginas}, {total} clientes) ---" + Style.RESET_ALL)
+        for i, cliente in enumerate(clientes, (pagina - 1) * tamano_pagina + 1):
+            print(f"\n" + Fore.BLUE + f"Cliente #{i}" + Style.RESET_ALL)
+            mostrar_cliente(cliente)
+        print(Fore.MAGENTA + "-----------------------------------" + Style.RESET_ALL)
+
+        accion = input("[S]iguiente, [A]nterior, [I]r a página, [V]olver: ").strip().lower()
+        if accion in ("s", ""):
+            if pagina < total_paginas:
+                pagina += 1
+            else:
+                print(Fore.YELLOW + "Ya está en la última página." + Style.RESET_ALL)
+        elif accion == "a":
+            if pagina > 1:
+                pagina -= 1
+            else:
+                print(Fore.YELLOW + "Ya está en la primera página." + Style.RESET_ALL)
+        elif accion == "i":
+            destino = pedir_numero_entero(f"Número de página (1-{total_paginas}): ")
+            if 1 <= destino <= total_paginas:
+                pagina = destino
+            else:
+                print(Fore.RED + "❌ Página inexistente." + Style.RESET_ALL)
+        elif accion == "v":
+            return True
+        else:
+            print(Fore.RED + "❌ Opción inválida." + Style.RESET_ALL)
+
+
 def seleccionar_fuero():
     """Permite al usuario seleccionar un fuero de la lista disponible."""
     while True:
@@ -71,7 +131,7 @@ def seleccionar_tipo_caso(fuero):
             print(Fore.RED + "❌ Entrada inválida. Por favor, ingrese un número." + Style.RESET_ALL)
 
 
-def agregar_cliente(opciones_seleccionadas_list):
+def agregar_cliente():
     """Permite al usuario agregar un nuevo cliente al sistema."""
     print(Fore.BLUE + "\n--- Agregar Nuevo Cliente ---" + Style.RESET_ALL)
 
@@ -83,12 +143,50 @@ def agregar_cliente(opciones_seleccionadas_list):
 
     # pedir_email_valido y pedir_telefono_valido ya usan MAX_LEN_EMAIL y MAX_LEN_TELEFONO internamente
     email = pedir_email_valido("Email: ")
+    existente = base_de_datos.obtener_cliente_por_email(email.lower())
+    if existente is not None:
+        print(Fore.YELLOW + "⚠️  Ya existe un cliente con este email:" + Style.RESET_ALL)
+        mostrar_cliente(existente)
+        if input("¿Desea actualizar sus datos con los que está ingresando? (s/n): ").strip().lower() != 's':
+            print(Fore.YELLOW + "Alta cancelada." + Style.RESET_ALL)
+            input("Presione Enter para continuar...")
+            return
+    else:
+        # Mismo cliente con otro email: se avisa antes del alta usando el índice de nombres parecidos
+        parecidos = duplicados.buscar_posibles_duplicados(nombre, apellido)
+        if parecidos:
+            print(Fore.YELLOW + "⚠️  Hay clientes con un nombre parecido (¿posible duplicado?):" + Style.RESET_ALL)
+            for cliente, valor in parecidos:
+                print(f"   ID {cliente.ID}: {cliente.Nombre} {cliente.Apellido} <{cliente.Email}> - {cliente.Telefono} (similitud {valor:.0%})")
+            if input("¿Desea continuar con el alta de todos modos? (s/n): ").strip().lower() != 's':
+                print(Fore.YELLOW + "Alta cancelada." + Style.RESET_ALL)
+                input("Presione Enter para continuar...")
+                return
     telefono = pedir_telefono_valido("Teléfono: ")
 
     fuero = seleccionar_fuero()
 
     tipo_caso = seleccionar_tipo_caso(fuero)
 
+    if existente is not None:
+        # Alta repetida: upsert por Email (los datos nuevos reemplazan a los actuales, la fecha de registro se conserva)
+        cliente_id, estado = base_de_datos.insertar_o_actualizar_cliente(
+            nombre, apellido, edad, email.lower(), telefono, fuero, tipo_caso
+        )
+        if cliente_id is None:
+            print(Fore.RED + "❌ No se pudo actualizar el cliente debido a un error." + Style.RESET_ALL)
+        elif estado == "sin_cambios":
+            print(Fore.YELLOW + "Los datos ingresados coinciden con los guardados; no hubo cambios." + Style.RESET_ALL)
+        else:
+            print(Fore.GREEN + f"✔️  Cliente ID {cliente_id} {estado} con éxito." + Style.RESET_ALL)
+            registrar_opcion(
+                "Cliente actualizado (alta repetida)" if estado == "actualizado" else "Agregar cliente",
+                Cliente(cliente_id, nombre, apellido, edad, email.lower(), telefono, fuero, tipo_caso, None),
+                cliente_id=cliente_id
+            )
+        input("Presione Enter para continuar...")
+        return
+
     # Pasa la 'edad' a la función de la base de datos
     nuevo_id = base_de_datos.insertar_cliente(nombre, apellido, edad, email.lower(), telefono, fuero, tipo_caso)
 
@@ -96,15 +194,7 @@ def agregar_cliente(opciones_seleccionadas_list):
         print(Fore.GREEN + "✔️  Cliente agregado con éxito con ID: " + str(nuevo_id) + Style.RESET_ALL)
         registrar_opcion(
             "Agregar cliente",
-            {
-                "ID": nuevo_id,
-                "Nombre": nombre,
-                "Apellido": apellido,
-                "Edad": edad, 
-                "Fuero": fuero,
-                "Tipo de caso": tipo_caso
-            },
-            opciones_seleccionadas_list
+            Cliente(nuevo_id, nombre, apellido, edad, email.lower(), telefono, fuero, tipo_caso, None)
         )
     else:
         # El mensaje de error específico para email duplicado ya lo imprime base_de_datos.insertar_cliente
@@ -120,7 +210,7 @@ def buscar_cliente():
     """
     print(Fore.BLUE + "\n--- Buscar Cliente ---" + Style.RESET_ALL)
     while True:
-        criterio = input("¿Desea buscar por ID o Email? (ID/Email): ").strip().lower()
+        criterio = input("¿Desea buscar por ID, Email o Texto (parte del nombre, apellido, email...)? (ID/Email/Texto): ").strip().lower()
         if criterio == "id":
             cliente_id = pedir_numero_entero("Ingrese el ID del cliente: ", Fore.RED + "ID inválido. Por favor, ingrese un número entero." + Style.RESET_ALL)
             found_client = base_de_datos.obtener_cliente_por_id(cliente_id)
@@ -142,8 +232,28 @@ def buscar_cliente():
                 print(Fore.RED + "❌ Cliente no encontrado con ese email." + Style.RESET_ALL)
             input("Presione Enter para continuar...")
             return found_client
+        elif criterio == "texto":
+            texto = pedir_entrada_no_vacia("Ingrese parte del nombre, apellido, email o teléfono: ")
+            resultados = base_de_datos.buscar_clientes_texto(texto)
+            found_client = None
+            if not resultados:
+                print(Fore.RED + "❌ No se encontraron clientes que coincidan con la búsqueda." + Style.RESET_ALL)
+            elif len(resultados) == 1:
+                found_client = resultados[0]
+            else:
+                print(Fore.CYAN + f"\nSe encontraron {len(resultados)} clientes (ordenados por relevancia):" + Style.RESET_ALL)
+                for idx, cliente in enumerate(resultados, start=1):
+                    print(f"{idx}. {cliente['Nombre']} {cliente['Apellido']} - {cliente['Email']} (ID: {cliente['ID']})")
+                opcion = pedir_numero_entero("Seleccione el número del cliente (0 para cancelar): ")
+                if 1 <= opcion <= len(resultados):
+                    found_client = resultados[opcion - 1]
+            if found_client:
+                print(Fore.GREEN + "\n✔️ Cliente encontrado:" + Style.RESET_ALL)
+                mostrar_cliente(found_client)
+            input("Presione Enter para continuar...")
+            return found_client
         else:
-            print(Fore.RED + "❌ Criterio de búsqueda inválido. Por favor, elija 'ID' o 'Email'." + Style.RESET_ALL)
+            print(Fore.RED + "❌ Criterio de búsqueda inválido. Por favor, elija 'ID', 'Email' o 'Texto'." + Style.RESET_ALL)
 
 
 def actualizar_cliente():
@@ -193,6 +303,9 @@ def actualizar_cliente():
             if not validar_email(email_input) or len(email_input) > MAX_LEN_EMAIL:
                 print(Fore.RED + "❌ Email inválido o demasiado largo. El email no fue actualizado." + Style.RESET_ALL)
                 email = cliente_encontrado['Email'] # Revierte al valor original si es inválido
+            elif email_input.lower() != cliente_encontrado['Email'] and base_de_datos.existe_cliente(email=email_input.lower()):
+                print(Fore.RED + "❌ Ya existe otro cliente con ese email. El email no fue actualizado." + Style.RESET_ALL)
+                email = cliente_encontrado['Email']
             else:
                 email = email_input.lower() # Siempre guarda en minúsculas
         else:
@@ -222,6 +335,13 @@ def actualizar_cliente():
             cliente_encontrado['ID'], nombre, apellido, edad, email, telefono, fuero, tipo_caso
         ):
             print(Fore.GREEN + f"✔️ Cliente con ID {cliente_encontrado['ID']} actualizado con éxito." + Style.RESET_ALL)
+            cambios = {
+                columna: valor for columna, valor in zip(
+                    ("Nombre", "Apellido", "Edad", "Email", "Telefono", "Fuero", "Tipo_de_caso"),
+                    (nombre, apellido, edad, email, telefono, fuero, tipo_caso)
+                ) if cliente_encontrado[columna] != valor
+            }
+            registrar_opcion("Cliente actualizado", cambios, cliente_id=cliente_encontrado['ID'])
         else:
             # El mensaje de error específico para email duplicado ya lo imprime base_de_datos.actualizar_cliente_db
             print(Fore.RED + "❌ No se pudo actualizar el cliente debido a un error." + Style.RESET_ALL)
@@ -239,6 +359,7 @@ def eliminar_cliente():
         if confirmar == 's':
             if base_de_datos.eliminar_cliente_db(cliente_a_eliminar['ID']):
                 print(Fore.GREEN + "✔️ Cliente eliminado con éxito." + Style.RESET_ALL)
+                registrar_opcion("Cliente eliminado", cliente_a_eliminar, cliente_id=cliente_a_eliminar['ID'])
             else:
                 print(Fore.RED + "❌ No se pudo eliminar el cliente." + Style.RESET_ALL)
         else:
@@ -250,47 +371,234 @@ def buscar_por_fuero():
     """Busca y muestra clientes filtrados por un fuero específico."""
     print(Fore.BLUE + "\n--- Buscar Clientes por Fuero ---" + Style.RESET_ALL)
     fuero_buscado = seleccionar_fuero()
-    encontrados = base_de_datos.buscar_clientes_por_fuero(fuero_buscado)
-    if encontrados:
-        print(Fore.MAGENTA + f"\n--- Clientes en el fuero de {fuero_buscado} ---" + Style.RESET_ALL)
-        for cliente in encontrados:
-            print(Fore.BLUE + f"\n--- Cliente (ID: {cliente.get('ID', 'N/A')}) ---" + Style.RESET_ALL)
-            mostrar_cliente(cliente)
-        print(Fore.MAGENTA + "---------------------------------------" + Style.RESET_ALL)
-    else:
+    if not mostrar_clientes_paginados(f"Clientes en el fuero de {fuero_buscado}", fuero=fuero_buscado):
         print(Fore.YELLOW + f" ❌ No se encontraron clientes en el fuero de {fuero_buscado}." + Style.RESET_ALL)
-    input("Presione Enter para continuar...")
+        input("Presione Enter para continuar...")
 
 # filtrar clientes por edad
 def filtrar_clientes_por_edad():
     """
-    Filtra y muestra clientes según si son mayores o menores de edad.
+    Muestra cuántos clientes son mayores y menores de edad (una sola consulta agregada)
+    y, si se pide, el detalle de cada grupo página por página.
     """
     print(Fore.BLUE + "\n--- Reporte de Clientes por Edad ---" + Style.RESET_ALL)
-    mayores_edad = base_de_datos.obtener_clientes_mayores_de_edad()
-    menores_edad = base_de_datos.obtener_clientes_menores_de_edad()
+    reporte = reportes.generar_reporte()
+    print(f"Mayores de 18 años: {reporte['mayores_de_edad']}")
+    print(f"Menores de 18 años: {reporte['menores_de_edad']}")
+
+    if input("¿Desea ver el detalle de los clientes? (s/n): ").strip().lower() == 's':
+        if not mostrar_clientes_paginados("Clientes Mayores de 18 años", edad_min=18):
+            print(Fore.YELLOW + "No se encontraron clientes mayores de 18 años." + Style.RESET_ALL)
+
+        if not mostrar_clientes_paginados("Clientes Menores de 18 años", edad_max=17):
+            print(Fore.YELLOW + "No se encontraron clientes menores de 18 años." + Style.RESET_ALL)
 
-    print(Fore.MAGENTA + "\n--- Clientes Mayores de 18 años ---" + Style.RESET_ALL)
-    if mayores_edad:
-        for cliente in mayores_edad:
-            print(Fore.BLUE + f"\n--- Cliente (ID: {cliente.get('ID', 'N/A')}) ---" + Style.RESET_ALL)
-            mostrar_cliente(cliente)
-    else:
-        print(Fore.YELLOW + "No se encontraron clientes mayores de 18 años." + Style.RESET_ALL)
-    
-    print(Fore.MAGENTA + "\n--- Clientes Menores de 18 años ---" + Style.RESET_ALL)
-    if menores_edad:
-        for cliente in menores_edad:
-            print(Fore.BLUE + f"\n--- Cliente (ID: {cliente.get('ID', 'N/A')}) ---" + Style.RESET_ALL)
-            mostrar_cliente(cliente)
-    else:
-        print(Fore.YELLOW + "No se encontraron clientes menores de 18 años." + Style.RESET_ALL)
-    
     print(Fore.MAGENTA + "---------------------------------------" + Style.RESET_ALL)
     input("Presione Enter para continuar...")
 
 
-def menu_mostrar_clientes(password_admin, opciones_seleccionadas_list):
+def reporte_de_gestion():
+    """Muestra el reporte por fuero, tipo de caso, rango de edad y mes, con detalle opcional de un grupo."""
+    reporte = reportes.generar_reporte()
+    reportes.mostrar_reporte(reporte)
+    if reporte["total"] == 0:
+        return
+
+    if input("¿Desea ver el detalle de algún grupo? (s/n): ").strip().lower() != 's':
+        return
+    print("1. Fuero\n2. Fuero y tipo de caso\n3. Rango de edad\n4. Mes de registro")
+    dimension = pedir_numero_entero("Seleccione el tipo de grupo: ")
+    if dimension == 1:
+        fuero = seleccionar_fuero()
+        titulo, filtros = f"Clientes del fuero {fuero}", {"fuero": fuero}
+    elif dimension == 2:
+        fuero = seleccionar_fuero()
+        tipo = seleccionar_tipo_caso(fuero)
+        titulo, filtros = f"Clientes de {fuero} / {tipo}", {"fuero": fuero, "tipo_de_caso": tipo}
+    elif dimension == 3:
+        rango = input("Rango de edad (" + ", ".join(nombre for nombre, _, _ in reportes.RANGOS_EDAD) + "): ").strip()
+        try:
+            titulo, filtros = f"Clientes de {rango} años", reportes.filtros_de_rango_edad(rango)
+        except ValueError as e:
+            print(Fore.RED + f"❌ {e}" + Style.RESET_ALL)
+            return
+    elif dimension == 4:
+        mes = input("Mes (AAAA-MM): ").strip()
+        try:
+            titulo, filtros = f"Clientes registrados en {mes}", reportes.filtros_de_mes(mes)
+        except ValueError:
+            print(Fore.RED + "❌ Mes inválido. Use el formato AAAA-MM." + Style.RESET_ALL)
+            return
+    else:
+        print(Fore.RED + "❌ Opción inválida." + Style.RESET_ALL)
+        return
+
+    if not mostrar_clientes_paginados(titulo, **filtros):
+        print(Fore.YELLOW + "No hay clientes en ese grupo." + Style.RESET_ALL)
+
+
+def importar_clientes_desde_archivo():
+    """Pide la ruta de un archivo CSV o JSONL e importa sus clientes en lote."""
+    print(Fore.BLUE + "\n--- Importar Clientes desde Archivo (CSV/JSONL) ---" + Style.RESET_ALL)
+    ruta = input("Ruta del archivo: ").strip().strip('"')
+    if not ruta:
+        print(Fore.RED + "❌ No se indicó ningún archivo." + Style.RESET_ALL)
+        return
+    actualizar = input("¿Actualizar los clientes que ya existen (mismo email) en lugar de rechazarlos? (s/n): ").strip().lower() == 's'
+    try:
+        resumen = importador_clientes.importar_clientes(ruta, actualizar_existentes=actualizar)
+    except (OSError, ValueError) as e:
+        print(Fore.RED + f"❌ No se pudo importar el archivo: {e}" + Style.RESET_ALL)
+        return
+    importador_clientes.mostrar_resumen_importacion(resumen)
+    registrar_opcion(
+        "Importar clientes",
+        {"Archivo": ruta, "Insertados": resumen["insertados"], "Actualizados": resumen["actualizados"],
+         "Rechazados": len(resumen["rechazados"])}
+    )
+
+
+def restaurar_instantanea_interactivo():
+    """Lista las instantáneas disponibles y restaura la elegida tras pedir confirmación."""
+    disponibles = instantaneas.listar_instantaneas()
+    if not disponibles:
+        print(Fore.YELLOW + "No hay instantáneas disponibles." + Style.RESET_ALL)
+        return False
+    print(Fore.CYAN + "\nInstantáneas disponibles:" + Style.RESET_ALL)
+    for idx, ruta in enumerate(disponibles, start=1):
+        print(f"{idx}. {os.path.basename(ruta)}")
+    opcion = pedir_numero_entero("Seleccione el número de la instantánea: ")
+    if not 1 <= opcion <= len(disponibles):
+        print(Fore.RED + "❌ Opción inválida." + Style.RESET_ALL)
+        return False
+    confirmar = input(Fore.RED + "Se reemplazarán los datos actuales. ¿Confirma la restauración? (s/n): " + Style.RESET_ALL).lower()
+    if confirmar != 's':
+        print(Fore.BLUE + "Restauración cancelada." + Style.RESET_ALL)
+        return False
+    return instantaneas.restaurar_instantanea(disponibles[opcion - 1])
+
+
+def _pedir_filtros_masivos():
+    """Pide los filtros de una operación masiva. Retorna un diccionario para base_de_datos o None si hay un dato inválido."""
+    filtros = {}
+    if input("¿Filtrar por fuero? (s/n): ").strip().lower() == 's':
+        filtros["fuero"] = seleccionar_fuero()
+        if input("¿Filtrar también por tipo de caso? (s/n): ").strip().lower() == 's':
+            filtros["tipo_de_caso"] = seleccionar_tipo_caso(filtros["fuero"])
+    for clave, mensaje in (("edad_min", "Edad mínima"), ("edad_max", "Edad máxima")):
+        valor = input(f"{mensaje} (Enter para omitir): ").strip()
+        if valor:
+            if not valor.isdigit():
+                print(Fore.RED + "❌ Edad inválida. Debe ser un número." + Style.RESET_ALL)
+                return None
+            filtros[clave] = int(valor)
+    for clave, mensaje in (("fecha_desde", "Registrados desde"), ("fecha_hasta", "Registrados antes de")):
+        valor = input(f"{mensaje} (AAAA-MM-DD, Enter para omitir): ").strip()
+        if valor:
+            try:
+                datetime.date.fromisoformat(valor)
+            except ValueError:
+                print(Fore.RED + "❌ Fecha inválida. Use el formato AAAA-MM-DD." + Style.RESET_ALL)
+                return None
+            filtros[clave] = valor
+    return filtros
+
+
+def operaciones_masivas():
+    """Reclasifica (fuero / tipo de caso) o elimina de una vez todos los clientes que cumplen un filtro."""
+    print(Fore.BLUE + "\n--- Operaciones Masivas por Filtro ---" + Style.RESET_ALL)
+    print("1. Reclasificar clientes (cambiar fuero y tipo de caso)")
+    print("2. Eliminar clientes")
+    operacion = pedir_numero_entero("Seleccione la operación: ")
+    if operacion not in (1, 2):
+        print(Fore.RED + "❌ Opción inválida." + Style.RESET_ALL)
+        return
+
+    filtros = _pedir_filtros_masivos()
+    if filtros is None:
+        return
+    if not filtros:
+        print(Fore.RED + "❌ Debe indicar al menos un filtro." + Style.RESET_ALL)
+        return
+
+    if operacion == 1:
+        print(Fore.CYAN + "Nuevo fuero y tipo de caso:" + Style.RESET_ALL)
+        fuero = seleccionar_fuero()
+        cambios = {"Fuero": fuero, "Tipo_de_caso": seleccionar_tipo_caso(fuero)}
+        ejecutar = lambda simular: base_de_datos.actualizar_clientes_por_filtro(cambios, simular=simular, **filtros)
+        verbo, accion, datos = "reclasificarán", "Reclasificación masiva", {"Filtros": filtros, "Cambios": cambios}
+    else:
+        ejecutar = lambda simular: base_de_datos.eliminar_clientes_por_filtro(simular=simular, **filtros)
+        verbo, accion, datos = "eliminarán", "Eliminación masiva", {"Filtros": filtros}
+
+    cantidad = ejecutar(True) # Simulación: solo cuenta
+    if not cantidad:
+        print(Fore.YELLOW + "Ningún cliente cumple el filtro." + Style.RESET_ALL)
+        return
+    confirmar = input(Fore.RED + f"Se {verbo} {cantidad} clientes. ¿Confirma? (s/n): " + Style.RESET_ALL).strip().lower()
+    if confirmar != 's':
+        print(Fore.BLUE + "Operación cancelada." + Style.RESET_ALL)
+        return
+    afectados = ejecutar(False)
+    if afectados is not None:
+        print(Fore.GREEN + f"✔️  {afectados} clientes afectados." + Style.RESET_ALL)
+        registrar_opcion(accion, {**datos, "Afectados": afectados})
+
+
+def mostrar_metricas_rendimiento():
+    """Muestra los tiempos de la base de datos medidos en esta sesión y permite reiniciarlos."""
+    print(Fore.BLUE + "\n--- Métricas de Rendimiento (sesión actual) ---" + Style.RESET_ALL)
+    estadisticas = base_de_datos.estadisticas_rendimiento()
+    metricas.mostrar_metricas(estadisticas, cache=estadisticas["cache"])
+    print(f"\nLas consultas lentas se guardan en: {metricas.registro.archivo_consultas_lentas or '(solo en memoria)'}")
+    if input("¿Desea reiniciar las métricas? (s/n): ").strip().lower() == 's':
+        metricas.registro.reiniciar()
+        print(Fore.GREEN + "✔️  Métricas reiniciadas." + Style.RESET_ALL)
+
+
+def reporte_posibles_duplicados():
+    """Muestra los grupos de clientes con nombres parecidos (posibles duplicados registrados con otro email)."""
+    print(Fore.BLUE + "\n--- Posibles Clientes Duplicados ---" + Style.RESET_ALL)
+    reporte = duplicados.reporte_duplicados()
+    duplicados.mostrar_reporte_duplicados(reporte)
+    if reporte is not None:
+        registrar_opcion("Reporte de posibles duplicados", {"Grupos": reporte["total_grupos"]})
+
+
+def sincronizar_respaldo_diferencial():
+    """Actualiza la copia de respaldo SQLite con los clientes agregados, modificados o eliminados desde la última vez."""
+    print(Fore.BLUE + "\n--- Respaldo Diferencial (copia SQLite) ---" + Style.RESET_ALL)
+    resumen = sincronizacion.sincronizar_replica()
+    sincronizacion.mostrar_resumen_sincronizacion(resumen)
+    if resumen is not None:
+        registrar_opcion("Sincronizar respaldo diferencial", {"Modo": resumen["modo"], "Cambios": resumen["cambios"]})
+
+
+def administrar_replica_reportes():
+    """Activa, refresca o desactiva la réplica en memoria que usan los reportes, y muestra su estado."""
+    print(Fore.BLUE + "\n--- Réplica en Memoria para Reportes ---" + Style.RESET_ALL)
+    replica_lectura.mostrar_estado(replica_lectura.replica.estado())
+    if replica_lectura.replica.conexion() is None:
+        if input("¿Activar la réplica para los reportes? (s/n): ").strip().lower() != 's':
+            return
+        minutos = pedir_numero_entero("Refrescar cada cuántos minutos (0 = solo a pedido): ")
+        if replica_lectura.configurar_replica_reportes(intervalo=max(minutos, 0) * 60):
+            replica_lectura.mostrar_estado(replica_lectura.replica.estado())
+            registrar_opcion("Activar réplica de reportes", {"Minutos": minutos})
+        return
+    accion = input("[R]efrescar ahora, [C]omparar latencias, [D]esactivar, [V]olver: ").strip().lower()
+    if accion == "r" and replica_lectura.replica.refrescar():
+        replica_lectura.mostrar_estado(replica_lectura.replica.estado())
+        registrar_opcion("Refrescar réplica de reportes")
+    elif accion == "c":
+        replica_lectura.mostrar_comparacion(replica_lectura.comparar_latencias())
+    elif accion == "d":
+        replica_lectura.configurar_replica_reportes(False)
+        print(Fore.GREEN + "✔️  Réplica desactivada: los reportes vuelven a leer el archivo." + Style.RESET_ALL)
+        registrar_opcion("Desactivar réplica de reportes")
+
+
+def menu_mostrar_clientes(password_admin):
     """
     Muestra un submenú para ver todos los clientes o generar un respaldo.
     Requiere contraseña para acceder.
@@ -307,33 +615,72 @@ def menu_mostrar_clientes(password_admin, opciones_seleccionadas_list):
         print("1. Mostrar todos los clientes en pantalla")
         print("2. Generar archivo .txt de clientes (Backup)")
         print("3. Filtrar clientes por edad (Reporte)") #Reporte segun la edad >= a 18 y edad < a 18
-        print("4. Volver al menú principal")
+        print("4. Importar clientes desde archivo CSV/JSONL")
+        print("5. Crear instantánea binaria de la base de datos (Snapshot)")
+        print("6. Restaurar una instantánea")
+        print("7. Reporte de gestión (por fuero, tipo de caso, edad y mes)")
+        print("8. Métricas de rendimiento de la base de datos")
+        print("9. Reclasificar o eliminar clientes por filtro (operación masiva)")
+        print("10. Posibles clientes duplicados (nombres parecidos)")
+        print("11. Sincronizar respaldo diferencial (copia SQLite con los cambios)")
+        print("12. Réplica en memoria para reportes (activar, refrescar, estado)")
+        print("13. Volver al menú principal")
 
         opcion_sub = pedir_numero_entero(Fore.YELLOW + "Seleccione una opción: " + Style.RESET_ALL,
                                          Fore.RED + "Entrada inválida. Por favor, ingrese un número." + Style.RESET_ALL)
 
         if opcion_sub == 1:
-            clientes_db = base_de_datos.obtener_todos_los_clientes()
-            if not clientes_db:
+            with replica_lectura.modo_reportes(): # Con la réplica activa, los reportes no leen el archivo
+                hay_clientes = mostrar_clientes_paginados("Lista de Todos los Clientes")
+            if not hay_clientes:
                 print(Fore.YELLOW + "No hay clientes registrados." + Style.RESET_ALL)
-            else:
-                print(Fore.MAGENTA + "\n--- Lista de Todos los Clientes ---" + Style.RESET_ALL)
-                for i, cliente in enumerate(clientes_db, 1):
-                    print(f"\n" + Fore.BLUE + f"Cliente #{i}" + Style.RESET_ALL)
-                    mostrar_cliente(cliente)
-                print(Fore.MAGENTA + "-----------------------------------" + Style.RESET_ALL)
-            input("Presione Enter para continuar...")
-            registrar_opcion("Mostrar todos los clientes (con contraseña)", opciones_seleccionadas_list=opciones_seleccionadas_list)
+                input("Presione Enter para continuar...")
+            registrar_opcion("Mostrar todos los clientes (con contraseña)")
         elif opcion_sub == 2:
-            base_de_datos.generar_respaldo_txt()
+            incremental = input("¿Respaldo completo o incremental (solo clientes nuevos)? (c/i): ").strip().lower() == 'i'
+            comprimir = input("¿Comprimir el respaldo con gzip? (s/n): ").strip().lower() == 's'
+            with replica_lectura.modo_reportes():
+                base_de_datos.generar_respaldo_txt(comprimir=comprimir, incremental=incremental)
             input("Presione Enter para continuar...")
-            registrar_opcion("Generar respaldo de clientes", opciones_seleccionadas_list=opciones_seleccionadas_list)
+            registrar_opcion("Generar respaldo de clientes")
         elif opcion_sub == 3:
-            filtrar_clientes_por_edad() # Llama a la función de filtrado
-            registrar_opcion("Filtrar clientes por edad", opciones_seleccionadas_list=opciones_seleccionadas_list)
+            with replica_lectura.modo_reportes():
+                filtrar_clientes_por_edad() # Llama a la función de filtrado
+            registrar_opcion("Filtrar clientes por edad")
         elif opcion_sub == 4:
+            importar_clientes_desde_archivo()
+            input("Presione Enter para continuar...")
+        elif opcion_sub == 5:
+            if instantaneas.crear_instantanea():
+                registrar_opcion("Crear instantánea de la base de datos")
+            input("Presione Enter para continuar...")
+        elif opcion_sub == 6:
+            if restaurar_instantanea_interactivo():
+                registrar_opcion("Restaurar instantánea de la base de datos")
+            input("Presione Enter para continuar...")
+        elif opcion_sub == 7:
+            with replica_lectura.modo_reportes():
+                reporte_de_gestion()
+            input("Presione Enter para continuar...")
+            registrar_opcion("Reporte de gestión")
+        elif opcion_sub == 8:
+            mostrar_metricas_rendimiento()
+            input("Presione Enter para continuar...")
+        elif opcion_sub == 9:
+            operaciones_masivas()
+            input("Presione Enter para continuar...")
+        elif opcion_sub == 10:
+            reporte_posibles_duplicados()
+            input("Presione Enter para continuar...")
+        elif opcion_sub == 11:
+            sincronizar_respaldo_diferencial()
+            input("Presione Enter para continuar...")
+        elif opcion_sub == 12:
+            administrar_replica_reportes()
+            input("Presione Enter para continuar...")
+        elif opcion_sub == 13:
             print(Fore.CYAN + "Volviendo al menú principal." + Style.RESET_ALL)
             break
         else:
-            print(Fore.RED + "❌ Opción inválida. Por favor, ingrese 1, 2, 3 o 4." + Style.RESET_ALL)
+            print(Fore.RED + "❌ Opción inválida. Por favor, ingrese un número del 1 al 13." + Style.RESET_ALL)
             input("Presione Enter para continuar...")
\ No newline at end of file
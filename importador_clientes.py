@@ -0,0 +1,196 @@
+# Importador de clientes desde archivos CSV / JSONL
+
+import argparse
+import csv
+import functools
+import json
+import os
+import time
+from collections import Counter
+from colorama import Fore, Style
+from utilidades_funciones import CAMPOS_CLIENTE, ErrorCampo, validar_cliente, validar_clientes
+import base_de_datos
+
+# Permite encabezados en minúsculas o con variantes comunes (ej. "tipo de caso", "teléfono")
+_ALIAS_COLUMNAS = {
+    **{col.lower(): col for col in CAMPOS_CLIENTE},
+    "tipo de caso": "Tipo_de_caso",
+    "teléfono": "Telefono",
+    "fecha_registro": "Fecha_registro",
+}
+
+@functools.lru_cache(maxsize=256)
+def _columna_para(clave):
+    """Columna de la tabla para un encabezado; el archivo repite los mismos encabezados en cada fila."""
+    return _ALIAS_COLUMNAS.get(clave.strip().lower())
+
+def normalizar_registro(registro):
+    """Mapea las claves del registro a los nombres de columna de la tabla y limpia espacios."""
+    normalizado = {}
+    for clave, valor in registro.items():
+        if clave is None:
+            continue
+        columna = _columna_para(clave)
+        if columna:
+            normalizado[columna] = valor.strip() if isinstance(valor, str) else valor
+    if isinstance(normalizado.get("Email"), str):
+        normalizado["Email"] = normalizado["Email"].lower() # Igual que agregar_cliente
+    return normalizado
+
+def validar_registro(registro):
+    """
+    Valida un registro ya normalizado (ver utilidades_funciones.ValidadorClientes).
+    Retorna el mensaje del primer error o None si es válido.
+    """
+    errores = validar_cliente(registro)
+    return errores[0].mensaje if errores else None
+
+def leer_csv(ruta):
+    """Genera (numero_de_linea, registro) leyendo el CSV fila por fila."""
+    with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+        lector = csv.DictReader(archivo)
+        for registro in lector:
+            yield lector.line_num, registro
+
+def leer_jsonl(ruta):
+    """Genera (numero_de_linea, registro) con un objeto JSON por línea. Las líneas inválidas se devuelven como str."""
+    with open(ruta, encoding='utf-8') as archivo:
+        for numero_linea, linea in enumerate(archivo, 1):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError as e:
+                registro = f"JSON inválido: {e}"
+            yield numero_linea, registro
+
+def _abrir_lector(ruta, formato=None):
+    """Lector de (numero_de_linea, registro) según el formato indicado o la extensión del archivo."""
+    formato = (formato or os.path.splitext(ruta)[1].lstrip('.')).lower()
+    if formato == "csv":
+        return leer_csv(ruta)
+    if formato in ("jsonl", "ndjson", "json"):
+        return leer_jsonl(ruta)
+    raise ValueError(f"Formato de archivo no soportado: {formato}")
+
+def importar_clientes(ruta, formato=None, tamano_lote=1000, actualizar_existentes=False, reglas=None):
+    """
+    Importa clientes desde un archivo CSV o JSONL sin cargarlo entero en memoria.
+    Las filas inválidas o duplicadas se rechazan individualmente sin abortar la importación.
+    Con actualizar_existentes=True los clientes cuyo Email ya existe se actualizan según `reglas`
+    (ver base_de_datos.REGLAS_FUSION_POR_DEFECTO), de modo que reimportar una lista es una sola pasada.
+    Retorna un resumen con leídos, insertados, actualizados, rechazados [(linea, motivo)], segundos y filas_por_segundo.
+    """
+    lector = _abrir_lector(ruta, formato)
+    resumen = {"leidos": 0, "insertados": 0, "actualizados": 0, "rechazados": []}
+    inicio = time.perf_counter()
+    bloque = [] # [(linea, registro)]
+
+    def procesar(bloque):
+        resultado = base_de_datos.insertar_clientes_lote(
+            (registro for _, registro in bloque), tamano_lote=len(bloque),
+            actualizar_existentes=actualizar_existentes, reglas=reglas
+        )
+        resumen["insertados"] += resultado["insertados"]
+        resumen["actualizados"] += resultado["actualizados"]
+        for indice, _, motivo in resultado["rechazados"]:
+            resumen["rechazados"].append((bloque[indice - 1][0], motivo))
+
+    for numero_linea, registro in lector:
+        resumen["leidos"] += 1
+        if not isinstance(registro, dict):
+            resumen["rechazados"].append((numero_linea, registro if isinstance(registro, str) else "Registro inválido"))
+            continue
+        registro = normalizar_registro(registro)
+        error = validar_registro(registro)
+        if error:
+            resumen["rechazados"].append((numero_linea, error))
+            continue
+        bloque.append((numero_linea, registro))
+        if len(bloque) >= tamano_lote:
+            procesar(bloque)
+            bloque = []
+    if bloque:
+        procesar(bloque)
+
+    resumen["rechazados"].sort()
+    resumen["segundos"] = time.perf_counter() - inicio
+    resumen["filas_por_segundo"] = resumen["leidos"] / resumen["segundos"] if resumen["segundos"] > 0 else 0.0
+    return resumen
+
+def validar_archivo(ruta, formato=None, procesos=1, max_errores=1000):
+    """
+    Valida un archivo CSV o JSONL completo sin insertar nada, en streaming y, con procesos > 1, repartiendo
+    la validación entre procesos (archivos de millones de filas).
+    Retorna un resumen con leídos, inválidos, errores por campo y código, los primeros `max_errores`
+    [(linea, [ErrorCampo, ...])] ordenados por línea, segundos y filas_por_segundo.
+    """
+    lector = _abrir_lector(ruta, formato)
+    resumen = {"leidos": 0, "invalidos": 0, "por_campo": Counter(), "errores": []}
+    inicio = time.perf_counter()
+
+    def registrar(linea, errores):
+        resumen["invalidos"] += 1
+        resumen["por_campo"].update(f"{error.campo or 'registro'}: {error.codigo}" for error in errores)
+        if len(resumen["errores"]) < max_errores:
+            resumen["errores"].append((linea, errores))
+
+    def pares():
+        for numero_linea, registro in lector:
+            resumen["leidos"] += 1
+            if isinstance(registro, dict):
+                yield numero_linea, normalizar_registro(registro)
+            else: # Línea que no se pudo interpretar (JSON inválido)
+                registrar(numero_linea, [ErrorCampo(None, "lectura", registro if isinstance(registro, str) else "Registro inválido")])
+
+    for numero_linea, errores in validar_clientes(pares(), procesos=procesos):
+        registrar(numero_linea, errores)
+
+    resumen["errores"].sort(key=lambda error: error[0])
+    resumen["segundos"] = time.perf_counter() - inicio
+    resumen["filas_por_segundo"] = resumen["leidos"] / resumen["segundos"] if resumen["segundos"] > 0 else 0.0
+    return resumen
+
+def mostrar_resumen_validacion(resumen, max_errores=20):
+    """Imprime el resumen de una validación, con los errores por campo y como máximo `max_errores` líneas."""
+    validos = resumen["leidos"] - resumen["invalidos"]
+    color = Fore.GREEN if not resumen["invalidos"] else Fore.YELLOW
+    print(color + f"Validación: {validos} de {resumen['leidos']} filas válidas, {resumen['invalidos']} con errores." + Style.RESET_ALL)
+    print(f"Tiempo: {resumen['segundos']:.2f} s ({resumen['filas_por_segundo']:.0f} filas/s)")
+    for campo_codigo, cantidad in resumen["por_campo"].most_common():
+        print(f"   - {campo_codigo}: {cantidad}")
+    for linea, errores in resumen["errores"][:max_errores]:
+        print(f"   Línea {linea}: " + "; ".join(error.mensaje for error in errores))
+    if resumen["invalidos"] > max_errores:
+        print(f"   ... y {resumen['invalidos'] - max_errores} filas más con errores.")
+
+def mostrar_resumen_importacion(resumen, max_rechazos=20):
+    """Imprime el resumen de una importación, mostrando como máximo `max_rechazos` rechazos."""
+    print(Fore.GREEN + f"✔️  Importación finalizada: {resumen['insertados']} de {resumen['leidos']} filas insertadas." + Style.RESET_ALL)
+    if resumen.get("actualizados"):
+        print(Fore.GREEN + f"✔️  {resumen['actualizados']} clientes existentes actualizados." + Style.RESET_ALL)
+    print(f"Tiempo: {resumen['segundos']:.2f} s ({resumen['filas_por_segundo']:.0f} filas/s)")
+    rechazados = resumen["rechazados"]
+    if rechazados:
+        print(Fore.YELLOW + f"⚠️  {len(rechazados)} filas rechazadas:" + Style.RESET_ALL)
+        for linea, motivo in rechazados[:max_rechazos]:
+            print(f"   - Línea {linea}: {motivo}")
+        if len(rechazados) > max_rechazos:
+            print(f"   ... y {len(rechazados) - max_rechazos} más.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa (o solo valida) clientes desde un archivo CSV o JSONL.")
+    parser.add_argument("archivo")
+    parser.add_argument("tamano_lote", nargs="?", type=int, default=1000)
+    parser.add_argument("--actualizar", action="store_true", help="Actualizar los clientes cuyo email ya existe (upsert)")
+    parser.add_argument("--validar", action="store_true", help="Solo validar el archivo, sin insertar")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos para validar en paralelo (con --validar)")
+    args = parser.parse_args()
+    if args.validar:
+        mostrar_resumen_validacion(validar_archivo(args.archivo, procesos=args.procesos))
+    else:
+        base_de_datos.inicializar_db()
+        resumen = importar_clientes(args.archivo, tamano_lote=args.tamano_lote, actualizar_existentes=args.actualizar)
+        mostrar_resumen_importacion(resumen)
@@ -0,0 +1,109 @@
+# Instantáneas binarias de la base de datos (API de backup de SQLite)
+
+import datetime
+import glob
+import os
+import sqlite3
+import time
+from colorama import Fore, Style
+import base_de_datos
+import sincronizacion
+
+DIRECTORIO_INSTANTANEAS = os.path.join(base_de_datos.BASE_DIR, 'instantaneas')
+INSTANTANEAS_A_CONSERVAR = 5
+PAGINAS_POR_PASO = 256 # Páginas copiadas por paso; entre pasos se libera el bloqueo de lectura
+PAUSA_ENTRE_PASOS = 0.001 # Segundos de espera entre pasos para dejar trabajar a otras sesiones
+
+
+def verificar_integridad(ruta):
+    """Ejecuta PRAGMA integrity_check sobre el archivo. Retorna True si el resultado es 'ok'."""
+    conn = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+    try:
+        resultado = conn.execute("PRAGMA integrity_check").fetchall()
+        return len(resultado) == 1 and resultado[0][0] == "ok"
+    finally:
+        conn.close()
+
+
+def listar_instantaneas(directorio=None):
+    """Retorna las rutas de las instantáneas existentes, de la más antigua a la más reciente."""
+    return sorted(glob.glob(os.path.join(directorio or DIRECTORIO_INSTANTANEAS, "clientes_*.db")))
+
+
+def _podar_instantaneas(conservar, directorio):
+    """Elimina las instantáneas más antiguas dejando solo las últimas `conservar`."""
+    for ruta in listar_instantaneas(directorio)[:-conservar]:
+        os.remove(ruta)
+
+
+def crear_instantanea(conservar=INSTANTANEAS_A_CONSERVAR, directorio=None, paginas_por_paso=PAGINAS_POR_PASO):
+    """
+    Copia la base de datos en uso a 'instantaneas/clientes_<fecha>.db' usando la API de backup,
+    en pasos de `paginas_por_paso` páginas para no bloquear a las otras sesiones.
+    La copia se verifica con PRAGMA integrity_check antes de darla por válida.
+    Retorna la ruta de la instantánea o None si falló.
+    """
+    directorio = directorio or DIRECTORIO_INSTANTANEAS
+    os.makedirs(directorio, exist_ok=True)
+    marca_tiempo = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    ruta_destino = os.path.join(directorio, f"clientes_{marca_tiempo}.db")
+    ruta_temporal = ruta_destino + ".tmp"
+
+    try:
+        inicio = time.perf_counter()
+        destino = sqlite3.connect(ruta_temporal)
+        try:
+            with base_de_datos.conexion() as origen:
+                origen.backup(destino, pages=paginas_por_paso, sleep=PAUSA_ENTRE_PASOS)
+        finally:
+            destino.close()
+
+        if not verificar_integridad(ruta_temporal):
+            print(Fore.RED + "❌ La instantánea no superó la verificación de integridad y fue descartada." + Style.RESET_ALL)
+            return None
+        os.replace(ruta_temporal, ruta_destino)
+        _podar_instantaneas(conservar, directorio)
+
+        segundos = time.perf_counter() - inicio
+        tamano_kb = os.path.getsize(ruta_destino) / 1024
+        print(Fore.GREEN + f"✔️  Instantánea creada y verificada: {ruta_destino} ({tamano_kb:.0f} KB en {segundos:.2f} s)" + Style.RESET_ALL)
+        return ruta_destino
+    except (sqlite3.Error, OSError) as e:
+        print(Fore.RED + f"❌ Error al crear la instantánea: {e}" + Style.RESET_ALL)
+        return None
+    finally:
+        for sufijo in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(ruta_temporal + sufijo):
+                os.remove(ruta_temporal + sufijo)
+
+
+def restaurar_instantanea(ruta, respaldar_actual=True, paginas_por_paso=PAGINAS_POR_PASO):
+    """
+    Restaura la base de datos en uso desde una instantánea, copiándola con la API de backup.
+    Antes verifica la integridad de la instantánea y, si respaldar_actual es True,
+    crea una instantánea del estado actual para poder deshacer la restauración.
+    Retorna True si se restauró.
+    """
+    try:
+        if not verificar_integridad(ruta):
+            print(Fore.RED + "❌ La instantánea está dañada. No se restauró nada." + Style.RESET_ALL)
+            return False
+        if respaldar_actual and crear_instantanea(conservar=INSTANTANEAS_A_CONSERVAR + 1) is None:
+            print(Fore.RED + "❌ No se pudo respaldar el estado actual. Restauración cancelada." + Style.RESET_ALL)
+            return False
+
+        origen = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+        try:
+            with base_de_datos.conexion() as destino:
+                origen.backup(destino, pages=paginas_por_paso, sleep=PAUSA_ENTRE_PASOS)
+        finally:
+            origen.close()
+
+        base_de_datos.cache.limpiar()
+        base_de_datos.inicializar_db() # La instantánea puede tener una versión de esquema anterior
+        sincronizacion.reiniciar_consumidores() # El registro de cambios volvió atrás: las copias se rehacen completas
+        print(Fore.GREEN + f"✔️  Base de datos restaurada desde {ruta}" + Style.RESET_ALL)
+        return True
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al restaurar la instantánea: {e}" + Style.RESET_ALL)
+        return False
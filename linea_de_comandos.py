@@ -0,0 +1,437 @@
+# Modo línea de comandos (sin menú interactivo) y ejecución de lotes de comandos
+
+import argparse
+import contextlib
+import io
+import json
+import shlex
+import sys
+from colorama import Fore, Style
+import base_de_datos
+import exportador
+import gestor_clientes
+import importador_clientes
+import metricas
+import reportes
+import sincronizacion
+
+
+class ErrorComando(Exception):
+    """Error de validación o de datos al ejecutar un comando (se informa sin traceback)."""
+
+
+# Comandos que leen la base con otras conexiones (sync) u otros procesos (export): dentro de un lote
+# no verían lo que escribieron los comandos anteriores, todavía sin confirmar
+COMANDOS_FUERA_DE_LOTE = ("export", "sync")
+
+
+def _cliente_a_dict(cliente):
+    return cliente.a_dict(con_fecha_formateada=True)
+
+def _validar(registro):
+    error = importador_clientes.validar_registro(registro)
+    if error:
+        raise ErrorComando(error)
+
+def _buscar(args):
+    if args.id is not None:
+        return base_de_datos.obtener_cliente_por_id(args.id)
+    return base_de_datos.obtener_cliente_por_email(args.email.lower())
+
+
+# Comandos: cada uno recibe los argumentos ya interpretados y retorna un resultado serializable a JSON
+
+def comando_add(args):
+    registro = {
+        "Nombre": args.nombre.capitalize(), "Apellido": args.apellido.capitalize(), "Edad": args.edad,
+        "Email": args.email.lower(), "Telefono": args.telefono, "Fuero": args.fuero, "Tipo_de_caso": args.tipo,
+    }
+    _validar(registro)
+    if args.actualizar:
+        cliente_id, estado = base_de_datos.insertar_o_actualizar_cliente(
+            registro["Nombre"], registro["Apellido"], registro["Edad"], registro["Email"],
+            registro["Telefono"], registro["Fuero"], registro["Tipo_de_caso"]
+        )
+        if cliente_id is None:
+            raise ErrorComando("No se pudo agregar ni actualizar el cliente")
+        return {"ID": cliente_id, "estado": estado}
+    nuevo_id = base_de_datos.insertar_cliente(
+        registro["Nombre"], registro["Apellido"], registro["Edad"], registro["Email"],
+        registro["Telefono"], registro["Fuero"], registro["Tipo_de_caso"]
+    )
+    if nuevo_id is None:
+        raise ErrorComando("No se pudo agregar el cliente (¿email duplicado?)")
+    return {"ID": nuevo_id}
+
+def comando_get(args):
+    cliente = _buscar(args)
+    if cliente is None:
+        raise ErrorComando("Cliente no encontrado")
+    return _cliente_a_dict(cliente)
+
+def comando_update(args):
+    cliente = base_de_datos.obtener_cliente_por_id(args.id)
+    if cliente is None:
+        raise ErrorComando("Cliente no encontrado")
+    registro = cliente.a_dict()
+    cambios = {
+        "Nombre": args.nombre and args.nombre.capitalize(), "Apellido": args.apellido and args.apellido.capitalize(),
+        "Edad": args.edad, "Email": args.email and args.email.lower(), "Telefono": args.telefono,
+        "Fuero": args.fuero, "Tipo_de_caso": args.tipo,
+    }
+    registro.update({columna: valor for columna, valor in cambios.items() if valor is not None})
+    _validar(registro)
+    if not base_de_datos.actualizar_cliente_db(
+        args.id, registro["Nombre"], registro["Apellido"], registro["Edad"], registro["Email"],
+        registro["Telefono"], registro["Fuero"], registro["Tipo_de_caso"]
+    ):
+        raise ErrorComando("No se pudo actualizar el cliente")
+    return {"ID": args.id, "actualizado": True}
+
+def comando_delete(args):
+    if not base_de_datos.eliminar_cliente_db(args.id):
+        raise ErrorComando("Cliente no encontrado o no se pudo eliminar")
+    return {"ID": args.id, "eliminado": True}
+
+def comando_list(args):
+    filtros = {"fuero": args.fuero, "edad_min": args.edad_min, "edad_max": args.edad_max}
+    if args.limite is not None:
+        clientes = base_de_datos.obtener_pagina_clientes(args.despues_de_id, args.limite, **filtros)
+        return (_cliente_a_dict(cliente) for cliente in clientes)
+    return (_cliente_a_dict(cliente) for cliente in base_de_datos.iterar_clientes(desde_id=args.despues_de_id, **filtros))
+
+def comando_by_fuero(args):
+    return (_cliente_a_dict(cliente) for cliente in base_de_datos.iterar_clientes(fuero=args.fuero))
+
+def _filtros_masivos(args):
+    filtros = {
+        "fuero": args.fuero, "tipo_de_caso": args.tipo, "edad_min": args.edad_min, "edad_max": args.edad_max,
+        "fecha_desde": args.desde, "fecha_hasta": args.antes_de,
+    }
+    if args.tipo and args.fuero and args.tipo not in gestor_clientes.tipos_por_fuero[args.fuero]:
+        raise ErrorComando("Tipo de caso inválido para el fuero")
+    if all(valor is None for valor in filtros.values()):
+        raise ErrorComando("Debe indicar al menos un filtro (--fuero, --tipo, --edad-min, --edad-max, --desde, --antes-de)")
+    return filtros
+
+def comando_bulk_update(args):
+    filtros = _filtros_masivos(args)
+    cambios = {"Fuero": args.nuevo_fuero, "Tipo_de_caso": args.nuevo_tipo, "Edad": args.nueva_edad}
+    cambios = {columna: valor for columna, valor in cambios.items() if valor is not None}
+    if not cambios:
+        raise ErrorComando("Debe indicar al menos un cambio (--nuevo-fuero, --nuevo-tipo, --nueva-edad)")
+    if "Tipo_de_caso" in cambios:
+        fuero = cambios.get("Fuero") or args.fuero
+        if fuero is None:
+            raise ErrorComando("Para cambiar el tipo de caso indique --fuero o --nuevo-fuero")
+        if cambios["Tipo_de_caso"] not in gestor_clientes.tipos_por_fuero[fuero]:
+            raise ErrorComando("Tipo de caso inválido para el fuero")
+    elif "Fuero" in cambios:
+        raise ErrorComando("Al cambiar el fuero también debe indicar --nuevo-tipo")
+    afectados = base_de_datos.actualizar_clientes_por_filtro(cambios, simular=args.simular, **filtros)
+    if afectados is None:
+        raise ErrorComando("No se pudo actualizar los clientes")
+    return {"afectados": afectados, "simulacion": args.simular}
+
+def comando_bulk_delete(args):
+    afectados = base_de_datos.eliminar_clientes_por_filtro(simular=args.simular, **_filtros_masivos(args))
+    if afectados is None:
+        raise ErrorComando("No se pudo eliminar los clientes")
+    return {"afectados": afectados, "simulacion": args.simular}
+
+def comando_backup(args):
+    ruta = base_de_datos.generar_respaldo_txt(comprimir=args.gzip, incremental=args.incremental)
+    if ruta is None:
+        raise ErrorComando("No se generó el respaldo")
+    return {"archivo": ruta}
+
+def comando_export(args):
+    try:
+        manifiesto = exportador.exportar_clientes(args.formato, args.gzip, args.fragmentos, args.procesos, args.directorio)
+    except ValueError as e:
+        raise ErrorComando(str(e))
+    if manifiesto is None:
+        raise ErrorComando("No se generó la exportación")
+    return manifiesto
+
+def comando_sync(args):
+    resumen = sincronizacion.sincronizar_replica(args.replica, compactar=not args.sin_compactar)
+    if resumen is None:
+        raise ErrorComando("No se pudo sincronizar la copia de respaldo")
+    return resumen
+
+def comando_report(args):
+    reporte = reportes.generar_reporte()
+    reporte["por_tipo_de_caso"] = {f"{fuero}/{tipo}": cantidad for (fuero, tipo), cantidad in reporte["por_tipo_de_caso"].items()}
+    return reporte
+
+
+def crear_parser():
+    """Define los subcomandos disponibles."""
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="Estudio Jurídico M&M y Asociados - gestión de clientes sin menú interactivo."
+    )
+    parser.add_argument("--json", action="store_true", help="Salida en JSON (una línea por resultado)")
+    parser.add_argument("--metricas", action="store_true",
+                        help="Al terminar, mostrar en stderr los tiempos de la base de datos (consultas, commits, caché)")
+    parser.add_argument("--espera-bloqueo", type=int, metavar="MS",
+                        help="Milisegundos de espera si otra sesión está escribiendo (busy_timeout) antes de reintentar")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    fueros = list(gestor_clientes.tipos_por_fuero)
+
+    p = sub.add_parser("add", help="Agregar un cliente")
+    p.add_argument("--nombre", required=True)
+    p.add_argument("--apellido", required=True)
+    p.add_argument("--edad", type=int, required=True)
+    p.add_argument("--email", required=True)
+    p.add_argument("--telefono", required=True)
+    p.add_argument("--fuero", required=True, choices=fueros)
+    p.add_argument("--tipo", required=True, help="Tipo de caso (debe corresponder al fuero)")
+    p.add_argument("--actualizar", action="store_true", help="Si el email ya existe, actualizar ese cliente (upsert)")
+    p.set_defaults(funcion=comando_add)
+
+    p = sub.add_parser("get", help="Buscar un cliente por ID o Email")
+    grupo = p.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--id", type=int)
+    grupo.add_argument("--email")
+    p.set_defaults(funcion=comando_get)
+
+    p = sub.add_parser("update", help="Actualizar los campos indicados de un cliente")
+    p.add_argument("--id", type=int, required=True)
+    p.add_argument("--nombre")
+    p.add_argument("--apellido")
+    p.add_argument("--edad", type=int)
+    p.add_argument("--email")
+    p.add_argument("--telefono")
+    p.add_argument("--fuero", choices=fueros)
+    p.add_argument("--tipo")
+    p.set_defaults(funcion=comando_update)
+
+    p = sub.add_parser("delete", help="Eliminar un cliente por ID")
+    p.add_argument("--id", type=int, required=True)
+    p.set_defaults(funcion=comando_delete)
+
+    p = sub.add_parser("list", help="Listar clientes (con filtros opcionales)")
+    p.add_argument("--fuero", choices=fueros)
+    p.add_argument("--edad-min", type=int)
+    p.add_argument("--edad-max", type=int)
+    p.add_argument("--despues-de-id", type=int, default=0, help="Paginación: ID del último cliente ya leído")
+    p.add_argument("--limite", type=int, help="Cantidad máxima de clientes")
+    p.set_defaults(funcion=comando_list)
+
+    p = sub.add_parser("by-fuero", help="Listar los clientes de un fuero")
+    p.add_argument("fuero", choices=fueros)
+    p.set_defaults(funcion=comando_by_fuero)
+
+    def argumentos_de_filtro(p):
+        p.add_argument("--fuero", choices=fueros)
+        p.add_argument("--tipo", help="Tipo de caso")
+        p.add_argument("--edad-min", type=int)
+        p.add_argument("--edad-max", type=int)
+        p.add_argument("--desde", help="Registrados desde esta fecha (AAAA-MM-DD)")
+        p.add_argument("--antes-de", help="Registrados antes de esta fecha (AAAA-MM-DD)")
+        p.add_argument("--simular", action="store_true", help="Solo contar los clientes afectados, sin modificar nada")
+
+    p = sub.add_parser("bulk-update", help="Actualizar todos los clientes que cumplen un filtro (una sola transacción)")
+    argumentos_de_filtro(p)
+    p.add_argument("--nuevo-fuero", choices=fueros)
+    p.add_argument("--nuevo-tipo")
+    p.add_argument("--nueva-edad", type=int)
+    p.set_defaults(funcion=comando_bulk_update)
+
+    p = sub.add_parser("bulk-delete", help="Eliminar todos los clientes que cumplen un filtro (una sola transacción)")
+    argumentos_de_filtro(p)
+    p.set_defaults(funcion=comando_bulk_delete)
+
+    p = sub.add_parser("backup", help="Generar el respaldo en texto")
+    p.add_argument("--gzip", action="store_true")
+    p.add_argument("--incremental", action="store_true")
+    p.set_defaults(funcion=comando_backup)
+
+    p = sub.add_parser("export", help="Exportar todos los clientes a CSV/JSONL por partes, en paralelo (con manifiesto)")
+    p.add_argument("--formato", choices=exportador.FORMATOS, default="csv")
+    p.add_argument("--gzip", action="store_true")
+    p.add_argument("--fragmentos", type=int, help="Cantidad de partes (por defecto, el doble de procesos)")
+    p.add_argument("--procesos", type=int, help="Procesos en paralelo (por defecto, uno por CPU)")
+    p.add_argument("--directorio", help="Directorio de salida (por defecto, exportaciones/exportacion_<fecha>)")
+    p.set_defaults(funcion=comando_export)
+
+    p = sub.add_parser("sync", help="Actualizar la copia de respaldo SQLite con los cambios desde la sincronización anterior")
+    p.add_argument("--replica", help="Archivo de la copia (por defecto, respaldo_clientes.db)")
+    p.add_argument("--sin-compactar", action="store_true", help="No compactar el registro de cambios al terminar")
+    p.set_defaults(funcion=comando_sync)
+
+    p = sub.add_parser("report", help="Reporte de gestión (por fuero, tipo de caso, edad y mes)")
+    p.set_defaults(funcion=comando_report)
+
+    p = sub.add_parser("batch", help="Ejecutar un archivo de comandos (uno por línea) en una sola transacción")
+    p.add_argument("archivo", help="Archivo de comandos; '-' para leer de la entrada estándar")
+    p.add_argument("--todo-o-nada", action="store_true", help="Deshacer todo el lote si algún comando falla")
+    p.set_defaults(funcion=None)
+    return parser
+
+
+class _SalidaMensajes(io.TextIOBase):
+    """Reenvía a stderr lo que imprimen las funciones de base_de_datos y recuerda si imprimieron algo."""
+
+    def __init__(self):
+        self.hubo_mensajes = False
+
+    def write(self, texto):
+        self.hubo_mensajes = self.hubo_mensajes or bool(texto.strip())
+        return sys.stderr.write(texto)
+
+    def flush(self):
+        sys.stderr.flush()
+
+def _recorrer_listado(listado):
+    """
+    Genera los clientes de un listado leyendo cada uno con stdout redirigido a stderr: las páginas se leen
+    a medida que se recorre, fuera de _ejecutar, y sus mensajes no deben mezclarse con la salida.
+    Las lecturas solo imprimen ante un error (y retornan una página vacía), así que si hubo mensajes
+    el listado quedó incompleto y se lanza ErrorComando al terminar.
+    """
+    mensajes = _SalidaMensajes()
+    iterador = iter(listado)
+    fin = object()
+    while True:
+        with contextlib.redirect_stdout(mensajes):
+            cliente = next(iterador, fin)
+        if cliente is fin:
+            break
+        yield cliente
+    if mensajes.hubo_mensajes:
+        raise ErrorComando("Error de base de datos al leer el listado: el resultado está incompleto")
+
+def _ejecutar(args):
+    """
+    Ejecuta un comando y retorna (ok, resultado, error). Los mensajes que imprimen las funciones
+    de base_de_datos se envían a stderr para no mezclarse con la salida. Fuera de un lote, los listados
+    se retornan como generador y se leen al imprimirlos (ver _recorrer_listado).
+    """
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            resultado = args.funcion(args)
+            if not isinstance(resultado, dict):
+                resultado = _recorrer_listado(resultado)
+                resultado = list(resultado) if args.modo_lote else resultado
+        return True, resultado, None
+    except ErrorComando as e:
+        return False, None, str(e)
+
+def _imprimir(args, ok, resultado, error):
+    """
+    Muestra el resultado de un comando como texto o como JSON. Retorna False si el comando falló,
+    incluido un listado que se interrumpió por un error de base de datos después de imprimir parte.
+    """
+    if not ok:
+        if args.json:
+            print(json.dumps({"ok": False, "error": error}, ensure_ascii=False))
+        else:
+            print(Fore.RED + f"❌ {error}" + Style.RESET_ALL, file=sys.stderr)
+        return False
+    if isinstance(resultado, dict):
+        if args.json:
+            print(json.dumps({"ok": True, "resultado": resultado}, ensure_ascii=False))
+        elif args.comando == "report":
+            reportes.mostrar_reporte({**resultado, "por_tipo_de_caso": {
+                tuple(clave.split("/", 1)): cantidad for clave, cantidad in resultado["por_tipo_de_caso"].items()
+            }})
+        elif args.comando == "export":
+            exportador.mostrar_resumen_exportacion(resultado)
+        elif args.comando == "sync":
+            sincronizacion.mostrar_resumen_sincronizacion(resultado)
+        elif args.comando == "get":
+            for clave, valor in resultado.items():
+                print(f"{clave}: {valor if valor is not None else 'N/A'}")
+        else:
+            print(Fore.GREEN + "✔️  " + ", ".join(f"{clave}: {valor}" for clave, valor in resultado.items()) + Style.RESET_ALL)
+        return True
+    cantidad = 0
+    try:
+        for cliente in resultado: # Listados: se imprimen a medida que se leen
+            cantidad += 1
+            if args.json:
+                print(json.dumps(cliente, ensure_ascii=False))
+            else:
+                print(f"{cliente['ID']:>6}  {cliente['Nombre']} {cliente['Apellido']:<25} {cliente['Email']:<35} "
+                      f"{cliente['Fuero']} / {cliente['Tipo_de_caso']}")
+    except ErrorComando as e:
+        return _imprimir(args, False, None, str(e))
+    if not args.json:
+        print(Fore.MAGENTA + f"{cantidad} clientes." + Style.RESET_ALL)
+    return True
+
+def ejecutar_lote(parser, archivo, todo_o_nada=False):
+    """
+    Ejecuta los comandos del archivo (uno por línea, '#' para comentarios) en un solo proceso
+    y una sola transacción. Imprime una línea JSON por comando y un resumen final.
+    Retorna la cantidad de comandos fallidos.
+    """
+    fallidos = ejecutados = 0
+    entrada = sys.stdin if archivo == "-" else open(archivo, encoding="utf-8")
+    try:
+        with base_de_datos.transaccion():
+            for numero_linea, linea in enumerate(entrada, 1):
+                linea = linea.strip()
+                if not linea or linea.startswith("#"):
+                    continue
+                ejecutados += 1
+                try:
+                    args = parser.parse_args(shlex.split(linea))
+                    if args.funcion is None:
+                        raise ErrorComando("No se permite un lote dentro de otro lote")
+                    if args.comando in COMANDOS_FUERA_DE_LOTE:
+                        raise ErrorComando(
+                            f"'{args.comando}' no se permite dentro de un lote: lee la base fuera de la transacción "
+                            "del lote y no vería sus cambios. Ejecútelo después del lote."
+                        )
+                    args.modo_lote = True
+                    ok, resultado, error = _ejecutar(args)
+                except SystemExit: # argparse sale del programa ante argumentos inválidos
+                    ok, resultado, error = False, None, "Comando inválido"
+                except ErrorComando as e:
+                    ok, resultado, error = False, None, str(e)
+                fallidos += not ok
+                salida = {"linea": numero_linea, "comando": linea, "ok": ok}
+                salida.update({"resultado": resultado} if ok else {"error": error})
+                print(json.dumps(salida, ensure_ascii=False))
+            if todo_o_nada and fallidos:
+                raise ErrorComando(f"{fallidos} comandos fallaron; se deshizo el lote completo")
+    except ErrorComando as e:
+        base_de_datos.cache.limpiar() # La caché pudo guardar filas de la transacción deshecha
+        print(json.dumps({"ok": False, "error": str(e)}, ensure_ascii=False))
+        return fallidos
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+    print(json.dumps({"ok": fallidos == 0, "ejecutados": ejecutados, "fallidos": fallidos}, ensure_ascii=False))
+    return fallidos
+
+
+def _mostrar_metricas(args):
+    """Vuelca las métricas de la ejecución en stderr (JSON si se usó --json)."""
+    estadisticas = base_de_datos.estadisticas_rendimiento()
+    if args.json:
+        print(json.dumps({"metricas": estadisticas}, ensure_ascii=False), file=sys.stderr)
+    else:
+        with contextlib.redirect_stdout(sys.stderr):
+            metricas.mostrar_metricas(estadisticas, cache=estadisticas["cache"])
+
+def main(argv=None):
+    """Punto de entrada del modo línea de comandos. Retorna el código de salida."""
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if args.espera_bloqueo is not None:
+        base_de_datos.configurar_base_de_datos(pragmas={"busy_timeout": args.espera_bloqueo})
+    with contextlib.redirect_stdout(sys.stderr):
+        base_de_datos.inicializar_db()
+    try:
+        if args.comando == "batch":
+            return 1 if ejecutar_lote(parser, args.archivo, args.todo_o_nada) else 0
+        args.modo_lote = False
+        ok, resultado, error = _ejecutar(args)
+        return 0 if _imprimir(args, ok, resultado, error) else 1
+    finally:
+        if args.metricas:
+            _mostrar_metricas(args)
@@ -1,5 +1,6 @@
 # Main principal del CRUD ESTUDIO JURIDICO M&M y ASOCIADOS
 
+import sys
 from colorama import Fore, Style
 from utilidades_funciones import limpiar_pantalla, pedir_numero_entero, registrar_opcion, mostrar_opciones_seleccionadas
 import gestor_clientes # Importa el módulo gestor_clientes
@@ -8,9 +9,6 @@ import base_de_datos # Importa el módulo de la base de datos
 # Contraseña 🔐 para la opción 5 del MENU principal 
 PASSWORD_ADMIN = "1234"
 
-# Lista para registrar las opciones seleccionadas por el usuario durante la sesión
-opciones_seleccionadas = []
-
 def menu():
     """Función principal que ejecuta el menú interactivo del CRUD."""
     base_de_datos.inicializar_db() # Inicializa la base de datos al inicio
@@ -33,25 +31,25 @@ def menu():
 
         match opcion_int:
             case 1:
-                gestor_clientes.agregar_cliente(opciones_seleccionadas)
+                gestor_clientes.agregar_cliente()
             case 2:
-                registrar_opcion("Buscar cliente por ID/Email", opciones_seleccionadas_list=opciones_seleccionadas)
+                registrar_opcion("Buscar cliente por ID/Email")
                 gestor_clientes.buscar_cliente()
             case 3:
-                registrar_opcion("Actualizar cliente", opciones_seleccionadas_list=opciones_seleccionadas)
+                registrar_opcion("Actualizar cliente")
                 gestor_clientes.actualizar_cliente()
             case 4:
-                registrar_opcion("Eliminar cliente", opciones_seleccionadas_list=opciones_seleccionadas)
+                registrar_opcion("Eliminar cliente")
                 gestor_clientes.eliminar_cliente()
             case 5:
                 # submenú en gestor_clientes
-                gestor_clientes.menu_mostrar_clientes(PASSWORD_ADMIN, opciones_seleccionadas)
+                gestor_clientes.menu_mostrar_clientes(PASSWORD_ADMIN)
             case 6:
-                registrar_opcion("Buscar por fuero", opciones_seleccionadas_list=opciones_seleccionadas)
+                registrar_opcion("Buscar por fuero")
                 gestor_clientes.buscar_por_fuero()
             case 7:
-                registrar_opcion("Mostrar historial de acciones", opciones_seleccionadas_list=opciones_seleccionadas)
-                mostrar_opciones_seleccionadas(opciones_seleccionadas)
+                registrar_opcion("Mostrar historial de acciones")
+                mostrar_opciones_seleccionadas()
             case 8:
                 print(Fore.CYAN + "\nSaliendo del programa 👋. Gracias por su consulta!" + Style.RESET_ALL)
                 print(Fore.CYAN + "Sus datos aportados estan protegidos segun Ley 25.326." + Style.RESET_ALL)
@@ -63,6 +61,9 @@ def menu():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1: # Con argumentos: modo línea de comandos (ver 'python main.py --help')
+        import linea_de_comandos
+        sys.exit(linea_de_comandos.main())
     menu()
 
     
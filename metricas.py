@@ -0,0 +1,336 @@
+# Métricas de rendimiento de la base de datos y registro de consultas lentas
+
+import bisect
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from colorama import Fore, Style
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVO_CONSULTAS_LENTAS = os.path.join(BASE_DIR, "consultas_lentas.log")
+UMBRAL_CONSULTA_LENTA_MS = 100 # Las sentencias que tardan más que esto se registran con su plan de ejecución
+CONSULTAS_LENTAS_EN_MEMORIA = 50
+
+# Límites superiores (en ms) de los intervalos de los histogramas de latencia
+LIMITES_HISTOGRAMA_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_SENTENCIAS_CON_PLAN = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+class Histograma:
+    """Cantidad de observaciones por intervalo de latencia, más suma, mínimo y máximo (en ms)."""
+
+    def __init__(self):
+        self.intervalos = [0] * (len(LIMITES_HISTOGRAMA_MS) + 1) # El último es "más de 10 s"
+        self.cantidad = 0
+        self.suma_ms = 0.0
+        self.minimo_ms = None
+        self.maximo_ms = 0.0
+
+    def observar(self, ms):
+        self.intervalos[bisect.bisect_left(LIMITES_HISTOGRAMA_MS, ms)] += 1
+        self.cantidad += 1
+        self.suma_ms += ms
+        self.minimo_ms = ms if self.minimo_ms is None else min(self.minimo_ms, ms)
+        self.maximo_ms = max(self.maximo_ms, ms)
+
+    def percentil(self, porcentaje):
+        """Percentil aproximado: límite superior del intervalo que lo contiene (acotado por el máximo observado)."""
+        if not self.cantidad:
+            return None
+        objetivo, acumulado = self.cantidad * porcentaje / 100, 0
+        for indice, cantidad in enumerate(self.intervalos):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                break
+        limite = LIMITES_HISTOGRAMA_MS[indice] if indice < len(LIMITES_HISTOGRAMA_MS) else self.maximo_ms
+        return min(limite, self.maximo_ms)
+
+    def resumen(self):
+        return {
+            "cantidad": self.cantidad,
+            "total_ms": round(self.suma_ms, 3),
+            "media_ms": round(self.suma_ms / self.cantidad, 3) if self.cantidad else None,
+            "p50_ms": self.percentil(50), "p95_ms": self.percentil(95), "p99_ms": self.percentil(99),
+            "min_ms": self.minimo_ms, "max_ms": self.maximo_ms,
+        }
+
+
+class RegistroMetricas:
+    """
+    Registro en memoria de contadores e histogramas, identificados por nombre (ej. 'sql.obtener_cliente_por_id').
+    Es seguro entre hilos. Con `activo = False` las conexiones dejan de medir (sin costo extra).
+    """
+
+    def __init__(self):
+        self.activo = True
+        self.umbral_lento_ms = UMBRAL_CONSULTA_LENTA_MS
+        self.archivo_consultas_lentas = ARCHIVO_CONSULTAS_LENTAS
+        self._contadores = {}
+        self._histogramas = {}
+        self._consultas_lentas = deque(maxlen=CONSULTAS_LENTAS_EN_MEMORIA)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def incrementar(self, nombre, cantidad=1):
+        with self._lock:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+
+    def observar(self, nombre, segundos):
+        with self._lock:
+            histograma = self._histogramas.get(nombre)
+            if histograma is None:
+                histograma = self._histogramas[nombre] = Histograma()
+            histograma.observar(segundos * 1000)
+
+    def registrar_sentencia(self, operacion, segundos, filas):
+        """Registra una sentencia SQL de `operacion` (histograma, cantidad de sentencias y filas) con un solo bloqueo."""
+        with self._lock:
+            histograma = self._histogramas.get(f"sql.{operacion}")
+            if histograma is None:
+                histograma = self._histogramas[f"sql.{operacion}"] = Histograma()
+            histograma.observar(segundos * 1000)
+            clave = f"sql.{operacion}.sentencias"
+            self._contadores[clave] = self._contadores.get(clave, 0) + 1
+            if filas:
+                clave = f"sql.{operacion}.filas"
+                self._contadores[clave] = self._contadores.get(clave, 0) + filas
+
+    @property
+    def operacion_actual(self):
+        """Función de base_de_datos que se está ejecutando en este hilo (para agrupar las sentencias SQL)."""
+        return getattr(self._local, "operacion", None) or "otras"
+
+    def registrar_consulta_lenta(self, operacion, sql, parametros, ms, filas, plan):
+        entrada = {
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "operacion": operacion, "ms": round(ms, 3), "filas": filas,
+            "sql": " ".join(sql.split()), "parametros": [p if isinstance(p, (int, float, str)) or p is None else repr(p) for p in (
+                parametros.values() if isinstance(parametros, dict) else parametros
+            )],
+            "plan": plan,
+        }
+        with self._lock:
+            self._consultas_lentas.append(entrada)
+            self._contadores["sql.consultas_lentas"] = self._contadores.get("sql.consultas_lentas", 0) + 1
+        if self.archivo_consultas_lentas:
+            try:
+                with open(self.archivo_consultas_lentas, "a", encoding="utf-8") as archivo:
+                    archivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            except OSError:
+                pass # El registro de consultas lentas nunca debe interrumpir la operación
+
+    def consultas_lentas(self):
+        with self._lock:
+            return list(self._consultas_lentas)
+
+    def instantanea(self):
+        """Copia de todas las métricas como diccionario (serializable a JSON)."""
+        with self._lock:
+            return {
+                "contadores": dict(sorted(self._contadores.items())),
+                "histogramas": {nombre: h.resumen() for nombre, h in sorted(self._histogramas.items())},
+                "consultas_lentas": list(self._consultas_lentas),
+            }
+
+    def reiniciar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+            self._consultas_lentas.clear()
+
+
+# Registro global usado por base_de_datos y por las conexiones del pool
+registro = RegistroMetricas()
+
+def configurar(activo=None, umbral_lento_ms=None, archivo_consultas_lentas=False):
+    """Activa/desactiva la medición, cambia el umbral de consulta lenta o el archivo (None = solo en memoria)."""
+    if activo is not None:
+        registro.activo = activo
+    if umbral_lento_ms is not None:
+        registro.umbral_lento_ms = umbral_lento_ms
+    if archivo_consultas_lentas is not False:
+        registro.archivo_consultas_lentas = archivo_consultas_lentas
+
+def medir(funcion):
+    """
+    Decorador para las funciones de base_de_datos: mide su duración total ('funcion.<nombre>')
+    y agrupa bajo su nombre las sentencias SQL que ejecuta ('sql.<nombre>').
+    """
+    nombre = funcion.__name__
+    metrica = f"funcion.{nombre}"
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if not registro.activo:
+            return funcion(*args, **kwargs)
+        local = registro._local
+        anterior = getattr(local, "operacion", None)
+        local.operacion = nombre
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            registro.observar(metrica, time.perf_counter() - inicio)
+            local.operacion = anterior
+    return envoltura
+
+def medir_evento(nombre, segundos):
+    """Callback del pool de conexiones ('conexion.adquisicion', 'transaccion.espera_bloqueo', 'transaccion.commit', ...)."""
+    if registro.activo:
+        registro.observar(nombre, segundos)
+
+def contar_evento(nombre, cantidad=1):
+    """Callback del pool y de la cola de escritura para contadores (reintentos por bloqueo, lotes, escrituras)."""
+    if registro.activo:
+        registro.incrementar(nombre, cantidad)
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """
+    Cursor que mide cada sentencia desde execute() hasta que se leen todas sus filas
+    (o hasta la próxima sentencia / cierre del cursor) y cuenta las filas devueltas.
+    """
+    _sql = None
+
+    def _iniciar(self, sql, parametros, muchos=False):
+        self._terminar()
+        self._sql, self._parametros, self._segundos, self._filas = sql, parametros, 0.0, 0
+        self._muchos = muchos
+        self._operacion = registro.operacion_actual
+
+    def _terminar(self):
+        sql, self._sql = self._sql, None
+        if sql is None:
+            return
+        registro.registrar_sentencia(self._operacion, self._segundos, self._filas)
+        ms = self._segundos * 1000
+        if ms >= registro.umbral_lento_ms:
+            # En executemany solo se registra la cantidad de filas de parámetros, no todas
+            parametros = [f"{len(self._parametros)} filas (executemany)"] if self._muchos else self._parametros
+            registro.registrar_consulta_lenta(self._operacion, sql, parametros, ms, self._filas, self._plan(sql))
+
+    def _plan(self, sql):
+        if self._muchos or not sql.lstrip().upper().startswith(_SENTENCIAS_CON_PLAN):
+            return None
+        try: # Cursor sin instrumentar, para no medir el propio EXPLAIN
+            filas = sqlite3.Cursor(self.connection).execute(f"EXPLAIN QUERY PLAN {sql}", self._parametros).fetchall()
+            return [fila[-1] for fila in filas]
+        except sqlite3.Error:
+            return None
+
+    def execute(self, sql, parametros=()):
+        if not registro.activo:
+            return super().execute(sql, parametros)
+        self._iniciar(sql, parametros)
+        inicio = time.perf_counter()
+        try:
+            super().execute(sql, parametros)
+        finally:
+            self._segundos += time.perf_counter() - inicio
+            if self.description is None: # Sin filas para leer (INSERT, UPDATE, BEGIN...): la sentencia ya terminó
+                self._terminar()
+        return self
+
+    def executemany(self, sql, secuencia):
+        if not registro.activo:
+            return super().executemany(sql, secuencia)
+        secuencia = list(secuencia)
+        self._iniciar(sql, secuencia, muchos=True)
+        inicio = time.perf_counter()
+        try:
+            super().executemany(sql, secuencia)
+        finally:
+            self._segundos += time.perf_counter() - inicio
+            self._terminar()
+        return self
+
+    def _leer(self, lectura, *args):
+        if self._sql is None:
+            return lectura(*args)
+        inicio = time.perf_counter()
+        try:
+            return lectura(*args)
+        finally:
+            self._segundos += time.perf_counter() - inicio
+
+    def fetchone(self):
+        fila = self._leer(super().fetchone)
+        if self._sql is not None:
+            if fila is None:
+                self._terminar()
+            else:
+                self._filas += 1
+        return fila
+
+    def fetchmany(self, size=None):
+        filas = self._leer(super().fetchmany, self.arraysize if size is None else size)
+        if self._sql is not None:
+            self._filas += len(filas)
+            if not filas:
+                self._terminar()
+        return filas
+
+    def fetchall(self):
+        filas = self._leer(super().fetchall)
+        if self._sql is not None:
+            self._filas += len(filas)
+            self._terminar()
+        return filas
+
+    def __next__(self):
+        fila = self.fetchone()
+        if fila is None:
+            raise StopIteration
+        return fila
+
+    def close(self):
+        self._terminar()
+        super().close()
+
+    def __del__(self):
+        if self._sql is not None:
+            self._terminar()
+
+
+class ConexionInstrumentada(sqlite3.Connection):
+    """Conexión cuyos cursores (incluidos los de conn.execute) son CursorInstrumentado."""
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, secuencia):
+        return self.cursor().executemany(sql, secuencia)
+
+
+def mostrar_metricas(datos=None, cache=None):
+    """Imprime las métricas (las del registro global si no se pasan) y, opcionalmente, las de la caché."""
+    datos = datos or registro.instantanea()
+    if not datos["histogramas"] and not datos["contadores"]:
+        print(Fore.YELLOW + "⚠️ Todavía no hay métricas registradas en esta sesión." + Style.RESET_ALL)
+    else:
+        print(Fore.MAGENTA + f"{'Métrica':<45} {'cant.':>7} {'media ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>9}" + Style.RESET_ALL)
+        for nombre, h in datos["histogramas"].items():
+            print(f"{nombre:<45} {h['cantidad']:>7} {h['media_ms']:>9.3f} {h['p50_ms']:>8.2f} {h['p95_ms']:>8.2f} {h['p99_ms']:>8.2f} {h['max_ms']:>9.2f}")
+        if datos["contadores"]:
+            print(Fore.MAGENTA + "\nContadores:" + Style.RESET_ALL)
+            for nombre, valor in datos["contadores"].items():
+                print(f"   {nombre:<42} {valor:>10}")
+    if cache:
+        print(Fore.MAGENTA + "\nCaché de clientes:" + Style.RESET_ALL)
+        for nombre, valor in cache.items():
+            print(f"   {nombre:<42} {valor:>10}")
+    lentas = datos["consultas_lentas"]
+    if lentas:
+        print(Fore.YELLOW + f"\n⚠️  Últimas consultas lentas (más de {registro.umbral_lento_ms} ms):" + Style.RESET_ALL)
+        for entrada in lentas[-10:]:
+            print(f"   [{entrada['fecha']}] {entrada['operacion']}: {entrada['ms']:.1f} ms, {entrada['filas']} filas")
+            print(f"      {entrada['sql'][:150]}  {entrada['parametros'][:8]}")
+            for paso in entrada["plan"] or []:
+                print(f"      -> {paso}")
@@ -0,0 +1,327 @@
+# Migraciones versionadas del esquema (PRAGMA user_version)
+
+import sqlite3
+import sys
+from colorama import Fore, Style
+import base_de_datos
+import metricas
+
+
+def _migracion_1_tabla_clientes(conn):
+    """Crea la tabla 'clientes' y agrega las columnas que faltan en bases de datos antiguas."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS clientes (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Nombre TEXT NOT NULL,
+            Apellido TEXT NOT NULL,
+            Edad INTEGER,
+            Email TEXT UNIQUE NOT NULL,
+            Telefono TEXT NOT NULL,
+            Fuero TEXT NOT NULL,
+            Tipo_de_caso TEXT NOT NULL,
+            Fecha_registro TEXT
+        )
+    ''')
+    columnas = {fila["name"] for fila in conn.execute("PRAGMA table_info(clientes)")}
+    if "Fecha_registro" not in columnas:
+        conn.execute("ALTER TABLE clientes ADD COLUMN Fecha_registro TEXT")
+    if "Edad" not in columnas:
+        conn.execute("ALTER TABLE clientes ADD COLUMN Edad INTEGER")
+
+
+def _migracion_2_indices(conn):
+    """Índices secundarios para los filtros más usados."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_fuero ON clientes (Fuero)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_edad ON clientes (Edad)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_fecha_registro ON clientes (Fecha_registro)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_fuero_tipo ON clientes (Fuero, Tipo_de_caso)")
+
+
+def _migracion_3_busqueda_texto(conn):
+    """
+    Tabla FTS5 (contenido externo sobre 'clientes') para búsqueda por texto y prefijos,
+    mantenida por triggers. Si SQLite no tiene FTS5 la búsqueda usa LIKE como alternativa.
+    """
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts USING fts5(
+                Nombre, Apellido, Email, Telefono, Tipo_de_caso,
+                content='clientes', content_rowid='ID',
+                tokenize="unicode61 remove_diacritics 2", prefix='2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        if "fts5" not in str(e):
+            raise
+        print(Fore.YELLOW + "⚠️ SQLite sin soporte FTS5: la búsqueda por texto usará LIKE." + Style.RESET_ALL)
+        return
+    columnas = "Nombre, Apellido, Email, Telefono, Tipo_de_caso"
+    nuevos = "new.ID, new.Nombre, new.Apellido, new.Email, new.Telefono, new.Tipo_de_caso"
+    viejos = "'delete', old.ID, old.Nombre, old.Apellido, old.Email, old.Telefono, old.Tipo_de_caso"
+    # executescript haría COMMIT de la transacción de la migración, por eso se crea cada trigger por separado
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_ai AFTER INSERT ON clientes BEGIN
+            INSERT INTO clientes_fts(rowid, {columnas}) VALUES ({nuevos});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_ad AFTER DELETE ON clientes BEGIN
+            INSERT INTO clientes_fts(clientes_fts, rowid, {columnas}) VALUES ({viejos});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_au AFTER UPDATE ON clientes BEGIN
+            INSERT INTO clientes_fts(clientes_fts, rowid, {columnas}) VALUES ({viejos});
+            INSERT INTO clientes_fts(rowid, {columnas}) VALUES ({nuevos});
+        END
+    ''')
+    # Ranking: coincidencias en nombre y apellido pesan más que en email, teléfono o tipo de caso
+    conn.execute("INSERT INTO clientes_fts(clientes_fts, rank) VALUES ('rank', 'bm25(10.0, 10.0, 4.0, 2.0, 1.0)')")
+    conn.execute("INSERT INTO clientes_fts(clientes_fts) VALUES ('rebuild')") # Indexa los clientes existentes
+
+
+def _migracion_4_auditoria(conn):
+    """Historial de acciones persistente (solo se agregan filas), con índices por fecha, acción y cliente."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS auditoria (
+            ID INTEGER PRIMARY KEY,
+            Fecha TEXT NOT NULL,
+            Accion TEXT NOT NULL,
+            Cliente_ID INTEGER,
+            Datos TEXT,
+            Sesion TEXT
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_auditoria_fecha ON auditoria (Fecha)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_auditoria_accion_fecha ON auditoria (Accion, Fecha)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_auditoria_cliente_fecha ON auditoria (Cliente_ID, Fecha) WHERE Cliente_ID IS NOT NULL")
+
+
+def _migracion_5_claves_duplicados(conn):
+    """
+    Índice de bloqueo para detectar clientes duplicados (ver duplicados.py): claves fonéticas y trigramas
+    del nombre. Las claves se calculan en Python; los triggers solo encolan en 'clientes_claves_pendientes'
+    los clientes nuevos, modificados o eliminados, junto con el nombre anterior para borrar sus claves viejas
+    por clave primaria (así no hace falta un índice secundario por Cliente_ID).
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS clientes_claves (
+            Clave TEXT NOT NULL,
+            Cliente_ID INTEGER NOT NULL,
+            PRIMARY KEY (Clave, Cliente_ID)
+        ) WITHOUT ROWID
+    ''')
+    # INSERT OR IGNORE conserva el primer nombre anterior encolado, que es el que tiene claves en el índice
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS clientes_claves_pendientes (
+            Cliente_ID INTEGER PRIMARY KEY,
+            Nombre_anterior TEXT,
+            Apellido_anterior TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS clientes_claves_ai AFTER INSERT ON clientes BEGIN
+            INSERT OR IGNORE INTO clientes_claves_pendientes (Cliente_ID) VALUES (new.ID);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS clientes_claves_au AFTER UPDATE OF Nombre, Apellido ON clientes
+        WHEN old.Nombre IS NOT new.Nombre OR old.Apellido IS NOT new.Apellido BEGIN
+            INSERT OR IGNORE INTO clientes_claves_pendientes VALUES (old.ID, old.Nombre, old.Apellido);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS clientes_claves_ad AFTER DELETE ON clientes BEGIN
+            INSERT OR IGNORE INTO clientes_claves_pendientes VALUES (old.ID, old.Nombre, old.Apellido);
+        END
+    ''')
+    # Los clientes existentes quedan pendientes: sus claves se calculan en la primera consulta de duplicados
+    conn.execute("INSERT OR IGNORE INTO clientes_claves_pendientes (Cliente_ID) SELECT ID FROM clientes")
+
+
+def _migracion_6_registro_cambios(conn):
+    """
+    Registro de cambios (CDC) de 'clientes' para sincronizar copias sin releer toda la tabla (ver sincronizacion.py).
+    Los triggers anotan solo la operación y el ID: el lector toma la fila actual de 'clientes'. AUTOINCREMENT
+    garantiza que la secuencia no se reutilice aunque la compactación borre los cambios más recientes.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS clientes_cambios (
+            Secuencia INTEGER PRIMARY KEY AUTOINCREMENT,
+            Operacion TEXT NOT NULL CHECK (Operacion IN ('I', 'U', 'D')),
+            Cliente_ID INTEGER NOT NULL
+        )
+    ''')
+    # Posición de cada lector registrado; NULL indica que la compactación descartó cambios que no leyó
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS clientes_cambios_consumidores (
+            Consumidor TEXT PRIMARY KEY,
+            Secuencia INTEGER,
+            Fecha TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS clientes_cambios_ai AFTER INSERT ON clientes BEGIN
+            INSERT INTO clientes_cambios (Operacion, Cliente_ID) VALUES ('I', new.ID);
+        END
+    ''')
+    # Las actualizaciones que no cambian ningún valor no se registran
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS clientes_cambios_au AFTER UPDATE ON clientes
+        WHEN (old.Nombre, old.Apellido, old.Edad, old.Email, old.Telefono, old.Fuero, old.Tipo_de_caso, old.Fecha_registro)
+             IS NOT (new.Nombre, new.Apellido, new.Edad, new.Email, new.Telefono, new.Fuero, new.Tipo_de_caso, new.Fecha_registro)
+        BEGIN
+            INSERT INTO clientes_cambios (Operacion, Cliente_ID) VALUES ('U', new.ID);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS clientes_cambios_ad AFTER DELETE ON clientes BEGIN
+            INSERT INTO clientes_cambios (Operacion, Cliente_ID) VALUES ('D', old.ID);
+        END
+    ''')
+    # Los clientes existentes no se registran: un lector nuevo empieza con una copia completa
+
+
+def _crear_triggers_claves(conn):
+    """
+    Triggers que encolan en 'clientes_claves_pendientes' las altas, los cambios de nombre y las bajas.
+    Solo se encola si el cliente no estaba pendiente: así se conserva el primer nombre anterior, que es el que
+    tiene claves en el índice. Se usa WHERE NOT EXISTS y no INSERT OR IGNORE porque dentro de un trigger SQLite
+    aplica la política de conflicto de la sentencia externa: en un upsert (ON CONFLICT DO UPDATE) el OR IGNORE
+    no rige y la fila repetida aborta el upsert.
+    """
+    no_pendiente = "WHERE NOT EXISTS (SELECT 1 FROM clientes_claves_pendientes WHERE Cliente_ID = {}.ID)"
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS clientes_claves_ai AFTER INSERT ON clientes BEGIN
+            INSERT INTO clientes_claves_pendientes (Cliente_ID) SELECT new.ID {no_pendiente.format("new")};
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS clientes_claves_au AFTER UPDATE OF Nombre, Apellido ON clientes
+        WHEN old.Nombre IS NOT new.Nombre OR old.Apellido IS NOT new.Apellido BEGIN
+            INSERT INTO clientes_claves_pendientes SELECT old.ID, old.Nombre, old.Apellido {no_pendiente.format("old")};
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS clientes_claves_ad AFTER DELETE ON clientes BEGIN
+            INSERT INTO clientes_claves_pendientes SELECT old.ID, old.Nombre, old.Apellido {no_pendiente.format("old")};
+        END
+    ''')
+
+
+def _migracion_7_triggers_claves_upsert(conn):
+    """
+    Recrea los triggers de claves de duplicados de la migración 5. Las versiones anteriores usaban INSERT OR IGNORE,
+    que en un upsert hereda el ON CONFLICT de la sentencia externa y hacía fallar el cambio de nombre de un cliente
+    que ya estaba pendiente.
+    """
+    for trigger in ("clientes_claves_ai", "clientes_claves_au", "clientes_claves_ad"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    _crear_triggers_claves(conn)
+
+
+# Lista ordenada de migraciones: (versión, descripción, función que recibe la conexión).
+# Para cambiar el esquema se agrega una migración nueva al final; nunca se modifican las anteriores.
+MIGRACIONES = [
+    (1, "Tabla clientes", _migracion_1_tabla_clientes),
+    (2, "Índices por Fuero, Edad, Fecha_registro y (Fuero, Tipo_de_caso)", _migracion_2_indices),
+    (3, "Búsqueda por texto (FTS5)", _migracion_3_busqueda_texto),
+    (4, "Historial de acciones (auditoría)", _migracion_4_auditoria),
+    (5, "Claves para detectar clientes duplicados", _migracion_5_claves_duplicados),
+    (6, "Registro de cambios para sincronización y respaldos diferenciales", _migracion_6_registro_cambios),
+    (7, "Triggers de claves de duplicados compatibles con upsert", _migracion_7_triggers_claves_upsert),
+]
+
+VERSION_ACTUAL = MIGRACIONES[-1][0]
+
+
+def version_esquema(conn):
+    """Retorna la versión de esquema guardada en la base de datos."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+@metricas.medir
+def aplicar_migraciones():
+    """
+    Aplica, cada una en su propia transacción, las migraciones con versión mayor a la guardada.
+    Si el esquema ya está al día solo se lee PRAGMA user_version. Retorna la lista de versiones aplicadas.
+    """
+    with base_de_datos.conexion() as conn:
+        if version_esquema(conn) >= VERSION_ACTUAL:
+            return []
+
+    aplicadas = []
+    for version, descripcion, migrar in MIGRACIONES:
+        with base_de_datos.transaccion() as conn:
+            if version_esquema(conn) >= version: # Otra sesión pudo haberla aplicado
+                continue
+            migrar(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+        aplicadas.append(version)
+        print(Fore.CYAN + f"🔧 Migración {version} aplicada: {descripcion}" + Style.RESET_ALL)
+    return aplicadas
+
+
+# Consultas de base_de_datos cuyo plan se verifica (parámetros de ejemplo)
+_PROYECCION = base_de_datos.SELECT_CLIENTES
+CONSULTAS_PLAN = {
+    "obtener_cliente_por_id": (f'{_PROYECCION} WHERE ID = ?', (1,)),
+    "obtener_cliente_por_email": (f'{_PROYECCION} WHERE Email = ?', ("cliente@ejemplo.com",)),
+    "existe_cliente (email)": ('SELECT 1 FROM clientes WHERE Email = ? LIMIT 1', ("cliente@ejemplo.com",)),
+    "obtener_pagina_clientes": (f'{_PROYECCION} WHERE ID > ? ORDER BY ID ASC LIMIT ?', (0, 20)),
+    "buscar_clientes_por_fuero": (f'{_PROYECCION} WHERE ID > ? AND Fuero = ? ORDER BY ID ASC LIMIT ?', (0, "Civil", 500)),
+    "obtener_clientes_mayores_de_edad": (f'{_PROYECCION} WHERE ID > ? AND Edad >= ? ORDER BY ID ASC LIMIT ?', (0, 18, 500)),
+    "obtener_clientes_menores_de_edad": (f'{_PROYECCION} WHERE ID > ? AND Edad <= ? ORDER BY ID ASC LIMIT ?', (0, 17, 500)),
+    "buscar_clientes_texto": (
+        f'{_PROYECCION} JOIN clientes_fts ON clientes.ID = clientes_fts.rowid '
+        'WHERE clientes_fts MATCH ? ORDER BY rank LIMIT ?',
+        ('"per"*', 20)
+    ),
+    "contar_clientes (fuero)": ('SELECT COUNT(*) FROM clientes WHERE Fuero = ?', ("Civil",)),
+    "contar_clientes (edad)": ('SELECT COUNT(*) FROM clientes WHERE Edad >= ?', (18,)),
+    "contar_clientes (fuero y tipo)": ('SELECT COUNT(*) FROM clientes WHERE Fuero = ? AND Tipo_de_caso = ?', ("Civil", "Reclamos")),
+    "clientes por fecha de registro": ('SELECT ID FROM clientes WHERE Fecha_registro > ? ORDER BY Fecha_registro', ("2025-01-01T00:00:00",)),
+    "actualizar_cliente_db": ('UPDATE clientes SET Nombre = ? WHERE ID = ?', ("X", 1)),
+    "eliminar_cliente_db": ('DELETE FROM clientes WHERE ID = ?', (1,)),
+    "historial por acción": ('SELECT * FROM auditoria WHERE Accion = ? ORDER BY Fecha DESC, ID DESC LIMIT ?', ("Agregar cliente", 20)),
+    "historial por cliente": ('SELECT * FROM auditoria WHERE Cliente_ID = ? ORDER BY Fecha DESC, ID DESC LIMIT ?', (1, 20)),
+    "historial por fechas": (
+        'SELECT * FROM auditoria WHERE Fecha >= ? AND Fecha < ? ORDER BY Fecha DESC, ID DESC LIMIT ?',
+        ("2025-01-01", "2025-02-01", 20)
+    ),
+    "posibles duplicados (claves)": (
+        'SELECT Cliente_ID FROM clientes_claves WHERE Clave IN (?, ?) GROUP BY Cliente_ID HAVING COUNT(*) >= ?',
+        ("t:rqu", "t:uez", 2)
+    ),
+    "posibles duplicados (bloques)": (
+        "SELECT Clave FROM clientes_claves WHERE Clave >= 'f:' AND Clave < 'f;' GROUP BY Clave HAVING COUNT(*) > 1", ()
+    ),
+    "cambios desde una secuencia": (
+        'SELECT clientes_cambios.Secuencia, clientes_cambios.Operacion, clientes.ID, clientes.Nombre FROM clientes_cambios '
+        'LEFT JOIN clientes ON clientes.ID = clientes_cambios.Cliente_ID '
+        'WHERE clientes_cambios.Secuencia > ? ORDER BY clientes_cambios.Secuencia LIMIT ?',
+        (0, 1000)
+    ),
+}
+
+
+def mostrar_planes_consulta():
+    """Imprime el EXPLAIN QUERY PLAN de cada consulta de CONSULTAS_PLAN para confirmar el uso de índices."""
+    try:
+        with base_de_datos.conexion() as conn:
+            for nombre, (sql, parametros) in CONSULTAS_PLAN.items():
+                print(Fore.BLUE + f"\n{nombre}" + Style.RESET_ALL)
+                for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parametros):
+                    detalle = fila["detail"]
+                    color = Fore.YELLOW if detalle.startswith("SCAN") or "TEMP B-TREE" in detalle else Fore.GREEN
+                    print("   " + color + detalle + Style.RESET_ALL)
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al obtener los planes de consulta: {e}" + Style.RESET_ALL)
+
+
+if __name__ == "__main__":
+    base_de_datos.inicializar_db()
+    if "--planes" in sys.argv:
+        mostrar_planes_consulta()
+    if "--reconstruir-busqueda" in sys.argv:
+        base_de_datos.reconstruir_indice_busqueda()
@@ -0,0 +1,60 @@
+# Registro compacto de cliente
+
+import datetime
+from collections import namedtuple
+
+# Columnas de la tabla 'clientes', en el orden en que se seleccionan
+COLUMNAS_CLIENTE = ("ID", "Nombre", "Apellido", "Edad", "Email", "Telefono", "Fuero", "Tipo_de_caso", "Fecha_registro")
+
+
+def formatear_fecha_registro(fecha_registro):
+    """Convierte 'AAAA-MM-DDTHH:MM:SS' en 'DD-MM-AAAA HH:MM:SS' (mismo formato que usaba strftime en SQL)."""
+    if not fecha_registro:
+        return None
+    if len(fecha_registro) >= 19 and fecha_registro[10] in "T ": # Caso habitual: se arma recortando el texto
+        return f"{fecha_registro[8:10]}-{fecha_registro[5:7]}-{fecha_registro[0:4]} {fecha_registro[11:19]}"
+    try:
+        return datetime.datetime.fromisoformat(fecha_registro).strftime("%d-%m-%Y %H:%M:%S")
+    except ValueError:
+        return None
+
+
+class Cliente(namedtuple("_ClienteBase", COLUMNAS_CLIENTE)):
+    """
+    Fila de la tabla 'clientes' como tupla con nombre (sin diccionario por instancia).
+    Es inmutable, se puede leer por atributo (cliente.Nombre) o por clave (cliente['Nombre'], cliente.get('Edad'))
+    y calcula Fecha_registro_formateada recién cuando se la pide.
+    """
+    __slots__ = ()
+
+    @property
+    def Fecha_registro_formateada(self):
+        return formatear_fecha_registro(self.Fecha_registro)
+
+    def __getitem__(self, clave):
+        if isinstance(clave, str):
+            try:
+                return getattr(self, clave)
+            except AttributeError:
+                raise KeyError(clave) from None
+        return super().__getitem__(clave)
+
+    def get(self, clave, defecto=None):
+        """Igual que dict.get: retorna el valor de la columna o `defecto` si no existe."""
+        return getattr(self, clave, defecto)
+
+    def keys(self):
+        """Nombres de columna (permite usar dict(cliente))."""
+        return self._fields
+
+    def a_dict(self, con_fecha_formateada=False):
+        """Retorna el cliente como diccionario (por ejemplo, para convertirlo a JSON)."""
+        datos = self._asdict()
+        if con_fecha_formateada:
+            datos["Fecha_registro_formateada"] = self.Fecha_registro_formateada
+        return datos
+
+
+def fabrica_cliente(cursor, fila):
+    """row_factory para consultas que seleccionan COLUMNAS_CLIENTE en orden: construye un Cliente por fila."""
+    return Cliente._make(fila)
@@ -0,0 +1,459 @@
+# Almacenamiento particionado por fuero: un archivo SQLite por fuero, adjuntados (ATTACH) a un índice global
+
+import argparse
+import datetime
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import time
+import unicodedata
+from colorama import Fore, Style
+import base_de_datos
+import metricas
+from gestor_clientes import tipos_por_fuero
+from modelo_cliente import COLUMNAS_CLIENTE, fabrica_cliente
+from pool_conexiones import PoolConexiones
+
+# Estructura del directorio:
+#   indice.db             clientes_indice(ID, Email, Fuero): asigna los ID y garantiza ID y Email únicos entre particiones
+#   clientes_<fuero>.db   tabla 'clientes' con los clientes de ese fuero (se adjunta como esquema p_<fuero>)
+# Cada conexión del pool abre el índice y adjunta todas las particiones; la vista temporal clientes_todos
+# las une con UNION ALL para las consultas globales. SQLite admite hasta 10 bases adjuntas por conexión.
+DIRECTORIO_PARTICIONES = os.path.join(base_de_datos.BASE_DIR, "particiones")
+NOMBRE_INDICE = "indice.db"
+VISTA_GLOBAL = "clientes_todos"
+VERSION_PARTICIONES = 1 # PRAGMA user_version del índice
+
+_COLUMNAS = ", ".join(COLUMNAS_CLIENTE)
+# PRAGMAs del pool que se aplican por archivo (el resto, como busy_timeout, son de la conexión)
+_PRAGMAS_POR_ESQUEMA = ("journal_mode", "synchronous", "cache_size", "mmap_size")
+
+
+def nombre_esquema(fuero):
+    """Nombre del esquema adjunto para un fuero: 'p_' + el fuero en minúsculas, sin tildes ni símbolos."""
+    texto = unicodedata.normalize("NFKD", fuero).encode("ascii", "ignore").decode("ascii")
+    return "p_" + re.sub(r"[^a-z0-9]+", "_", texto.lower()).strip("_")
+
+def ruta_particion(directorio, fuero):
+    return os.path.join(directorio, f"clientes_{nombre_esquema(fuero)[2:]}.db")
+
+
+class AlmacenParticionado:
+    """
+    Clientes repartidos en un archivo por fuero. Las lecturas de un fuero solo tocan su archivo y los
+    accesos por ID o Email se resuelven con el índice, que indica en qué partición está cada cliente.
+    Cada escritura actualiza el índice y la partición en la misma transacción. Con journal_mode WAL el
+    COMMIT es atómico por archivo, no entre archivos: si el proceso se corta en medio, verificar(reparar=True)
+    corrige las diferencias. Con pragmas={"journal_mode": "DELETE"} SQLite confirma los archivos en forma
+    atómica (super-journal), a cambio de que los lectores bloqueen a los escritores.
+    """
+
+    def __init__(self, directorio=None, fueros=None, tamano_pool=4, pragmas=None):
+        self.directorio = directorio or DIRECTORIO_PARTICIONES
+        self.esquemas = {fuero: nombre_esquema(fuero) for fuero in (fueros or tipos_por_fuero)}
+        os.makedirs(self.directorio, exist_ok=True)
+        self.pool = PoolConexiones(
+            os.path.join(self.directorio, NOMBRE_INDICE), tamano=tamano_pool, pragmas=pragmas,
+            factory=metricas.ConexionInstrumentada, al_medir=metricas.medir_evento, al_contar=metricas.contar_evento,
+            al_conectar=self._adjuntar_particiones
+        )
+
+    def _adjuntar_particiones(self, conn):
+        """Adjunta cada partición con los PRAGMAs del pool y crea la vista global (temporal, por conexión)."""
+        for fuero, esquema in self.esquemas.items():
+            conn.execute(f"ATTACH DATABASE ? AS {esquema}", (ruta_particion(self.directorio, fuero),))
+            for nombre in _PRAGMAS_POR_ESQUEMA:
+                if self.pool.pragmas.get(nombre) is not None:
+                    conn.execute(f"PRAGMA {esquema}.{nombre} = {self.pool.pragmas[nombre]}")
+        union = " UNION ALL ".join(f"SELECT {_COLUMNAS} FROM {esquema}.clientes" for esquema in self.esquemas.values())
+        conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {VISTA_GLOBAL} AS {union}")
+
+    def _esquema(self, fuero):
+        if fuero not in self.esquemas:
+            raise ValueError(f"El fuero '{fuero}' no tiene partición")
+        return self.esquemas[fuero]
+
+    def _tabla(self, fuero=None):
+        """Tabla a consultar: la de la partición del fuero, o la vista global si no se indica fuero."""
+        return VISTA_GLOBAL if fuero is None else f"{self._esquema(fuero)}.clientes"
+
+    def cerrar(self):
+        self.pool.cerrar()
+
+    def inicializar(self):
+        """Crea el índice y las tablas de cada partición si no existen. Retorna True si quedó listo."""
+        try:
+            with self.pool.transaccion() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS main.clientes_indice (
+                        ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                        Email TEXT UNIQUE NOT NULL,
+                        Fuero TEXT NOT NULL
+                    )
+                ''')
+                conn.execute("CREATE INDEX IF NOT EXISTS main.idx_clientes_indice_fuero ON clientes_indice (Fuero)")
+                for fuero, esquema in self.esquemas.items():
+                    # El ID lo asigna el índice; el CHECK impide guardar un cliente en la partición equivocada
+                    conn.execute(f'''
+                        CREATE TABLE IF NOT EXISTS {esquema}.clientes (
+                            ID INTEGER PRIMARY KEY,
+                            Nombre TEXT NOT NULL,
+                            Apellido TEXT NOT NULL,
+                            Edad INTEGER,
+                            Email TEXT UNIQUE NOT NULL,
+                            Telefono TEXT NOT NULL,
+                            Fuero TEXT NOT NULL CHECK (Fuero = '{fuero.replace("'", "''")}'),
+                            Tipo_de_caso TEXT NOT NULL,
+                            Fecha_registro TEXT
+                        )
+                    ''')
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {esquema}.idx_clientes_edad ON clientes (Edad)")
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {esquema}.idx_clientes_fecha_registro ON clientes (Fecha_registro)")
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {esquema}.idx_clientes_tipo ON clientes (Tipo_de_caso)")
+                conn.execute(f"PRAGMA main.user_version = {VERSION_PARTICIONES}")
+            return True
+        except sqlite3.Error as e:
+            print(Fore.RED + f"❌ Error al inicializar las particiones: {e}" + Style.RESET_ALL)
+            return False
+
+    # Escrituras: primero el índice (que rechaza Email repetidos en cualquier partición), después la partición
+
+    def insertar_cliente(self, nombre, apellido, edad, email, telefono, fuero, tipo_caso):
+        """Inserta un cliente en la partición de su fuero. Retorna el ID nuevo o None."""
+        try:
+            esquema = self._esquema(fuero)
+            fecha_registro = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+            with self.pool.transaccion() as conn:
+                cliente_id = conn.execute(
+                    "INSERT INTO main.clientes_indice (Email, Fuero) VALUES (?, ?)", (email, fuero)
+                ).lastrowid
+                conn.execute(
+                    f"INSERT INTO {esquema}.clientes ({_COLUMNAS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (cliente_id, nombre, apellido, edad, email, telefono, fuero, tipo_caso, fecha_registro)
+                )
+            return cliente_id
+        except ValueError as e:
+            print(Fore.RED + f"❌ {e}." + Style.RESET_ALL)
+            return None
+        except sqlite3.IntegrityError:
+            print(Fore.RED + "❌ Error: Ya existe un cliente con este email." + Style.RESET_ALL)
+            return None
+        except sqlite3.Error as e:
+            print(Fore.RED + f"❌ Error de base de datos al insertar cliente: {e}" + Style.RESET_ALL)
+            return None
+
+    def actualizar_cliente(self, cliente_id, nombre, apellido, edad, email, telefono, fuero, tipo_caso):
+        """
+        Actualiza un cliente. Si cambia de fuero, la fila se mueve a la otra partición conservando
+        su ID y su fecha de registro. Retorna True si se actualizó.
+        """
+        try:
+            esquema_nuevo = self._esquema(fuero)
+            with self.pool.transaccion() as conn:
+                fila = conn.execute("SELECT Fuero FROM main.clientes_indice WHERE ID = ?", (cliente_id,)).fetchone()
+                if fila is None:
+                    return False
+                esquema_actual = self._esquema(fila["Fuero"])
+                conn.execute("UPDATE main.clientes_indice SET Email = ?, Fuero = ? WHERE ID = ?", (email, fuero, cliente_id))
+                if esquema_actual == esquema_nuevo:
+                    cursor = conn.execute(f'''
+                        UPDATE {esquema_nuevo}.clientes
+                        SET Nombre = ?, Apellido = ?, Edad = ?, Email = ?, Telefono = ?, Tipo_de_caso = ?
+                        WHERE ID = ?
+                    ''', (nombre, apellido, edad, email, telefono, tipo_caso, cliente_id))
+                    return cursor.rowcount > 0
+                fecha = conn.execute(
+                    f"DELETE FROM {esquema_actual}.clientes WHERE ID = ? RETURNING Fecha_registro", (cliente_id,)
+                ).fetchone()
+                conn.execute(
+                    f"INSERT INTO {esquema_nuevo}.clientes ({_COLUMNAS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (cliente_id, nombre, apellido, edad, email, telefono, fuero, tipo_caso, fecha[0] if fecha else None)
+                )
+                return True
+        except ValueError as e:
+            print(Fore.RED + f"❌ {e}." + Style.RESET_ALL)
+            return False
+        except sqlite3.IntegrityError:
+            print(Fore.RED + "❌ Error: Ya existe un cliente con este email al intentar actualizar." + Style.RESET_ALL)
+            return False
+        except sqlite3.Error as e:
+            print(Fore.RED + f"❌ Error de base de datos al actualizar cliente: {e}" + Style.RESET_ALL)
+            return False
+
+    def eliminar_cliente(self, cliente_id):
+        """Elimina un cliente de su partición y del índice. Retorna True si existía."""
+        try:
+            with self.pool.transaccion() as conn:
+                fila = conn.execute(
+                    "DELETE FROM main.clientes_indice WHERE ID = ? RETURNING Fuero", (cliente_id,)
+                ).fetchone()
+                if fila is None:
+                    return False
+                conn.execute(f"DELETE FROM {self._esquema(fila['Fuero'])}.clientes WHERE ID = ?", (cliente_id,))
+            return True
+        except (ValueError, sqlite3.Error) as e:
+            print(Fore.RED + f"❌ Error de base de datos al eliminar cliente: {e}" + Style.RESET_ALL)
+            return False
+
+    # Lecturas enrutadas: por ID / Email se consulta el índice y luego solo la partición que corresponde
+
+    def _obtener_por(self, columna, valor):
+        try:
+            # Índice y partición se leen en la misma transacción: un cambio de fuero simultáneo no hace perder la fila
+            with self.pool.transaccion(modo="DEFERRED") as conn:
+                fila = conn.execute(f"SELECT ID, Fuero FROM main.clientes_indice WHERE {columna} = ?", (valor,)).fetchone()
+                if fila is None:
+                    return None
+                cursor = conn.cursor()
+                cursor.row_factory = fabrica_cliente
+                return cursor.execute(
+                    f"SELECT {_COLUMNAS} FROM {self._tabla(fila['Fuero'])} WHERE ID = ?", (fila["ID"],)
+                ).fetchone()
+        except (ValueError, sqlite3.Error) as e:
+            print(Fore.RED + f"❌ Error de base de datos al obtener cliente por {columna}: {e}" + Style.RESET_ALL)
+            return None
+
+    def obtener_cliente_por_id(self, cliente_id):
+        """Obtiene un cliente (registro Cliente) por su ID, o None."""
+        return self._obtener_por("ID", cliente_id)
+
+    def obtener_cliente_por_email(self, email):
+        """Obtiene un cliente (registro Cliente) por su email, o None."""
+        return self._obtener_por("Email", email)
+
+    def obtener_pagina_clientes(self, despues_de_id=0, tamano_pagina=20, fuero=None):
+        """
+        Página de clientes con ID mayor a `despues_de_id`, ordenada por ID. Con fuero solo se lee su partición;
+        sin fuero se recorre la vista global (SQLite combina las particiones ya ordenadas por ID).
+        """
+        try:
+            with self.pool.conexion() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = fabrica_cliente
+                return cursor.execute(
+                    f"SELECT {_COLUMNAS} FROM {self._tabla(fuero)} WHERE ID > ? ORDER BY ID LIMIT ?",
+                    (despues_de_id, tamano_pagina)
+                ).fetchall()
+        except (ValueError, sqlite3.Error) as e:
+            print(Fore.RED + f"❌ Error de base de datos al obtener una página de clientes: {e}" + Style.RESET_ALL)
+            return []
+
+    def iterar_clientes(self, tamano_pagina=500, desde_id=0, fuero=None):
+        """Generador que recorre los clientes página por página (de un fuero o de todos)."""
+        ultimo_id = desde_id
+        while True:
+            pagina = self.obtener_pagina_clientes(ultimo_id, tamano_pagina, fuero)
+            yield from pagina
+            if len(pagina) < tamano_pagina:
+                return
+            ultimo_id = pagina[-1].ID
+
+    def buscar_clientes_por_fuero(self, fuero):
+        """Busca clientes por fuero leyendo solo la partición de ese fuero."""
+        return list(self.iterar_clientes(fuero=fuero))
+
+    def contar_clientes(self, fuero=None):
+        """Cuenta los clientes de un fuero o de todas las particiones."""
+        try:
+            with self.pool.conexion() as conn:
+                return conn.execute(f"SELECT COUNT(*) FROM {self._tabla(fuero)}").fetchone()[0]
+        except (ValueError, sqlite3.Error) as e:
+            print(Fore.RED + f"❌ Error de base de datos al contar clientes: {e}" + Style.RESET_ALL)
+            return 0
+
+    # Mantenimiento
+
+    def estadisticas(self):
+        """Clientes y tamaño en disco (con el WAL) de cada partición y del índice, o None si hubo un error."""
+        def tamano(ruta):
+            return sum(os.path.getsize(ruta + sufijo) for sufijo in ("", "-wal") if os.path.exists(ruta + sufijo))
+        try:
+            with self.pool.conexion() as conn:
+                particiones = {
+                    fuero: {
+                        "clientes": conn.execute(f"SELECT COUNT(*) FROM {esquema}.clientes").fetchone()[0],
+                        "bytes": tamano(ruta_particion(self.directorio, fuero)),
+                    }
+                    for fuero, esquema in self.esquemas.items()
+                }
+                indice = conn.execute("SELECT COUNT(*) FROM main.clientes_indice").fetchone()[0]
+            return {
+                "particiones": particiones,
+                "indice": {"clientes": indice, "bytes": tamano(self.pool.ruta_db)},
+            }
+        except sqlite3.Error as e:
+            print(Fore.RED + f"❌ Error al leer las particiones: {e}" + Style.RESET_ALL)
+            return None
+
+    def vacuum(self, fuero=None):
+        """Compacta un archivo de partición (o todos): cada VACUUM solo bloquea el archivo que reescribe."""
+        try:
+            with self.pool.conexion() as conn:
+                for esquema in ([self._esquema(fuero)] if fuero else self.esquemas.values()):
+                    conn.execute(f"VACUUM {esquema}")
+            return True
+        except (ValueError, sqlite3.Error) as e:
+            print(Fore.RED + f"❌ Error al compactar las particiones: {e}" + Style.RESET_ALL)
+            return False
+
+    def verificar(self, reparar=False):
+        """
+        Compara el índice con las particiones. Por partición cuenta:
+          sin_fila:   entradas del índice sin su fila (se borran o se apuntan a la partición donde está la fila)
+          duplicadas: filas que el índice ubica en otra partición que también las tiene (se borra esta copia)
+          sin_indice: filas sin entrada en el índice (se agregan; si el Email ya está en otra, es un conflicto)
+        Con reparar=True corrige todo en una transacción. Retorna {fuero: {...}} o None si hubo un error.
+        """
+        try:
+            resultado = {}
+            with self.pool.transaccion() as conn:
+                for fuero, esquema in self.esquemas.items():
+                    sin_fila = [fila[0] for fila in conn.execute(f'''
+                        SELECT ID FROM main.clientes_indice AS i WHERE i.Fuero = ?
+                        AND NOT EXISTS (SELECT 1 FROM {esquema}.clientes AS c WHERE c.ID = i.ID)
+                    ''', (fuero,))]
+                    en_otra = conn.execute(f'''
+                        SELECT c.ID, i.Fuero FROM {esquema}.clientes AS c
+                        JOIN main.clientes_indice AS i ON i.ID = c.ID WHERE i.Fuero <> ?
+                    ''', (fuero,)).fetchall()
+                    sin_indice = conn.execute(f'''
+                        SELECT COUNT(*) FROM {esquema}.clientes AS c
+                        WHERE NOT EXISTS (SELECT 1 FROM main.clientes_indice AS i WHERE i.ID = c.ID)
+                    ''').fetchone()[0]
+                    resultado[fuero] = {"sin_fila": len(sin_fila), "duplicadas": 0, "sin_indice": sin_indice, "conflictos": 0}
+                    if reparar:
+                        conn.executemany("DELETE FROM main.clientes_indice WHERE ID = ?", [(cliente_id,) for cliente_id in sin_fila])
+                    for cliente_id, fuero_indice in en_otra:
+                        otra = self.esquemas.get(fuero_indice)
+                        if otra and conn.execute(f"SELECT 1 FROM {otra}.clientes WHERE ID = ?", (cliente_id,)).fetchone():
+                            resultado[fuero]["duplicadas"] += 1
+                            if reparar:
+                                conn.execute(f"DELETE FROM {esquema}.clientes WHERE ID = ?", (cliente_id,))
+                        elif reparar: # El índice apunta a una partición sin la fila: la fila válida es esta
+                            conn.execute("UPDATE main.clientes_indice SET Fuero = ? WHERE ID = ?", (fuero, cliente_id))
+                    if reparar and sin_indice:
+                        insertadas = conn.execute(f'''
+                            INSERT OR IGNORE INTO main.clientes_indice (ID, Email, Fuero)
+                            SELECT ID, Email, Fuero FROM {esquema}.clientes AS c
+                            WHERE NOT EXISTS (SELECT 1 FROM main.clientes_indice AS i WHERE i.ID = c.ID)
+                        ''').rowcount
+                        resultado[fuero]["conflictos"] = sin_indice - insertadas
+            return resultado
+        except sqlite3.Error as e:
+            print(Fore.RED + f"❌ Error al verificar las particiones: {e}" + Style.RESET_ALL)
+            return None
+
+
+def dividir_base(origen=None, directorio=None, fueros=None):
+    """
+    Herramienta de migración: reparte los clientes de una base de un solo archivo (por defecto, la base en uso)
+    en un directorio de particiones nuevo. Se construye en '<directorio>.tmp' y se renombra al terminar, así que
+    un corte a mitad de camino no deja particiones incompletas. Conserva los ID y el próximo ID a asignar;
+    la base de origen no se modifica. Retorna un resumen o None si falló.
+    """
+    origen = origen or base_de_datos.DB_FILE_PATH
+    directorio = directorio or DIRECTORIO_PARTICIONES
+    if not os.path.exists(origen):
+        print(Fore.RED + f"❌ No existe la base de origen {origen}." + Style.RESET_ALL)
+        return None
+    if os.path.isdir(directorio) and os.listdir(directorio):
+        print(Fore.RED + f"❌ El directorio {directorio} ya tiene archivos. No se sobrescribe." + Style.RESET_ALL)
+        return None
+
+    temporal = directorio.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    inicio = time.perf_counter()
+    almacen = AlmacenParticionado(temporal, fueros)
+    try:
+        if not almacen.inicializar():
+            return None
+        with almacen.pool.conexion() as conn:
+            conn.execute("ATTACH DATABASE ? AS origen", (origen,)) # ATTACH no se permite dentro de una transacción
+            try:
+                marcadores = ", ".join("?" * len(almacen.esquemas))
+                sin_particion = conn.execute(
+                    f"SELECT Fuero, COUNT(*) FROM origen.clientes WHERE Fuero NOT IN ({marcadores}) GROUP BY Fuero",
+                    list(almacen.esquemas)
+                ).fetchall()
+                if sin_particion:
+                    detalle = ", ".join(f"{fuero} ({cantidad})" for fuero, cantidad in sin_particion)
+                    print(Fore.RED + f"❌ Hay clientes de fueros sin partición: {detalle}. No se dividió la base." + Style.RESET_ALL)
+                    return None
+                with almacen.pool.transaccion():
+                    conn.execute(
+                        "INSERT INTO main.clientes_indice (ID, Email, Fuero) SELECT ID, Email, Fuero FROM origen.clientes ORDER BY ID"
+                    )
+                    # Las bajas del final no deben reutilizar sus ID: se copia el contador de AUTOINCREMENT
+                    secuencia = None
+                    if conn.execute("SELECT 1 FROM origen.sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+                        secuencia = conn.execute("SELECT seq FROM origen.sqlite_sequence WHERE name = 'clientes'").fetchone()
+                    if secuencia and not conn.execute(
+                        "UPDATE main.sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'clientes_indice'", (secuencia[0],)
+                    ).rowcount:
+                        conn.execute("INSERT INTO main.sqlite_sequence (name, seq) VALUES ('clientes_indice', ?)", (secuencia[0],))
+                    filas = {}
+                    for fuero, esquema in almacen.esquemas.items():
+                        filas[fuero] = conn.execute(
+                            f"INSERT INTO {esquema}.clientes ({_COLUMNAS}) SELECT {_COLUMNAS} FROM origen.clientes "
+                            "WHERE Fuero = ? ORDER BY ID", (fuero,)
+                        ).rowcount
+            finally:
+                conn.execute("DETACH DATABASE origen")
+        total = sum(filas.values())
+        if almacen.contar_clientes() != total:
+            print(Fore.RED + "❌ La cantidad de clientes de las particiones no coincide con la del índice." + Style.RESET_ALL)
+            return None
+        almacen.cerrar() # Cierra las conexiones: SQLite vuelca el WAL en cada archivo antes del renombrado
+        if os.path.isdir(directorio):
+            os.rmdir(directorio)
+        os.replace(temporal, directorio)
+        return {"directorio": directorio, "filas_por_fuero": filas, "total": total, "segundos": time.perf_counter() - inicio}
+    except (sqlite3.Error, OSError) as e:
+        print(Fore.RED + f"❌ Error al dividir la base en particiones: {e}" + Style.RESET_ALL)
+        return None
+    finally:
+        almacen.cerrar()
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+def mostrar_estadisticas(estadisticas):
+    """Imprime clientes y tamaño de cada partición."""
+    if estadisticas is None:
+        return
+    for fuero, datos in estadisticas["particiones"].items():
+        print(f"   {fuero:<12} {datos['clientes']:>10,} clientes {datos['bytes'] / 1024 / 1024:>9.1f} MB")
+    indice = estadisticas["indice"]
+    print(f"   {'Índice':<12} {indice['clientes']:>10,} clientes {indice['bytes'] / 1024 / 1024:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Almacenamiento de clientes particionado por fuero (un archivo por fuero).")
+    parser.add_argument("--directorio", help="Directorio de las particiones (por defecto, particiones/)")
+    parser.add_argument("--dividir", action="store_true", help="Dividir una base de un solo archivo en particiones")
+    parser.add_argument("--origen", help="Base a dividir (por defecto, clientes.db)")
+    parser.add_argument("--verificar", action="store_true", help="Comparar el índice con las particiones")
+    parser.add_argument("--reparar", action="store_true", help="Con --verificar, corregir las diferencias encontradas")
+    parser.add_argument("--vacuum", action="store_true", help="Compactar los archivos de las particiones")
+    args = parser.parse_args()
+
+    if args.dividir:
+        resumen = dividir_base(args.origen, args.directorio)
+        if resumen is None:
+            sys.exit(1)
+        else:
+            print(Fore.GREEN + f"✔️  {resumen['total']:,} clientes divididos en {len(resumen['filas_por_fuero'])} particiones "
+                  f"en {resumen['directorio']} ({resumen['segundos']:.2f} s)" + Style.RESET_ALL)
+    almacen = AlmacenParticionado(args.directorio)
+    try:
+        if almacen.inicializar():
+            if args.verificar:
+                for fuero, diferencias in (almacen.verificar(reparar=args.reparar) or {}).items():
+                    estado = Fore.GREEN + "ok" if not any(diferencias.values()) else Fore.YELLOW + str(diferencias)
+                    print(f"   {fuero:<12} " + estado + Style.RESET_ALL)
+            if args.vacuum and almacen.vacuum():
+                print(Fore.GREEN + "✔️  Particiones compactadas." + Style.RESET_ALL)
+            mostrar_estadisticas(almacen.estadisticas())
+    finally:
+        almacen.cerrar()
@@ -0,0 +1,332 @@
+# Pool de conexiones SQLite
+
+import random
+import sqlite3
+import threading
+import time
+import queue
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+
+# PRAGMAs aplicados a cada conexión nueva. Se pueden sobrescribir al crear el pool.
+PRAGMAS_POR_DEFECTO = {
+    "journal_mode": "WAL",      # Lectores y escritor no se bloquean entre sí
+    "synchronous": "NORMAL",    # Seguro con WAL y mucho más rápido que FULL
+    "cache_size": -20000,       # Negativo = KiB (aprox. 20 MB de caché de páginas)
+    "mmap_size": 268435456,     # 256 MB de lectura por memoria mapeada
+    "busy_timeout": 5000,       # Milisegundos de espera si la base está bloqueada
+    "temp_store": "MEMORY",
+}
+
+# Sentencias preparadas que guarda cada conexión (sqlite3 usa 128). Volver a compilar una consulta por ID
+# cuesta más que ejecutarla, y los filtros combinables y las listas IN de largo variable ocupan muchas entradas.
+CACHE_SENTENCIAS_POR_DEFECTO = 512
+
+# Reintentos ante "database is locked" cuando se agotó busy_timeout (otra sesión retuvo el bloqueo de escritura).
+# La espera antes de cada reintento es aleatoria entre 0 y ESPERA_REINTENTO * 2^intento segundos ("full jitter"):
+# así las sesiones que chocaron no vuelven a intentar todas al mismo tiempo.
+REINTENTOS_POR_DEFECTO = 3
+ESPERA_REINTENTO_POR_DEFECTO = 0.05
+
+_CODIGOS_BLOQUEO = {getattr(sqlite3, "SQLITE_BUSY", 5), getattr(sqlite3, "SQLITE_LOCKED", 6)}
+
+def es_error_bloqueo(error):
+    """True si el error es transitorio por bloqueo (SQLITE_BUSY / SQLITE_LOCKED) y tiene sentido reintentar."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    codigo = getattr(error, "sqlite_errorcode", None)
+    if codigo is not None:
+        return codigo & 0xFF in _CODIGOS_BLOQUEO # Los códigos extendidos conservan el primario en el byte bajo
+    mensaje = str(error).lower()
+    return "locked" in mensaje or "busy" in mensaje
+
+
+class PoolConexiones:
+    """
+    Mantiene un pequeño conjunto de conexiones SQLite abiertas y las reutiliza.
+    Cada hilo obtiene siempre la misma conexión mientras la tenga en uso, de modo que
+    las llamadas anidadas (por ejemplo, una función CRUD dentro de una transacción)
+    comparten conexión y transacción.
+    """
+
+    def __init__(self, ruta_db, tamano=4, pragmas=None, factory=sqlite3.Connection, al_medir=None, al_contar=None,
+                 reintentos=REINTENTOS_POR_DEFECTO, espera_reintento=ESPERA_REINTENTO_POR_DEFECTO, al_conectar=None,
+                 cached_statements=CACHE_SENTENCIAS_POR_DEFECTO):
+        """
+        factory: clase de conexión para sqlite3.connect (por ejemplo, una conexión instrumentada).
+        al_medir: callback opcional al_medir(nombre, segundos) para 'conexion.adquisicion', 'transaccion.espera_bloqueo'
+                  (tiempo hasta obtener el bloqueo de escritura, con reintentos) y 'transaccion.commit'.
+        al_contar: callback opcional al_contar(nombre, cantidad) para 'transaccion.reintentos_bloqueo'
+                   y 'transaccion.bloqueos_agotados'.
+        reintentos / espera_reintento: reintentos con espera aleatoria ante bloqueos (ver REINTENTOS_POR_DEFECTO).
+        al_conectar: callback opcional al_conectar(conn) para preparar cada conexión nueva (por ejemplo, ATTACH).
+        cached_statements: tamaño de la caché de sentencias preparadas de cada conexión.
+        """
+        self.ruta_db = ruta_db
+        self.tamano = tamano
+        self.factory = factory
+        self.al_medir = al_medir
+        self.al_contar = al_contar
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self.al_conectar = al_conectar
+        self.cached_statements = cached_statements
+        self.pragmas = dict(PRAGMAS_POR_DEFECTO)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self._libres = queue.LifoQueue(maxsize=tamano) # LIFO: reutiliza la conexión con la caché más "caliente"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._todas = []
+        self._cerrado = False
+
+    def _crear_conexion(self):
+        """Abre una conexión nueva y le aplica los PRAGMAs configurados."""
+        # isolation_level=None: las transacciones se manejan explícitamente con BEGIN/COMMIT
+        conn = sqlite3.connect(
+            self.ruta_db, isolation_level=None, check_same_thread=False, factory=self.factory,
+            cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row
+        for nombre, valor in self.pragmas.items():
+            if valor is not None:
+                conn.execute(f"PRAGMA {nombre} = {valor}")
+        if self.al_conectar:
+            self.al_conectar(conn)
+        with self._lock:
+            self._todas.append(conn)
+        return conn
+
+    def _tomar(self):
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            return self._crear_conexion()
+
+    def _devolver(self, conn):
+        if conn.in_transaction: # Nunca devolver al pool una conexión con una transacción a medias
+            conn.rollback()
+        if self._cerrado:
+            conn.close()
+            return
+        try:
+            self._libres.put_nowait(conn)
+        except queue.Full: # El pool está completo: se descarta la conexión sobrante
+            with self._lock:
+                if conn in self._todas:
+                    self._todas.remove(conn)
+            conn.close()
+
+    def en_uso(self):
+        """True si el hilo actual ya tiene una conexión del pool (está dentro de un bloque conexion/transaccion)."""
+        return getattr(self._local, "conn", None) is not None
+
+    def _con_reintentos(self, accion):
+        """
+        Ejecuta accion() y, si falla por un bloqueo transitorio, la reintenta hasta `reintentos` veces
+        con espera exponencial aleatoria. Solo se usa para BEGIN y COMMIT, que se pueden repetir sin efectos.
+        """
+        for intento in range(self.reintentos + 1):
+            try:
+                return accion()
+            except sqlite3.OperationalError as e:
+                if not es_error_bloqueo(e):
+                    raise
+                if intento == self.reintentos:
+                    if self.al_contar:
+                        self.al_contar("transaccion.bloqueos_agotados", 1)
+                    raise
+                if self.al_contar:
+                    self.al_contar("transaccion.reintentos_bloqueo", 1)
+                time.sleep(random.uniform(0, self.espera_reintento * 2 ** intento))
+
+    @contextmanager
+    def conexion(self):
+        """
+        Entrega la conexión del hilo actual. Si el hilo no tiene una, la toma del pool
+        y la devuelve al salir del bloque más externo.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.profundidad += 1
+            try:
+                yield conn
+            finally:
+                self._local.profundidad -= 1
+            return
+
+        if self.al_medir:
+            inicio = time.perf_counter()
+            conn = self._tomar()
+            self.al_medir("conexion.adquisicion", time.perf_counter() - inicio)
+        else:
+            conn = self._tomar()
+        self._local.conn = conn
+        self._local.profundidad = 1
+        try:
+            yield conn
+        finally:
+            self._local.profundidad -= 1
+            self._local.conn = None
+            self._devolver(conn)
+
+    @contextmanager
+    def transaccion(self, modo="IMMEDIATE"):
+        """
+        Ejecuta el bloque dentro de una transacción: COMMIT si termina bien, ROLLBACK si hay una excepción.
+        Si ya hay una transacción abierta en el hilo, se usa un SAVEPOINT anidado.
+        """
+        with self.conexion() as conn:
+            if conn.in_transaction:
+                nombre = f"sp_{self._local.profundidad}"
+                conn.execute(f"SAVEPOINT {nombre}")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute(f"ROLLBACK TO {nombre}")
+                    conn.execute(f"RELEASE {nombre}")
+                    raise
+                else:
+                    conn.execute(f"RELEASE {nombre}")
+                return
+
+            inicio = time.perf_counter()
+            self._con_reintentos(lambda: conn.execute(f"BEGIN {modo}"))
+            if self.al_medir:
+                self.al_medir("transaccion.espera_bloqueo", time.perf_counter() - inicio)
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                inicio = time.perf_counter()
+                self._con_reintentos(conn.commit)
+                if self.al_medir:
+                    self.al_medir("transaccion.commit", time.perf_counter() - inicio)
+
+    def cerrar(self):
+        """Cierra todas las conexiones abiertas por el pool."""
+        self._cerrado = True
+        with self._lock:
+            conexiones, self._todas = self._todas, []
+        while True:
+            try:
+                self._libres.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conexiones:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+class ColaEscritura:
+    """
+    Escritor único con commits agrupados. Las escrituras que llegan desde varios hilos se ejecutan en un solo
+    hilo, y las que se acumulan mientras se confirma un lote se confirman juntas en la transacción siguiente:
+    un solo BEGIN IMMEDIATE (una espera por el bloqueo de escritura) y un solo COMMIT para muchas escrituras,
+    sin que los hilos de la misma sesión compitan entre sí por el bloqueo.
+    Cada escritura corre en su propio SAVEPOINT: si falla, se deshace solo esa. El hilo que llama espera
+    hasta que su lote quedó confirmado, así que al retornar el cambio ya es durable.
+    """
+
+    def __init__(self, pool, max_lote=64, al_medir=None, al_contar=None, contexto_lote=None):
+        """
+        al_medir: callback opcional al_medir(nombre, segundos) para 'cola_escritura.espera' (tiempo en la cola).
+        al_contar: callback opcional al_contar(nombre, cantidad) para 'cola_escritura.lotes', 'cola_escritura.escrituras'
+                   y 'cola_escritura.lotes_fallidos'.
+        contexto_lote: función que retorna un context manager que envuelve cada lote, incluido su COMMIT
+                       (por ejemplo, para invalidar la caché cuando los cambios ya son visibles).
+        """
+        self.pool = pool
+        self.max_lote = max_lote
+        self.al_medir = al_medir
+        self.al_contar = al_contar
+        self.contexto_lote = contexto_lote or nullcontext
+        self._cola = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._cerrada = False
+        self._hilo = threading.Thread(target=self._procesar, name="escritor-db", daemon=True)
+        self._hilo.start()
+
+    def ejecutar(self, funcion, *args, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) en el hilo escritor y retorna su resultado (o relanza su excepción).
+        Si el hilo actual ya está dentro de una transacción del pool, o es el propio escritor, se ejecuta
+        directamente: encolarla esperaría a una transacción que no puede terminar.
+        """
+        if threading.current_thread() is self._hilo or self.pool.en_uso():
+            return funcion(*args, **kwargs)
+        futuro = Future()
+        with self._lock:
+            if self._cerrada:
+                return funcion(*args, **kwargs)
+            self._cola.put((funcion, args, kwargs, futuro, time.perf_counter()))
+        return futuro.result()
+
+    def _procesar(self):
+        detener = False
+        while not detener:
+            tarea = self._cola.get()
+            if tarea is None:
+                return
+            lote = [tarea]
+            while len(lote) < self.max_lote: # Se suma lo que ya está esperando, sin demorar el lote
+                try:
+                    tarea = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if tarea is None:
+                    detener = True
+                    break
+                lote.append(tarea)
+            try:
+                self._ejecutar_lote(lote)
+            except Exception as e: # Nunca dejar esperando para siempre a los hilos del lote
+                for _, _, _, futuro, _ in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+
+    def _ejecutar_lote(self, lote):
+        inicio = time.perf_counter()
+        if self.al_medir:
+            for tarea in lote:
+                self.al_medir("cola_escritura.espera", inicio - tarea[4])
+        resultados = []
+        with self.contexto_lote():
+            try:
+                with self.pool.transaccion():
+                    for funcion, args, kwargs, _, _ in lote:
+                        try:
+                            with self.pool.transaccion(): # SAVEPOINT propio de cada escritura
+                                resultados.append((True, funcion(*args, **kwargs)))
+                        except Exception as e:
+                            resultados.append((False, e))
+            except sqlite3.Error: # Falló el BEGIN o el COMMIT del lote: cada escritura se repite por separado
+                if self.al_contar:
+                    self.al_contar("cola_escritura.lotes_fallidos", 1)
+                resultados = []
+                for funcion, args, kwargs, _, _ in lote:
+                    try:
+                        resultados.append((True, funcion(*args, **kwargs)))
+                    except Exception as e:
+                        resultados.append((False, e))
+        if self.al_contar:
+            self.al_contar("cola_escritura.lotes", 1)
+            self.al_contar("cola_escritura.escrituras", len(lote))
+        for (_, _, _, futuro, _), (ok, valor) in zip(lote, resultados):
+            if ok:
+                futuro.set_result(valor)
+            else:
+                futuro.set_exception(valor)
+
+    def cerrar(self):
+        """Procesa las escrituras ya encoladas y detiene el hilo escritor."""
+        with self._lock:
+            if self._cerrada:
+                return
+            self._cerrada = True
+            self._cola.put(None)
+        self._hilo.join()
@@ -0,0 +1,87 @@
+# Prueba de la caché de clientes frente a lecturas y escrituras concurrentes de varios hilos
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from colorama import Fore, Style
+import base_de_datos
+
+ESPERA_MAXIMA = 10 # Segundos; si un hilo no llega a un punto de la prueba, la prueba falla en lugar de colgarse
+
+
+def _verificar(resultados, descripcion, condicion):
+    resultados.append((descripcion, bool(condicion)))
+
+def probar_generacion(resultados):
+    """Una fila leída antes de una invalidación no se guarda en la caché."""
+    cache = base_de_datos.cache
+    cliente_id = base_de_datos.insertar_cliente("Ana", "Perez", 30, "ana@prueba.com", "1234567", "Civil", "Reclamos")
+    fila = base_de_datos.obtener_cliente_por_id(cliente_id)
+    cache.limpiar()
+    generacion = cache.generacion()
+    cache.invalidar(cliente_id)
+    cache.guardar(fila, generacion)
+    _verificar(resultados, "guardar descarta una fila leída antes de invalidar", cache.obtener_por_id(cliente_id) is None)
+    cache.guardar(fila, cache.generacion())
+    _verificar(resultados, "guardar conserva una fila sin invalidaciones en el medio", cache.obtener_por_id(cliente_id) is not None)
+
+def probar_lectura_concurrente(resultados):
+    """
+    Un hilo lee un cliente y se detiene entre el SELECT y el guardado en la caché; mientras tanto otro hilo
+    lo modifica. La lectura siguiente debe devolver la versión nueva y no la que el lector dejó en la caché.
+    """
+    cache = base_de_datos.cache
+    cliente_id = base_de_datos.insertar_cliente("Bruno", "Diaz", 30, "bruno@prueba.com", "1234567", "Laboral", "Despido")
+    cache.limpiar()
+    leido, escrito = threading.Event(), threading.Event()
+    guardar_original = cache.guardar
+
+    def guardar_demorado(cliente, generacion=None):
+        leido.set()
+        escrito.wait(ESPERA_MAXIMA)
+        guardar_original(cliente, generacion)
+
+    lecturas = []
+    lector = threading.Thread(target=lambda: lecturas.append(base_de_datos.obtener_cliente_por_id(cliente_id)))
+    cache.guardar = guardar_demorado
+    try:
+        lector.start()
+        _verificar(resultados, "el lector leyó el cliente antes de la modificación", leido.wait(ESPERA_MAXIMA))
+        cache.guardar = guardar_original # La lectura del escritor (si la hay) no se demora
+        actualizado = base_de_datos.actualizar_cliente_db(
+            cliente_id, "Bruno", "Diaz", 55, "bruno@prueba.com", "1234567", "Laboral", "Despido"
+        )
+        _verificar(resultados, "la modificación se confirmó", actualizado)
+    finally:
+        cache.guardar = guardar_original
+        escrito.set()
+        lector.join(ESPERA_MAXIMA)
+    _verificar(resultados, "el lector obtuvo la versión anterior", lecturas and lecturas[0].Edad == 30)
+    _verificar(resultados, "la lectura siguiente devuelve la versión modificada",
+               base_de_datos.obtener_cliente_por_id(cliente_id).Edad == 55)
+    _verificar(resultados, "la lectura por Email también devuelve la versión modificada",
+               base_de_datos.obtener_cliente_por_email("bruno@prueba.com").Edad == 55)
+
+
+def ejecutar_pruebas():
+    """Corre las pruebas sobre una base temporal nueva. Retorna [(descripcion, ok), ...]."""
+    resultados = []
+    directorio_temporal = tempfile.mkdtemp(prefix="prueba_cache_")
+    try:
+        base_de_datos.configurar_base_de_datos(ruta=os.path.join(directorio_temporal, "clientes.db"))
+        base_de_datos.inicializar_db()
+        probar_generacion(resultados)
+        probar_lectura_concurrente(resultados)
+    finally:
+        base_de_datos.pool.cerrar()
+        shutil.rmtree(directorio_temporal, ignore_errors=True)
+    return resultados
+
+
+if __name__ == "__main__":
+    resultados = ejecutar_pruebas()
+    for descripcion, ok in resultados:
+        print((Fore.GREEN + "✔️" if ok else Fore.RED + "❌") + f" {descripcion}" + Style.RESET_ALL)
+    sys.exit(0 if all(ok for _, ok in resultados) else 1)
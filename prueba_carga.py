@@ -0,0 +1,128 @@
+# Prueba de carga local de la API HTTP (servidor_http.py)
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from colorama import Fore, Style
+import base_de_datos
+import gestor_clientes
+import servidor_http
+
+
+def _percentil(valores, porcentaje):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * porcentaje / 100))]
+
+
+def _cliente_http(host, puerto, pedidos, proporcion_escrituras, semilla, resultados, lock):
+    """Un usuario virtual: usa una sola conexión keep-alive y mezcla lecturas con escrituras."""
+    azar = random.Random(semilla)
+    conexion = http.client.HTTPConnection(host, puerto, timeout=30)
+    latencias, errores, ids_creados = [], 0, []
+    fueros = list(gestor_clientes.tipos_por_fuero.items())
+    for numero in range(pedidos):
+        if azar.random() < proporcion_escrituras:
+            fuero, tipos = azar.choice(fueros)
+            cuerpo = json.dumps({
+                "Nombre": "Carga", "Apellido": "Prueba", "Edad": azar.randint(0, 99),
+                "Email": f"carga{semilla}_{numero}@prueba.com", "Telefono": str(azar.randint(10**9, 10**10 - 1)),
+                "Fuero": fuero, "Tipo_de_caso": azar.choice(tipos),
+            })
+            metodo, ruta = "POST", "/clientes"
+        else:
+            cuerpo = None
+            eleccion = azar.random()
+            if eleccion < 0.5 and ids_creados:
+                metodo, ruta = "GET", f"/clientes/{azar.choice(ids_creados)}"
+            elif eleccion < 0.8:
+                metodo, ruta = "GET", f"/clientes?limite=50&fuero={azar.choice(fueros)[0]}"
+            else:
+                metodo, ruta = "GET", "/buscar?q=pru"
+        inicio = time.perf_counter()
+        try:
+            conexion.request(metodo, ruta, body=cuerpo, headers={"Content-Type": "application/json"})
+            respuesta = conexion.getresponse()
+            datos = respuesta.read()
+            if respuesta.status >= 400:
+                errores += 1
+            elif metodo == "POST":
+                ids_creados.append(json.loads(datos)["ID"])
+        except (OSError, http.client.HTTPException):
+            errores += 1
+            conexion.close()
+            conexion = http.client.HTTPConnection(host, puerto, timeout=30)
+        latencias.append(time.perf_counter() - inicio)
+    conexion.close()
+    with lock:
+        resultados["latencias"].extend(latencias)
+        resultados["errores"] += errores
+
+
+def ejecutar_prueba(host, puerto, usuarios=16, pedidos_por_usuario=200, proporcion_escrituras=0.2):
+    """Lanza `usuarios` hilos concurrentes contra la API y retorna las métricas obtenidas."""
+    resultados, lock = {"latencias": [], "errores": 0}, threading.Lock()
+    hilos = [
+        threading.Thread(target=_cliente_http, args=(host, puerto, pedidos_por_usuario, proporcion_escrituras, semilla, resultados, lock))
+        for semilla in range(usuarios)
+    ]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+    latencias = resultados["latencias"]
+    return {
+        "pedidos": len(latencias),
+        "errores": resultados["errores"],
+        "segundos": segundos,
+        "pedidos_por_segundo": len(latencias) / segundos if segundos else 0.0,
+        "latencia_media_ms": statistics.mean(latencias) * 1000 if latencias else 0.0,
+        "latencia_p50_ms": _percentil(latencias, 50) * 1000,
+        "latencia_p95_ms": _percentil(latencias, 95) * 1000,
+        "latencia_p99_ms": _percentil(latencias, 99) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API HTTP de clientes.")
+    parser.add_argument("--usuarios", type=int, default=16)
+    parser.add_argument("--pedidos", type=int, default=200, help="Pedidos por usuario")
+    parser.add_argument("--escrituras", type=float, default=0.2, help="Proporción de altas (0 a 1)")
+    parser.add_argument("--trabajadores", type=int, default=servidor_http.TRABAJADORES_POR_DEFECTO)
+    parser.add_argument("--puerto", type=int, help="Usar un servidor ya iniciado en este puerto")
+    args = parser.parse_args()
+
+    directorio_temporal = None
+    if args.puerto is None:
+        # Por defecto se prueba contra una copia temporal para no ensuciar clientes.db
+        directorio_temporal = tempfile.mkdtemp(prefix="prueba_carga_")
+        base_de_datos.configurar_base_de_datos(ruta=os.path.join(directorio_temporal, "clientes.db"))
+        servidor = servidor_http.iniciar_en_segundo_plano(puerto=0, trabajadores=args.trabajadores)
+        host, puerto = servidor.server_address
+    else:
+        host, puerto = servidor_http.HOST_POR_DEFECTO, args.puerto
+
+    try:
+        metricas = ejecutar_prueba(host, puerto, args.usuarios, args.pedidos, args.escrituras)
+    finally:
+        if directorio_temporal:
+            servidor.shutdown()
+            servidor.server_close()
+            base_de_datos.pool.cerrar()
+            shutil.rmtree(directorio_temporal, ignore_errors=True)
+
+    color = Fore.GREEN if metricas["errores"] == 0 else Fore.RED
+    print(color + f"Pedidos: {metricas['pedidos']}  Errores: {metricas['errores']}  "
+          f"({metricas['pedidos_por_segundo']:.0f} pedidos/s en {metricas['segundos']:.2f} s)" + Style.RESET_ALL)
+    print(f"Latencia media {metricas['latencia_media_ms']:.1f} ms | p50 {metricas['latencia_p50_ms']:.1f} ms | "
+          f"p95 {metricas['latencia_p95_ms']:.1f} ms | p99 {metricas['latencia_p99_ms']:.1f} ms")
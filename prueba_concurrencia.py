@@ -0,0 +1,143 @@
+# Prueba de estrés de escrituras concurrentes desde varios procesos sobre el mismo archivo SQLite
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from colorama import Fore, Style
+import base_de_datos
+import metricas
+
+DOMINIO = "@estres.com" # Los clientes de la prueba se reconocen por el dominio del email
+CONTADORES_INFORMADOS = (
+    "transaccion.reintentos_bloqueo", "transaccion.bloqueos_agotados",
+    "cola_escritura.lotes", "cola_escritura.escrituras", "cola_escritura.lotes_fallidos",
+)
+
+
+def _sesion(ruta_db, numero, hilos, operaciones, cola, espera_bloqueo_ms, reintentos):
+    """
+    Una sesión de la aplicación (un proceso): `hilos` hilos que agregan clientes y luego modifican cada uno.
+    Retorna los emails confirmados con su edad final, las operaciones que fallaron y las métricas de bloqueo.
+    """
+    base_de_datos.configurar_base_de_datos(
+        ruta=ruta_db, tamano_pool=hilos + 1, pragmas={"busy_timeout": espera_bloqueo_ms}, reintentos=reintentos
+    )
+    metricas.configurar(archivo_consultas_lentas=None)
+    if cola:
+        base_de_datos.configurar_cola_escritura()
+    confirmados, fallidas, lock = {}, [0], threading.Lock()
+
+    def trabajar(numero_hilo):
+        for operacion in range(operaciones):
+            email = f"p{numero}h{numero_hilo}n{operacion}{DOMINIO}"
+            cliente_id = base_de_datos.insertar_cliente("Estres", "Prueba", 30, email, "1234567", "Civil", "Reclamos")
+            if cliente_id is None:
+                with lock:
+                    fallidas[0] += 1
+                continue
+            edad = operacion % 100
+            actualizado = base_de_datos.actualizar_cliente_db(
+                cliente_id, "Estres", "Prueba", edad, email, "1234567", "Civil", "Reclamos"
+            )
+            with lock:
+                confirmados[email] = edad if actualizado else 30
+                fallidas[0] += not actualizado
+
+    with contextlib.redirect_stdout(io.StringIO()): # Los errores se cuentan; no se imprimen uno por uno
+        hilos_sesion = [threading.Thread(target=trabajar, args=(numero_hilo,)) for numero_hilo in range(hilos)]
+        for hilo in hilos_sesion:
+            hilo.start()
+        for hilo in hilos_sesion:
+            hilo.join()
+        base_de_datos.configurar_cola_escritura(False)
+    datos = metricas.registro.instantanea()
+    return {
+        "confirmados": confirmados,
+        "fallidas": fallidas[0],
+        "contadores": {nombre: datos["contadores"].get(nombre, 0) for nombre in CONTADORES_INFORMADOS},
+        "espera_bloqueo": datos["histogramas"].get("transaccion.espera_bloqueo"),
+    }
+
+
+def ejecutar_prueba(ruta_db, procesos=4, hilos=4, operaciones=100, cola=False, espera_bloqueo_ms=5000, reintentos=None):
+    """
+    Lanza `procesos` sesiones en paralelo contra `ruta_db` y verifica en la base que cada escritura informada
+    como exitosa esté (con su último valor) y que no haya filas de escrituras informadas como fallidas.
+    Retorna un resumen con escrituras, fallidas, perdidas, fantasmas, segundos y métricas de bloqueo.
+    """
+    reintentos = base_de_datos.pool.reintentos if reintentos is None else reintentos
+    contexto = multiprocessing.get_context("spawn")
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+        sesiones = list(pool.map(
+            _sesion, *zip(*[(ruta_db, numero, hilos, operaciones, cola, espera_bloqueo_ms, reintentos) for numero in range(procesos)])
+        ))
+    segundos = time.perf_counter() - inicio
+
+    confirmados = {email: edad for sesion in sesiones for email, edad in sesion["confirmados"].items()}
+    conn = sqlite3.connect(ruta_db)
+    try:
+        en_base = dict(conn.execute("SELECT Email, Edad FROM clientes WHERE Email LIKE ?", (f"%{DOMINIO}",)))
+    finally:
+        conn.close()
+    esperas = [sesion["espera_bloqueo"] for sesion in sesiones if sesion["espera_bloqueo"]]
+    return {
+        "escrituras": 2 * procesos * hilos * operaciones,
+        "fallidas": sum(sesion["fallidas"] for sesion in sesiones),
+        # Informadas como exitosas pero ausentes (o con otro valor) en la base: escrituras perdidas
+        "perdidas": sum(1 for email, edad in confirmados.items() if en_base.get(email, -1) != edad),
+        # Presentes en la base aunque la aplicación informó un error: el usuario las cargaría de nuevo
+        "fantasmas": sum(1 for email in en_base if email not in confirmados),
+        "segundos": segundos,
+        "contadores": {nombre: sum(sesion["contadores"][nombre] for sesion in sesiones) for nombre in CONTADORES_INFORMADOS},
+        "espera_bloqueo_p95_ms": max((h["p95_ms"] for h in esperas), default=0.0),
+        "espera_bloqueo_max_ms": max((h["max_ms"] for h in esperas), default=0.0),
+    }
+
+
+def mostrar_resultado(resultado):
+    """Imprime el resumen de la prueba. Es exitosa si no hubo escrituras fallidas, perdidas ni fantasmas."""
+    ok = not (resultado["fallidas"] or resultado["perdidas"] or resultado["fantasmas"])
+    color = Fore.GREEN if ok else Fore.RED
+    print(color + f"{'✔️ ' if ok else '❌'} Escrituras: {resultado['escrituras']}  Fallidas: {resultado['fallidas']}  "
+          f"Perdidas: {resultado['perdidas']}  Fantasmas: {resultado['fantasmas']}" + Style.RESET_ALL)
+    print(f"Tiempo: {resultado['segundos']:.2f} s ({resultado['escrituras'] / resultado['segundos']:.0f} escrituras/s)")
+    print(f"Espera por el bloqueo de escritura: p95 {resultado['espera_bloqueo_p95_ms']:.1f} ms, "
+          f"máx. {resultado['espera_bloqueo_max_ms']:.1f} ms")
+    for nombre, valor in resultado["contadores"].items():
+        print(f"   {nombre:<42} {valor:>10}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de estrés: varios procesos escriben a la vez en la misma base.")
+    parser.add_argument("--procesos", type=int, default=4)
+    parser.add_argument("--hilos", type=int, default=4, help="Hilos por proceso")
+    parser.add_argument("--operaciones", type=int, default=100, help="Altas por hilo (cada una seguida de una modificación)")
+    parser.add_argument("--cola", action="store_true", help="Usar el escritor único con commits agrupados en cada proceso")
+    parser.add_argument("--espera-bloqueo", type=int, default=5000, help="busy_timeout en ms")
+    parser.add_argument("--reintentos", type=int, help="Reintentos ante 'database is locked' (0 para desactivarlos)")
+    args = parser.parse_args()
+
+    # Siempre contra una base temporal para no ensuciar clientes.db
+    directorio_temporal = tempfile.mkdtemp(prefix="prueba_concurrencia_")
+    try:
+        ruta_db = os.path.join(directorio_temporal, "clientes.db")
+        base_de_datos.configurar_base_de_datos(ruta=ruta_db)
+        base_de_datos.inicializar_db()
+        base_de_datos.pool.cerrar()
+        resultado = ejecutar_prueba(
+            ruta_db, args.procesos, args.hilos, args.operaciones, args.cola, args.espera_bloqueo, args.reintentos
+        )
+    finally:
+        shutil.rmtree(directorio_temporal, ignore_errors=True)
+    sys.exit(0 if mostrar_resultado(resultado) else 1)
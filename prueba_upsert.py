@@ -0,0 +1,108 @@
+# Prueba de comportamiento de altas y actualizaciones por Email (upsert) sobre una base con todas las migraciones
+
+import os
+import shutil
+import sys
+import tempfile
+from colorama import Fore, Style
+import base_de_datos
+import duplicados
+import importador_clientes
+
+
+def _verificar(resultados, descripcion, condicion):
+    resultados.append((descripcion, bool(condicion)))
+
+def probar_cambios_de_nombre(resultados):
+    """
+    Los triggers de las migraciones (FTS, claves de duplicados, registro de cambios) no deben hacer fallar un upsert
+    que renombra a un cliente que ya está pendiente de recalcular sus claves (por ejemplo, uno de los clientes que
+    la migración 5 dejó en cola y todavía no se procesaron).
+    """
+    cliente_id = base_de_datos.insertar_cliente("Ana", "Perez", 30, "ana@prueba.com", "1234567", "Civil", "Reclamos")
+    _verificar(resultados, "alta de un cliente", cliente_id is not None)
+    with base_de_datos.transaccion() as conn: # Lo deja en cola y sin claves, como la migración 5 a los clientes existentes
+        conn.execute("DELETE FROM clientes_claves WHERE Cliente_ID = ?", (cliente_id,))
+        conn.execute("INSERT INTO clientes_claves_pendientes (Cliente_ID) VALUES (?)", (cliente_id,))
+    _verificar(
+        resultados, "upsert con otro nombre de un cliente pendiente de recalcular sus claves",
+        base_de_datos.insertar_o_actualizar_cliente("Anita", "Perez", 30, "ana@prueba.com", "1234567", "Civil", "Reclamos")
+        == (cliente_id, "actualizado")
+    )
+    _verificar(
+        resultados, "segundo upsert con otro nombre",
+        base_de_datos.insertar_o_actualizar_cliente("Ana Maria", "Perez", 30, "ana@prueba.com", "1234567", "Civil", "Reclamos")
+        == (cliente_id, "actualizado")
+    )
+    _verificar(resultados, "el cliente quedó con el último nombre", base_de_datos.obtener_cliente_por_id(cliente_id).Nombre == "Ana Maria")
+    with base_de_datos.conexion() as conn:
+        pendiente = conn.execute("SELECT 1 FROM clientes_claves_pendientes WHERE Cliente_ID = ?", (cliente_id,)).fetchone()
+        claves = {fila[0] for fila in conn.execute("SELECT Clave FROM clientes_claves WHERE Cliente_ID = ?", (cliente_id,))}
+    _verificar(resultados, "las claves de duplicados quedaron calculadas para el último nombre",
+               pendiente is None and claves == set(duplicados.claves_cliente("Ana Maria", "Perez")))
+
+
+def probar_upsert(resultados, directorio):
+    """Upsert de a un cliente, en lote (insertar_clientes_lote) e importando un CSV con actualizar_existentes."""
+    datos = ("Bruno", "Diaz", 40, "bruno@prueba.com", "1234567", "Laboral", "Despido")
+    cliente_id, estado = base_de_datos.insertar_o_actualizar_cliente(*datos)
+    _verificar(resultados, "upsert de un Email nuevo lo inserta", cliente_id is not None and estado == "insertado")
+    _verificar(resultados, "upsert con los mismos datos no cambia nada",
+               base_de_datos.insertar_o_actualizar_cliente(*datos) == (cliente_id, "sin_cambios"))
+    _verificar(resultados, "upsert con un valor vacío conserva el actual (regla no_vacio)",
+               base_de_datos.insertar_o_actualizar_cliente("Bruno", "Diaz", 41, "bruno@prueba.com", "", "Laboral", "Despido")
+               == (cliente_id, "actualizado")
+               and base_de_datos.obtener_cliente_por_id(cliente_id).Telefono == "1234567")
+    base_de_datos.insertar_o_actualizar_cliente(
+        "Otro", "Diaz", 41, "bruno@prueba.com", "1234567", "Laboral", "Despido", reglas={"Nombre": "conservar"}
+    )
+    _verificar(resultados, "la regla conservar no modifica la columna", base_de_datos.obtener_cliente_por_id(cliente_id).Nombre == "Bruno")
+
+    # Lote: clientes recién agregados (pendientes de claves) renombrados, un alta y un Email repetido en el mismo lote
+    def cliente(nombre, email):
+        return {"Nombre": nombre, "Apellido": "Lopez", "Edad": 25, "Email": email, "Telefono": "7654321",
+                "Fuero": "Familia", "Tipo_de_caso": "Tenencia"}
+
+    emails = [f"lote{numero}@prueba.com" for numero in range(5)]
+    base_de_datos.insertar_clientes_lote(cliente("Carla", email) for email in emails)
+    lote = [cliente("Carolina", email) for email in emails]
+    lote += [cliente("Dario", "nuevo@prueba.com"), cliente("Carola", emails[0])]
+    resultado = base_de_datos.insertar_clientes_lote(lote, actualizar_existentes=True)
+    _verificar(resultados, "lote con actualizar_existentes: sin filas rechazadas", not resultado["rechazados"])
+    _verificar(resultados, "lote con actualizar_existentes: 1 alta y 6 actualizaciones",
+               (resultado["insertados"], resultado["actualizados"]) == (1, 6))
+    _verificar(resultados, "lote con actualizar_existentes: gana el último valor del Email repetido",
+               base_de_datos.obtener_cliente_por_email(emails[0]).Nombre == "Carola")
+
+    ruta_csv = os.path.join(directorio, "clientes.csv")
+    with open(ruta_csv, "w", encoding="utf-8") as archivo:
+        archivo.write("Nombre,Apellido,Edad,Email,Telefono,Fuero,Tipo_de_caso\n")
+        for email in emails[1:]:
+            archivo.write(f"Celina,Lopez,26,{email},7654321,Familia,Adopciones\n")
+    resumen = importador_clientes.importar_clientes(ruta_csv, actualizar_existentes=True)
+    _verificar(resultados, "importar con --actualizar: todas las filas actualizadas",
+               not resumen["rechazados"] and resumen["actualizados"] == len(emails) - 1)
+    _verificar(resultados, "importar con --actualizar: los datos quedaron en la base",
+               base_de_datos.obtener_cliente_por_email(emails[1])[1:4] == ("Celina", "Lopez", 26))
+
+
+def ejecutar_pruebas():
+    """Corre las pruebas sobre una base temporal nueva. Retorna [(descripcion, ok), ...]."""
+    resultados = []
+    directorio_temporal = tempfile.mkdtemp(prefix="prueba_upsert_")
+    try:
+        base_de_datos.configurar_base_de_datos(ruta=os.path.join(directorio_temporal, "clientes.db"))
+        base_de_datos.inicializar_db()
+        probar_cambios_de_nombre(resultados)
+        probar_upsert(resultados, directorio_temporal)
+    finally:
+        base_de_datos.pool.cerrar()
+        shutil.rmtree(directorio_temporal, ignore_errors=True)
+    return resultados
+
+
+if __name__ == "__main__":
+    resultados = ejecutar_pruebas()
+    for descripcion, ok in resultados:
+        print((Fore.GREEN + "✔️" if ok else Fore.RED + "❌") + f" {descripcion}" + Style.RESET_ALL)
+    sys.exit(0 if all(ok for _, ok in resultados) else 1)
@@ -0,0 +1,224 @@
+# Réplica de solo lectura en memoria para reportes (API de backup de SQLite)
+
+import argparse
+import contextlib
+import datetime
+import io
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from colorama import Fore, Style
+import base_de_datos
+import metricas
+import reportes
+import sincronizacion
+
+INTERVALO_REFRESCO = 300 # Segundos entre refrescos automáticos (None o 0: solo a pedido)
+REPETICIONES_COMPARACION = 3
+
+
+class ReplicaMemoria:
+    """
+    Copia completa de la base en una base SQLite ':memory:', cargada con la API de backup. Los reportes largos
+    (listados completos, respaldo .txt, reportes agregados) leen de la copia y no compiten con las altas y
+    modificaciones por el archivo. La copia refleja la base al momento del último refresco: estado() informa
+    su antigüedad y cuántos cambios (del registro de cambios) le faltan. Ocupa en memoria lo mismo que el
+    archivo y, mientras se refresca, hasta el doble (la copia nueva se carga antes de soltar la anterior).
+    Usa una sola conexión: las consultas de varios hilos sobre la réplica se ejecutan de a una.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._lock = threading.Lock() # Evita dos refrescos a la vez
+        self._detener = threading.Event()
+        self._hilo = None
+        self.intervalo = None
+        self.fecha_refresco = None
+        self.segundos_refresco = None
+        self._instante_refresco = None
+        self._secuencia = None
+
+    def conexion(self):
+        """Conexión a la réplica vigente, o None si no está cargada."""
+        return self._conn
+
+    def refrescar(self):
+        """
+        Carga una copia nueva de la base y la pone en uso. Los reportes que estaban leyendo la copia anterior
+        terminan sobre ella; la memoria se libera cuando nadie la usa. Retorna True si se refrescó.
+        """
+        with self._lock:
+            inicio = time.perf_counter()
+            destino = sqlite3.connect(
+                ":memory:", isolation_level=None, check_same_thread=False, factory=metricas.ConexionInstrumentada
+            )
+            try:
+                with base_de_datos.pool.conexion() as origen:
+                    origen.backup(destino) # Un solo paso: la copia corresponde a una única lectura consistente
+                destino.row_factory = sqlite3.Row
+                destino.execute("PRAGMA query_only = ON") # Cualquier escritura en la réplica es un error
+                fila = destino.execute("SELECT seq FROM sqlite_sequence WHERE name = 'clientes_cambios'").fetchone()
+            except sqlite3.Error as e:
+                destino.close()
+                print(Fore.RED + f"❌ Error al cargar la réplica en memoria: {e}" + Style.RESET_ALL)
+                return False
+            self._conn = destino
+            self._secuencia = fila[0] if fila else 0
+            self._instante_refresco = time.monotonic()
+            self.fecha_refresco = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+            self.segundos_refresco = time.perf_counter() - inicio
+            metricas.medir_evento("replica.refresco", self.segundos_refresco)
+            return True
+
+    def iniciar_refresco_periodico(self, intervalo=INTERVALO_REFRESCO):
+        """Refresca la réplica cada `intervalo` segundos en un hilo en segundo plano."""
+        self.detener_refresco_periodico()
+        self.intervalo = intervalo
+        if not intervalo:
+            return
+        self._detener.clear()
+
+        def refrescar_periodicamente():
+            while not self._detener.wait(intervalo):
+                self.refrescar()
+
+        self._hilo = threading.Thread(target=refrescar_periodicamente, name="replica-reportes", daemon=True)
+        self._hilo.start()
+
+    def detener_refresco_periodico(self):
+        if self._hilo is not None:
+            self._detener.set()
+            self._hilo.join()
+            self._hilo = None
+        self.intervalo = None
+
+    def descartar(self):
+        """Detiene el refresco periódico y suelta la réplica."""
+        self.detener_refresco_periodico()
+        self._conn = None
+        self.fecha_refresco = self.segundos_refresco = self._instante_refresco = self._secuencia = None
+
+    def estado(self):
+        """
+        Estado de la réplica: 'cargada', 'fecha_refresco', 'antiguedad_segundos', 'cambios_pendientes'
+        (altas, modificaciones y bajas en el archivo desde el refresco; None si no se puede saber, por ejemplo
+        tras restaurar una instantánea), 'bytes' en memoria, 'segundos_refresco' e 'intervalo'.
+        """
+        conn = self._conn
+        if conn is None:
+            return {"cargada": False, "intervalo": self.intervalo}
+        with base_de_datos.lecturas_desde(None): # La secuencia actual se lee del archivo, no de la réplica
+            ultima = sincronizacion.ultima_secuencia()
+        pendientes = ultima - self._secuencia if ultima is not None and ultima >= self._secuencia else None
+        paginas = conn.execute("PRAGMA page_count").fetchone()[0]
+        tamano_pagina = conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "cargada": True,
+            "fecha_refresco": self.fecha_refresco,
+            "antiguedad_segundos": time.monotonic() - self._instante_refresco,
+            "cambios_pendientes": pendientes,
+            "bytes": paginas * tamano_pagina,
+            "segundos_refresco": self.segundos_refresco,
+            "intervalo": self.intervalo,
+        }
+
+
+# Réplica compartida por los reportes de la aplicación
+replica = ReplicaMemoria()
+
+def configurar_replica_reportes(activa=True, intervalo=INTERVALO_REFRESCO):
+    """
+    Activa el modo reportes: carga la réplica y la refresca cada `intervalo` segundos (None o 0: solo a pedido
+    con replica.refrescar()). Con activa=False la descarta y los reportes vuelven a leer el archivo.
+    Retorna True si la réplica quedó cargada.
+    """
+    if not activa:
+        replica.descartar()
+        return False
+    if not replica.refrescar():
+        return False
+    replica.iniciar_refresco_periodico(intervalo)
+    return True
+
+@contextlib.contextmanager
+def modo_reportes():
+    """
+    Dentro del bloque, las lecturas de base_de_datos de este hilo usan la réplica si está cargada
+    (si no, el archivo como siempre). Entrega True si se está leyendo de la réplica.
+    """
+    conn = replica.conexion()
+    if conn is None:
+        yield False
+        return
+    with base_de_datos.lecturas_desde(conn):
+        yield True
+
+
+def _cargas_de_reportes(directorio_respaldo):
+    """Reportes de administración que se comparan: nombre -> función sin argumentos."""
+    def respaldo_txt():
+        with contextlib.redirect_stdout(io.StringIO()):
+            base_de_datos.generar_respaldo_txt(directorio=directorio_respaldo)
+    return {
+        "reporte_de_gestion": reportes.generar_reporte,
+        "filtro_por_edad": lambda: (base_de_datos.contar_clientes(edad_min=18), base_de_datos.contar_clientes(edad_max=17)),
+        "listado_completo": lambda: sum(1 for _ in base_de_datos.iterar_clientes()),
+        "respaldo_txt": respaldo_txt,
+    }
+
+def comparar_latencias(repeticiones=REPETICIONES_COMPARACION):
+    """
+    Mide cada reporte leyendo el archivo y leyendo la réplica (carga una si no hay). Retorna
+    {reporte: {"archivo_ms": mediana, "replica_ms": mediana}} o None si no se pudo cargar la réplica.
+    """
+    if replica.conexion() is None and not replica.refrescar():
+        return None
+    directorio_respaldo = tempfile.mkdtemp(prefix="replica_reportes_")
+    try:
+        resultado = {}
+        for nombre, carga in _cargas_de_reportes(directorio_respaldo).items():
+            tiempos = {"archivo_ms": [], "replica_ms": []}
+            for _ in range(repeticiones):
+                for clave, contexto in (("archivo_ms", base_de_datos.lecturas_desde(None)), ("replica_ms", modo_reportes())):
+                    with contexto:
+                        inicio = time.perf_counter()
+                        carga()
+                        tiempos[clave].append((time.perf_counter() - inicio) * 1000)
+            resultado[nombre] = {clave: statistics.median(valores) for clave, valores in tiempos.items()}
+        return resultado
+    finally:
+        shutil.rmtree(directorio_respaldo, ignore_errors=True)
+
+
+def mostrar_estado(estado):
+    """Imprime si la réplica está cargada, su antigüedad, los cambios que le faltan y la memoria que ocupa."""
+    if not estado["cargada"]:
+        print(Fore.YELLOW + "La réplica en memoria no está cargada: los reportes leen el archivo." + Style.RESET_ALL)
+        return
+    pendientes = "desconocidos" if estado["cambios_pendientes"] is None else f"{estado['cambios_pendientes']:,}"
+    refresco = f"cada {estado['intervalo']} s" if estado["intervalo"] else "a pedido"
+    print(f"Réplica cargada el {estado['fecha_refresco']} (hace {estado['antiguedad_segundos']:.0f} s, "
+          f"carga en {estado['segundos_refresco']:.2f} s), refresco {refresco}")
+    print(f"Cambios en el archivo desde el refresco: {pendientes}  |  Memoria: {estado['bytes'] / 1024 / 1024:.1f} MB")
+
+def mostrar_comparacion(resultado):
+    """Imprime la latencia de cada reporte leyendo el archivo y la réplica."""
+    if resultado is None:
+        return
+    print(f"   {'Reporte':<22} {'Archivo':>12} {'Réplica':>12}")
+    for nombre, tiempos in resultado.items():
+        print(f"   {nombre:<22} {tiempos['archivo_ms']:>9.1f} ms {tiempos['replica_ms']:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Réplica en memoria para reportes: estado y comparación de latencias.")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES_COMPARACION)
+    args = parser.parse_args()
+    base_de_datos.inicializar_db()
+    resultado = comparar_latencias(args.repeticiones)
+    if resultado is not None:
+        mostrar_estado(replica.estado())
+        mostrar_comparacion(resultado)
@@ -0,0 +1,120 @@
+# Reportes de gestión (agregados en una sola pasada sobre la tabla)
+
+import datetime
+import sqlite3
+from colorama import Fore, Style
+import base_de_datos
+import metricas
+
+# Rangos de edad del reporte: (etiqueta, edad mínima, edad máxima) con ambos extremos inclusivos
+RANGOS_EDAD = [
+    ("0-17", 0, 17),
+    ("18-29", 18, 29),
+    ("30-44", 30, 44),
+    ("45-64", 45, 64),
+    ("65+", 65, None),
+]
+SIN_DATO = "Sin dato"
+
+def _expresion_rango_edad():
+    """Expresión CASE de SQL que asigna a cada fila la etiqueta de su rango de edad."""
+    casos = []
+    for etiqueta, _, maximo in RANGOS_EDAD:
+        if maximo is None:
+            casos.append(f"ELSE '{etiqueta}'")
+        else:
+            casos.append(f"WHEN Edad <= {maximo} THEN '{etiqueta}'")
+    return f"CASE WHEN Edad IS NULL THEN '{SIN_DATO}' {' '.join(casos)} END"
+
+def _sumar(contador, clave, cantidad):
+    contador[clave] = contador.get(clave, 0) + cantidad
+
+@metricas.medir
+def generar_reporte():
+    """
+    Calcula en una única consulta agrupada (una sola lectura de la tabla) la cantidad de clientes
+    por fuero, por tipo de caso, por rango de edad y por mes de registro.
+    Retorna un diccionario con 'total', 'mayores_de_edad', 'menores_de_edad', 'por_fuero',
+    'por_tipo_de_caso' (clave (fuero, tipo)), 'por_rango_edad' y 'por_mes' (clave 'AAAA-MM').
+    """
+    reporte = {
+        "total": 0, "mayores_de_edad": 0, "menores_de_edad": 0,
+        "por_fuero": {}, "por_tipo_de_caso": {}, "por_rango_edad": {}, "por_mes": {},
+    }
+    # Se agrupa por la combinación de todas las dimensiones; como tienen pocos valores posibles
+    # el resultado es chico, y los totales por dimensión se suman en Python sin volver a leer la tabla.
+    sql = f'''
+        SELECT Fuero, Tipo_de_caso, {_expresion_rango_edad()} AS Rango_edad,
+               COALESCE(substr(Fecha_registro, 1, 7), '{SIN_DATO}') AS Mes,
+               SUM(Edad >= 18) AS Mayores, SUM(Edad < 18) AS Menores, COUNT(*) AS Cantidad
+        FROM clientes
+        GROUP BY Fuero, Tipo_de_caso, Rango_edad, Mes
+    '''
+    try:
+        with base_de_datos.conexion() as conn:
+            for fila in conn.execute(sql):
+                cantidad = fila["Cantidad"]
+                reporte["total"] += cantidad
+                reporte["mayores_de_edad"] += fila["Mayores"] or 0
+                reporte["menores_de_edad"] += fila["Menores"] or 0
+                _sumar(reporte["por_fuero"], fila["Fuero"], cantidad)
+                _sumar(reporte["por_tipo_de_caso"], (fila["Fuero"], fila["Tipo_de_caso"]), cantidad)
+                _sumar(reporte["por_rango_edad"], fila["Rango_edad"], cantidad)
+                _sumar(reporte["por_mes"], fila["Mes"], cantidad)
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error de base de datos al generar el reporte: {e}" + Style.RESET_ALL)
+    return reporte
+
+def filtros_de_rango_edad(etiqueta):
+    """Convierte la etiqueta de un rango de edad en los filtros edad_min / edad_max de base_de_datos."""
+    for nombre, minimo, maximo in RANGOS_EDAD:
+        if nombre == etiqueta:
+            return {"edad_min": minimo, "edad_max": maximo}
+    raise ValueError(f"Rango de edad desconocido: {etiqueta}")
+
+def filtros_de_mes(mes):
+    """
+    Convierte 'AAAA-MM' en los filtros fecha_desde / fecha_hasta de base_de_datos.
+    Lanza ValueError si el mes no existe o no tiene dos dígitos (Fecha_registro se compara como texto).
+    """
+    fecha = datetime.datetime.strptime(mes, "%Y-%m")
+    if len(mes) != 7:
+        raise ValueError(f"Mes inválido: {mes} (use AAAA-MM)")
+    anio, numero_mes = fecha.year, fecha.month
+    siguiente = f"{anio + 1:04d}-01" if numero_mes == 12 else f"{anio:04d}-{numero_mes + 1:02d}"
+    return {"fecha_desde": f"{anio:04d}-{numero_mes:02d}", "fecha_hasta": siguiente}
+
+def detalle_reporte(fuero=None, tipo_de_caso=None, rango_edad=None, mes=None, tamano_pagina=500):
+    """
+    Drill-down: genera, página por página, los clientes que forman parte de una celda del reporte.
+    Solo lee las filas cuando se recorre el generador.
+    """
+    filtros = {"fuero": fuero, "tipo_de_caso": tipo_de_caso}
+    if rango_edad is not None:
+        filtros.update(filtros_de_rango_edad(rango_edad))
+    if mes is not None:
+        filtros.update(filtros_de_mes(mes))
+    return base_de_datos.iterar_clientes(tamano_pagina=tamano_pagina, **filtros)
+
+def mostrar_reporte(reporte):
+    """Imprime el reporte de gestión en forma de tablas simples."""
+    print(Fore.MAGENTA + f"\n--- Reporte de Gestión ({reporte['total']} clientes) ---" + Style.RESET_ALL)
+    print(f"Mayores de 18 años: {reporte['mayores_de_edad']}  |  Menores de 18 años: {reporte['menores_de_edad']}")
+
+    print(Fore.BLUE + "\nPor fuero:" + Style.RESET_ALL)
+    for fuero, cantidad in sorted(reporte["por_fuero"].items()):
+        print(f"   {fuero:<12} {cantidad:>8}")
+
+    print(Fore.BLUE + "\nPor tipo de caso:" + Style.RESET_ALL)
+    for (fuero, tipo), cantidad in sorted(reporte["por_tipo_de_caso"].items()):
+        print(f"   {fuero + ' / ' + tipo:<35} {cantidad:>8}")
+
+    print(Fore.BLUE + "\nPor rango de edad:" + Style.RESET_ALL)
+    for etiqueta in [nombre for nombre, _, _ in RANGOS_EDAD] + [SIN_DATO]:
+        if etiqueta in reporte["por_rango_edad"]:
+            print(f"   {etiqueta:<12} {reporte['por_rango_edad'][etiqueta]:>8}")
+
+    print(Fore.BLUE + "\nPor mes de registro:" + Style.RESET_ALL)
+    for mes, cantidad in sorted(reporte["por_mes"].items()):
+        print(f"   {mes:<12} {cantidad:>8}")
+    print(Fore.MAGENTA + "---------------------------------------" + Style.RESET_ALL)
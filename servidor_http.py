@@ -0,0 +1,253 @@
+# API HTTP local (JSON) sobre base_de_datos
+
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+from colorama import Fore, Style
+import base_de_datos
+import importador_clientes
+import replica_lectura
+import reportes
+
+HOST_POR_DEFECTO = "127.0.0.1"
+PUERTO_POR_DEFECTO = 8080
+TRABAJADORES_POR_DEFECTO = 8
+TAMANO_PAGINA_MAXIMO = 1000
+
+# Las escrituras pasan por el escritor único de base_de_datos (configurar_cola_escritura): los hilos del
+# servidor nunca compiten entre sí por el bloqueo de escritura ("database is locked") y las altas concurrentes
+# se confirman juntas en un solo COMMIT. Las lecturas se hacen en paralelo desde los hilos trabajadores (WAL).
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ServidorClientes(HTTPServer):
+    """HTTPServer que atiende cada conexión en un pool acotado de hilos trabajadores."""
+    daemon_threads = True
+
+    def __init__(self, direccion, manejador, trabajadores=TRABAJADORES_POR_DEFECTO):
+        super().__init__(direccion, manejador)
+        self._trabajadores = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix="http")
+
+    def process_request(self, request, client_address):
+        self._trabajadores.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._trabajadores.shutdown(wait=False, cancel_futures=True)
+
+
+class ManejadorClientes(BaseHTTPRequestHandler):
+    """
+    Endpoints:
+      GET    /clientes?despues_de_id=0&limite=100&fuero=&edad_min=&edad_max=   (listado paginado, en streaming)
+      GET    /clientes/<id>            GET /clientes?email=<email>
+      POST   /clientes                 (JSON con Nombre, Apellido, Edad, Email, Telefono, Fuero, Tipo_de_caso)
+      PATCH  /clientes/<id>            (JSON con los campos a cambiar)
+      DELETE /clientes/<id>
+      GET    /buscar?q=<texto>         GET /reporte         GET /metricas
+    """
+    protocol_version = "HTTP/1.1" # Mantiene la conexión abierta entre pedidos (keep-alive)
+    server_version = "ClientesMM/1.0"
+    timeout = 15 # Segundos de inactividad antes de cerrar una conexión keep-alive y liberar el hilo
+    disable_nagle_algorithm = True # Sin TCP_NODELAY, encabezados y cuerpo por separado suman ~40 ms por pedido
+
+    def log_message(self, formato, *args): # Sin un log por pedido en la consola
+        pass
+
+    # Respuestas
+
+    def _enviar_json(self, estado, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _enviar_fragmento(self, texto):
+        datos = texto.encode("utf-8")
+        self.wfile.write(f"{len(datos):X}\r\n".encode("ascii") + datos + b"\r\n")
+
+    def _enviar_listado(self, paginas, limite):
+        """Envía el listado con Transfer-Encoding: chunked, una página por fragmento."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._enviar_fragmento('{"clientes": [')
+        enviados, ultimo_id, separador = 0, None, ""
+        for pagina in paginas:
+            if not pagina:
+                break
+            self._enviar_fragmento(separador + ", ".join(
+                json.dumps(cliente.a_dict(con_fecha_formateada=True), ensure_ascii=False) for cliente in pagina
+            ))
+            separador = ", "
+            enviados += len(pagina)
+            ultimo_id = pagina[-1].ID
+        siguiente = ultimo_id if enviados == limite else None
+        self._enviar_fragmento(f'], "cantidad": {enviados}, "siguiente_despues_de_id": {json.dumps(siguiente)}}}')
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _leer_json(self):
+        largo = int(self.headers.get("Content-Length") or 0)
+        try:
+            datos = json.loads(self.rfile.read(largo) or b"{}")
+        except json.JSONDecodeError:
+            raise ErrorHTTP(400, "JSON inválido")
+        if not isinstance(datos, dict):
+            raise ErrorHTTP(400, "Se esperaba un objeto JSON")
+        return datos
+
+    # Ruteo
+
+    def _despachar(self, metodo):
+        partes = urlsplit(self.path)
+        ruta = [unquote(p) for p in partes.path.strip("/").split("/") if p]
+        consulta = {clave: valores[-1] for clave, valores in parse_qs(partes.query).items()}
+        try:
+            if ruta == ["clientes"] and metodo == "GET":
+                return self._listar(consulta)
+            if ruta == ["clientes"] and metodo == "POST":
+                return self._crear()
+            if len(ruta) == 2 and ruta[0] == "clientes":
+                cliente_id = self._entero(ruta[1], "ID")
+                if metodo == "GET":
+                    return self._obtener(base_de_datos.obtener_cliente_por_id(cliente_id))
+                if metodo == "PATCH":
+                    return self._actualizar(cliente_id)
+                if metodo == "DELETE":
+                    if not base_de_datos.eliminar_cliente_db(cliente_id):
+                        raise ErrorHTTP(404, "Cliente no encontrado")
+                    return self._enviar_json(200, {"ID": cliente_id, "eliminado": True})
+            if ruta == ["buscar"] and metodo == "GET":
+                clientes = base_de_datos.buscar_clientes_texto(consulta.get("q", ""), self._entero(consulta.get("limite", 20), "limite"))
+                return self._enviar_json(200, {"clientes": [c.a_dict(con_fecha_formateada=True) for c in clientes]})
+            if ruta == ["reporte"] and metodo == "GET":
+                with replica_lectura.modo_reportes():
+                    reporte = reportes.generar_reporte()
+                reporte["por_tipo_de_caso"] = {f"{f}/{t}": n for (f, t), n in reporte["por_tipo_de_caso"].items()}
+                return self._enviar_json(200, reporte)
+            if ruta == ["metricas"] and metodo == "GET":
+                return self._enviar_json(200, base_de_datos.estadisticas_rendimiento())
+            raise ErrorHTTP(404, "Ruta no encontrada")
+        except ErrorHTTP as e:
+            self._enviar_json(e.estado, {"error": str(e)})
+
+    def do_GET(self):
+        self._despachar("GET")
+
+    def do_POST(self):
+        self._despachar("POST")
+
+    def do_PATCH(self):
+        self._despachar("PATCH")
+
+    def do_DELETE(self):
+        self._despachar("DELETE")
+
+    # Operaciones
+
+    @staticmethod
+    def _entero(valor, nombre):
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            raise ErrorHTTP(400, f"{nombre} debe ser un número entero")
+
+    def _obtener(self, cliente):
+        if cliente is None:
+            raise ErrorHTTP(404, "Cliente no encontrado")
+        self._enviar_json(200, cliente.a_dict(con_fecha_formateada=True))
+
+    def _listar(self, consulta):
+        if "email" in consulta:
+            return self._obtener(base_de_datos.obtener_cliente_por_email(consulta["email"].lower()))
+        despues_de_id = self._entero(consulta.get("despues_de_id", 0), "despues_de_id")
+        limite = min(self._entero(consulta.get("limite", 100), "limite"), TAMANO_PAGINA_MAXIMO)
+        filtros = {"fuero": consulta.get("fuero")}
+        for clave in ("edad_min", "edad_max"):
+            if clave in consulta:
+                filtros[clave] = self._entero(consulta[clave], clave)
+
+        def paginas(tamano=200):
+            restantes, ultimo = limite, despues_de_id
+            while restantes > 0:
+                pagina = base_de_datos.obtener_pagina_clientes(ultimo, min(tamano, restantes), **filtros)
+                yield pagina
+                if len(pagina) < min(tamano, restantes):
+                    return
+                restantes -= len(pagina)
+                ultimo = pagina[-1].ID
+        self._enviar_listado(paginas(), limite)
+
+    def _crear(self):
+        registro = importador_clientes.normalizar_registro(self._leer_json())
+        error = importador_clientes.validar_registro(registro)
+        if error:
+            raise ErrorHTTP(400, error)
+        nuevo_id = base_de_datos.insertar_cliente(
+            registro["Nombre"], registro["Apellido"], registro["Edad"],
+            registro["Email"], registro["Telefono"], registro["Fuero"], registro["Tipo_de_caso"]
+        )
+        if nuevo_id is None:
+            raise ErrorHTTP(409, "No se pudo agregar el cliente (¿email duplicado?)")
+        self._enviar_json(201, {"ID": nuevo_id})
+
+    def _actualizar(self, cliente_id):
+        cambios = importador_clientes.normalizar_registro(self._leer_json())
+        cliente = base_de_datos.obtener_cliente_por_id(cliente_id)
+        if cliente is None:
+            raise ErrorHTTP(404, "Cliente no encontrado")
+        registro = {**cliente.a_dict(), **cambios}
+        error = importador_clientes.validar_registro(registro)
+        if error:
+            raise ErrorHTTP(400, error)
+        if not base_de_datos.actualizar_cliente_db(
+            cliente_id, registro["Nombre"], registro["Apellido"], registro["Edad"],
+            registro["Email"], registro["Telefono"], registro["Fuero"], registro["Tipo_de_caso"]
+        ):
+            raise ErrorHTTP(409, "No se pudo actualizar el cliente (¿email duplicado?)")
+        self._enviar_json(200, {"ID": cliente_id, "actualizado": True})
+
+
+def crear_servidor(host=HOST_POR_DEFECTO, puerto=PUERTO_POR_DEFECTO, trabajadores=TRABAJADORES_POR_DEFECTO):
+    """Crea el servidor (sin iniciarlo). El pool de conexiones se ajusta a la cantidad de hilos."""
+    base_de_datos.configurar_base_de_datos(tamano_pool=trabajadores + 1)
+    base_de_datos.configurar_cola_escritura()
+    base_de_datos.inicializar_db()
+    return ServidorClientes((host, puerto), ManejadorClientes, trabajadores)
+
+def iniciar_en_segundo_plano(**opciones):
+    """Inicia el servidor en un hilo aparte y lo retorna (útil para pruebas de carga)."""
+    servidor = crear_servidor(**opciones)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    puerto = int(sys.argv[1]) if len(sys.argv) > 1 else PUERTO_POR_DEFECTO
+    servidor = crear_servidor(puerto=puerto)
+    print(Fore.GREEN + f"✔️  API de clientes escuchando en http://{HOST_POR_DEFECTO}:{puerto} (Ctrl+C para salir)" + Style.RESET_ALL)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print(Fore.CYAN + "\nServidor detenido." + Style.RESET_ALL)
+    finally:
+        servidor.server_close()
@@ -0,0 +1,308 @@
+# Registro de cambios de clientes (CDC) y sincronización diferencial de una copia de respaldo en SQLite
+
+import argparse
+import datetime
+import os
+import sqlite3
+import time
+from collections import namedtuple
+from colorama import Fore, Style
+import base_de_datos
+import metricas
+from modelo_cliente import COLUMNAS_CLIENTE, Cliente
+
+RUTA_REPLICA = os.path.join(base_de_datos.BASE_DIR, "respaldo_clientes.db")
+TAMANO_LOTE_CAMBIOS = 5000 # Cambios aplicados por transacción al sincronizar
+MAX_CAMBIOS_CONSERVADOS = 1_000_000 # Tope del registro tras compactar; un lector que quede más atrás debe copiar todo
+
+# Un cambio del registro y la fila actual del cliente (None si ya no existe): el lector aplica el estado actual,
+# así que solo importa el último cambio de cada cliente y aplicar dos veces el mismo lote no tiene efecto
+Cambio = namedtuple("Cambio", ("Secuencia", "Operacion", "Cliente_ID", "Cliente"))
+
+_COLUMNAS = ", ".join(COLUMNAS_CLIENTE)
+SELECT_CAMBIOS = (
+    'SELECT clientes_cambios.Secuencia, clientes_cambios.Operacion, clientes_cambios.Cliente_ID, '
+    f'{", ".join("clientes." + columna for columna in COLUMNAS_CLIENTE)} FROM clientes_cambios '
+    'LEFT JOIN clientes ON clientes.ID = clientes_cambios.Cliente_ID '
+    'WHERE clientes_cambios.Secuencia > ? ORDER BY clientes_cambios.Secuencia LIMIT ?'
+)
+# IDs de clientes con cambios en un rango (desde, hasta] de secuencias
+_IDS_CAMBIADOS = 'SELECT Cliente_ID FROM main.clientes_cambios WHERE Secuencia > ? AND Secuencia <= ?'
+
+
+def _ultima_secuencia(conn):
+    """Se lee de sqlite_sequence: es válida aunque la compactación haya borrado todos los cambios."""
+    fila = conn.execute("SELECT seq FROM main.sqlite_sequence WHERE name = 'clientes_cambios'").fetchone()
+    return fila[0] if fila else 0
+
+def ultima_secuencia():
+    """Última secuencia asignada en el registro de cambios (0 si nunca hubo cambios), o None si hubo un error."""
+    try:
+        with base_de_datos.conexion() as conn:
+            return _ultima_secuencia(conn)
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al leer el registro de cambios: {e}" + Style.RESET_ALL)
+        return None
+
+@metricas.medir
+def obtener_cambios(desde_secuencia=0, limite=TAMANO_LOTE_CAMBIOS):
+    """
+    Hasta `limite` cambios con secuencia mayor a `desde_secuencia`, en orden, como registros Cambio
+    (operación 'I', 'U' o 'D' y la fila actual del cliente). Para seguir leyendo se pasa la Secuencia
+    del último cambio recibido. Retorna la lista (vacía si no hay más cambios) o None si hubo un error.
+    """
+    try:
+        with base_de_datos.conexion() as conn:
+            return [
+                Cambio(fila[0], fila[1], fila[2], Cliente(*fila[3:]) if fila[3] is not None else None)
+                for fila in conn.execute(SELECT_CAMBIOS, (desde_secuencia, limite))
+            ]
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al leer el registro de cambios: {e}" + Style.RESET_ALL)
+        return None
+
+def iterar_cambios(desde_secuencia=0, tamano_lote=TAMANO_LOTE_CAMBIOS):
+    """Genera los cambios posteriores a `desde_secuencia` en lotes (listas de Cambio) de hasta `tamano_lote`."""
+    while True:
+        lote = obtener_cambios(desde_secuencia, tamano_lote)
+        if not lote:
+            return
+        yield lote
+        desde_secuencia = lote[-1].Secuencia
+
+
+# Lectores registrados: la compactación conserva los cambios que todavía no leyeron
+
+def posicion_consumidor(consumidor):
+    """Secuencia hasta la que leyó el consumidor, o None si no está registrado o debe volver a copiar todo."""
+    try:
+        with base_de_datos.conexion() as conn:
+            fila = conn.execute(
+                'SELECT Secuencia FROM clientes_cambios_consumidores WHERE Consumidor = ?', (consumidor,)
+            ).fetchone()
+        return fila[0] if fila else None
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al leer la posición de '{consumidor}': {e}" + Style.RESET_ALL)
+        return None
+
+def guardar_posicion(consumidor, secuencia):
+    """Registra (o actualiza) hasta qué secuencia leyó el consumidor. Retorna True si se guardó."""
+    try:
+        with base_de_datos.transaccion() as conn:
+            conn.execute(
+                'INSERT INTO clientes_cambios_consumidores (Consumidor, Secuencia, Fecha) VALUES (?, ?, ?) '
+                'ON CONFLICT(Consumidor) DO UPDATE SET Secuencia = excluded.Secuencia, Fecha = excluded.Fecha',
+                (consumidor, secuencia, datetime.datetime.now().isoformat(timespec="seconds"))
+            )
+        return True
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al guardar la posición de '{consumidor}': {e}" + Style.RESET_ALL)
+        return False
+
+def eliminar_consumidor(consumidor):
+    """Deja de conservar cambios para el consumidor. Retorna True si estaba registrado."""
+    try:
+        with base_de_datos.transaccion() as conn:
+            return conn.execute('DELETE FROM clientes_cambios_consumidores WHERE Consumidor = ?', (consumidor,)).rowcount > 0
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al eliminar el consumidor '{consumidor}': {e}" + Style.RESET_ALL)
+        return False
+
+def reiniciar_consumidores():
+    """
+    Obliga a todos los consumidores a volver a copiar todo (por ejemplo, después de restaurar una instantánea:
+    el registro y la secuencia vuelven atrás). Retorna la cantidad de consumidores reiniciados.
+    """
+    try:
+        with base_de_datos.transaccion() as conn:
+            return conn.execute('UPDATE clientes_cambios_consumidores SET Secuencia = NULL WHERE Secuencia IS NOT NULL').rowcount
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al reiniciar los consumidores de cambios: {e}" + Style.RESET_ALL)
+        return 0
+
+def estado_cambios():
+    """Última secuencia, cambios guardados y consumidores [(consumidor, secuencia, fecha)], o None si hubo un error."""
+    try:
+        with base_de_datos.conexion() as conn:
+            return {
+                "ultima_secuencia": _ultima_secuencia(conn),
+                "cambios": conn.execute('SELECT COUNT(*) FROM clientes_cambios').fetchone()[0],
+                "consumidores": [tuple(fila) for fila in conn.execute(
+                    'SELECT Consumidor, Secuencia, Fecha FROM clientes_cambios_consumidores ORDER BY Consumidor'
+                )],
+            }
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al leer el registro de cambios: {e}" + Style.RESET_ALL)
+        return None
+
+@metricas.medir
+def compactar_cambios(max_cambios=MAX_CAMBIOS_CONSERVADOS):
+    """
+    Mantiene acotado el registro de cambios, en una transacción:
+    - de cada cliente se conserva solo el último cambio (los lectores aplican la fila actual);
+    - se borran los cambios que ya leyeron todos los consumidores registrados (todos, si no hay ninguno);
+    - si aun así quedan más de `max_cambios`, se borran los más antiguos y los consumidores que no los
+      habían leído quedan marcados para volver a copiar todo.
+    Retorna {'borrados', 'conservados', 'consumidores_reiniciados'} o None si hubo un error.
+    """
+    try:
+        with base_de_datos.transaccion() as conn:
+            antes = conn.execute('SELECT COUNT(*) FROM clientes_cambios').fetchone()[0]
+            conn.execute(
+                'DELETE FROM clientes_cambios WHERE Secuencia NOT IN '
+                '(SELECT MAX(Secuencia) FROM clientes_cambios GROUP BY Cliente_ID)'
+            )
+            horizonte = conn.execute(
+                'SELECT MIN(Secuencia) FROM clientes_cambios_consumidores WHERE Secuencia IS NOT NULL'
+            ).fetchone()[0]
+            if horizonte is None: # Sin lectores al día: un lector nuevo empieza con una copia completa
+                horizonte = _ultima_secuencia(conn)
+            conn.execute('DELETE FROM clientes_cambios WHERE Secuencia <= ?', (horizonte,))
+            reiniciados = 0
+            if max_cambios is not None:
+                limite = conn.execute(
+                    'SELECT Secuencia FROM clientes_cambios ORDER BY Secuencia DESC LIMIT 1 OFFSET ?', (max_cambios,)
+                ).fetchone()
+                if limite:
+                    conn.execute('DELETE FROM clientes_cambios WHERE Secuencia <= ?', (limite[0],))
+                    reiniciados = conn.execute(
+                        'UPDATE clientes_cambios_consumidores SET Secuencia = NULL WHERE Secuencia < ?', (limite[0],)
+                    ).rowcount
+            conservados = conn.execute('SELECT COUNT(*) FROM clientes_cambios').fetchone()[0]
+        return {"borrados": antes - conservados, "conservados": conservados, "consumidores_reiniciados": reiniciados}
+    except sqlite3.Error as e:
+        print(Fore.RED + f"❌ Error al compactar el registro de cambios: {e}" + Style.RESET_ALL)
+        return None
+
+
+# Copia de respaldo diferencial
+
+def _crear_esquema_replica(conn):
+    # Sin UNIQUE en Email: entre lotes la copia puede tener por un momento dos clientes con el mismo email
+    # (uno ya actualizado y otro todavía no); al terminar la sincronización coincide con la base
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS replica.clientes (
+            ID INTEGER PRIMARY KEY,
+            Nombre TEXT NOT NULL,
+            Apellido TEXT NOT NULL,
+            Edad INTEGER,
+            Email TEXT NOT NULL,
+            Telefono TEXT NOT NULL,
+            Fuero TEXT NOT NULL,
+            Tipo_de_caso TEXT NOT NULL,
+            Fecha_registro TEXT
+        )
+    ''')
+    conn.execute('CREATE TABLE IF NOT EXISTS replica.sincronizacion (Secuencia INTEGER NOT NULL, Fecha TEXT NOT NULL)')
+
+def _guardar_posicion_replica(conn, secuencia):
+    conn.execute('DELETE FROM replica.sincronizacion')
+    conn.execute('INSERT INTO replica.sincronizacion VALUES (?, ?)', (secuencia, datetime.datetime.now().isoformat(timespec="seconds")))
+
+@metricas.medir
+def sincronizar_replica(ruta=None, tamano_lote=TAMANO_LOTE_CAMBIOS, compactar=True):
+    """
+    Actualiza la copia de respaldo `ruta` (por defecto 'respaldo_clientes.db') aplicando solo los cambios
+    registrados desde la sincronización anterior, incluidas las bajas. La primera vez, o si la copia quedó
+    demasiado atrás, se copia la tabla completa.
+    La copia se adjunta (ATTACH) a una conexión propia y cada lote se aplica en una transacción con
+    INSERT ... SELECT desde la base, sin pasar las filas por Python; la posición se guarda en la misma
+    transacción, por lo que un corte a mitad de camino se retoma desde el último lote aplicado.
+    Retorna un resumen (modo, desde, hasta, cambios, clientes copiados, segundos) o None si hubo un error.
+    """
+    ruta = os.path.abspath(ruta or RUTA_REPLICA)
+    consumidor = f"replica:{ruta}"
+    inicio = time.perf_counter()
+    resumen = {"replica": ruta, "modo": "incremental", "desde": None, "hasta": None, "cambios": 0, "clientes": 0}
+    conn = sqlite3.connect(base_de_datos.DB_FILE_PATH, isolation_level=None)
+    try:
+        conn.execute(f"PRAGMA busy_timeout = {base_de_datos.pool.pragmas.get('busy_timeout') or 5000}")
+        conn.execute("ATTACH DATABASE ? AS replica", (ruta,))
+        _crear_esquema_replica(conn)
+        fila = conn.execute('SELECT Secuencia FROM replica.sincronizacion').fetchone()
+        posicion = fila[0] if fila else None
+        registrada = posicion_consumidor(consumidor)
+
+        if posicion is None or registrada is None or posicion < registrada:
+            # Se registra antes de copiar para que una compactación simultánea conserve los cambios que siguen
+            resumen["modo"] = "completa"
+            guardar_posicion(consumidor, _ultima_secuencia(conn))
+            conn.execute("BEGIN")
+            conn.execute('DELETE FROM replica.clientes')
+            posicion = _ultima_secuencia(conn) # Misma instantánea de lectura que la copia de abajo
+            resumen["clientes"] = conn.execute(
+                f'INSERT INTO replica.clientes ({_COLUMNAS}) SELECT {_COLUMNAS} FROM main.clientes'
+            ).rowcount
+            _guardar_posicion_replica(conn, posicion)
+            conn.execute("COMMIT")
+            guardar_posicion(consumidor, posicion)
+        else:
+            resumen["desde"] = posicion
+            while True:
+                conn.execute("BEGIN")
+                hasta = conn.execute(
+                    'SELECT MAX(Secuencia) FROM (SELECT Secuencia FROM main.clientes_cambios '
+                    'WHERE Secuencia > ? ORDER BY Secuencia LIMIT ?)', (posicion, tamano_lote)
+                ).fetchone()[0]
+                if hasta is None:
+                    conn.execute("ROLLBACK")
+                    break
+                # Borrar y volver a copiar los clientes cambiados cubre altas, modificaciones y bajas
+                resumen["cambios"] += conn.execute(
+                    'SELECT COUNT(*) FROM main.clientes_cambios WHERE Secuencia > ? AND Secuencia <= ?', (posicion, hasta)
+                ).fetchone()[0]
+                conn.execute(f'DELETE FROM replica.clientes WHERE ID IN ({_IDS_CAMBIADOS})', (posicion, hasta))
+                resumen["clientes"] += conn.execute(
+                    f'INSERT INTO replica.clientes ({_COLUMNAS}) SELECT {_COLUMNAS} FROM main.clientes '
+                    f'WHERE ID IN ({_IDS_CAMBIADOS})', (posicion, hasta)
+                ).rowcount
+                _guardar_posicion_replica(conn, hasta)
+                conn.execute("COMMIT")
+                posicion = hasta
+                guardar_posicion(consumidor, posicion)
+        resumen["hasta"] = posicion
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        print(Fore.RED + f"❌ Error al sincronizar la copia de respaldo: {e}" + Style.RESET_ALL)
+        return None
+    finally:
+        conn.close()
+
+    if compactar:
+        resumen["compactacion"] = compactar_cambios()
+    resumen["segundos"] = time.perf_counter() - inicio
+    return resumen
+
+def mostrar_resumen_sincronizacion(resumen):
+    """Imprime el resultado de una sincronización de la copia de respaldo."""
+    if resumen is None:
+        return
+    if resumen["modo"] == "completa":
+        print(Fore.GREEN + f"✔️  Copia completa: {resumen['clientes']:,} clientes en {resumen['replica']}" + Style.RESET_ALL)
+    elif resumen["cambios"]:
+        print(Fore.GREEN + f"✔️  Sincronización diferencial: {resumen['cambios']:,} cambios (secuencias "
+              f"{resumen['desde']} a {resumen['hasta']}), {resumen['clientes']:,} clientes copiados a {resumen['replica']}" + Style.RESET_ALL)
+    else:
+        print(Fore.GREEN + f"✔️  La copia {resumen['replica']} ya estaba al día (secuencia {resumen['hasta']})." + Style.RESET_ALL)
+    if resumen.get("compactacion") and resumen["compactacion"]["borrados"]:
+        print(f"Registro de cambios: {resumen['compactacion']['borrados']:,} borrados al compactar, "
+              f"{resumen['compactacion']['conservados']:,} conservados")
+    print(f"Tiempo: {resumen['segundos']:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sincroniza la copia de respaldo aplicando solo los cambios registrados.")
+    parser.add_argument("--replica", help="Archivo de la copia (por defecto, respaldo_clientes.db)")
+    parser.add_argument("--sin-compactar", action="store_true", help="No compactar el registro de cambios al terminar")
+    parser.add_argument("--estado", action="store_true", help="Mostrar el registro de cambios y los consumidores, sin sincronizar")
+    args = parser.parse_args()
+    base_de_datos.inicializar_db()
+    if args.estado:
+        estado = estado_cambios()
+        if estado:
+            print(f"Última secuencia: {estado['ultima_secuencia']}, cambios guardados: {estado['cambios']}")
+            for consumidor, secuencia, fecha in estado["consumidores"]:
+                print(f"   - {consumidor}: {secuencia if secuencia is not None else 'copia completa pendiente'} ({fecha})")
+    else:
+        mostrar_resumen_sincronizacion(sincronizar_replica(args.replica, compactar=not args.sin_compactar))
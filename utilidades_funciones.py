@@ -2,8 +2,11 @@
 
 from colorama import Fore, Style, init
 import re
-import os
 import datetime
+import multiprocessing
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import auditoria
 
 init(autoreset=True)
 
@@ -12,22 +15,159 @@ MAX_LEN_NOMBRE_APELLIDO = 50
 MAX_LEN_EMAIL = 255
 MAX_LEN_TELEFONO = 20
 MAX_LEN_FUERO_TIPO_CASO = 50 
+EDAD_MINIMA = 0
+EDAD_MAXIMA = 120
+
+PATRON_EMAIL = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$') # Compilado una sola vez (se usa en cada alta y en cada fila importada)
 
 # Funciones de Utilidad Generales
 
 def limpiar_pantalla():
-    """Limpia la pantalla de la consola."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """Limpia la pantalla de la consola con secuencias ANSI (sin lanzar un proceso 'clear'/'cls')."""
+    print("\033[2J\033[H", end="", flush=True) # colorama las traduce en Windows
 
 def validar_email(email):
     """Valida si el formato del email es correcto."""
-    patron = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return re.match(patron, email) is not None
+    return PATRON_EMAIL.match(email) is not None
 
 def validar_telefono(telefono):
     """Valida si la cadena del teléfono contiene solo dígitos."""
     return telefono.isdigit()
 
+def validar_solo_letras(valor):
+    """Valida que el texto tenga solo letras (se permiten espacios entre palabras)."""
+    return valor.replace(' ', '').isalpha()
+
+# Validación de registros completos (uno o muchos, sin interacción con el usuario)
+
+CAMPOS_CLIENTE = ("Nombre", "Apellido", "Edad", "Email", "Telefono", "Fuero", "Tipo_de_caso")
+TAMANO_BLOQUE_VALIDACION = 5000 # Registros por tarea al repartir la validación entre procesos
+
+# Error de un campo: codigo es 'falta', 'largo', 'formato', 'rango' o 'valor'
+ErrorCampo = namedtuple("ErrorCampo", ("campo", "codigo", "mensaje"))
+
+
+class ValidadorClientes:
+    """
+    Reglas de validación de un cliente (las mismas que aplican las funciones pedir_*), armadas una sola vez:
+    longitudes MAX_LEN_*, nombre y apellido solo con letras, formato de email y teléfono, rango de edad
+    y combinación válida de fuero y tipo de caso. Se puede enviar a otros procesos (pickle).
+    """
+
+    def __init__(self, tipos_por_fuero=None, min_edad=EDAD_MINIMA, max_edad=EDAD_MAXIMA):
+        if tipos_por_fuero is None:
+            from gestor_clientes import tipos_por_fuero # Import diferido: gestor_clientes usa este módulo
+        self.tipos_por_fuero = {fuero: frozenset(tipos) for fuero, tipos in tipos_por_fuero.items()}
+        self.min_edad = min_edad
+        self.max_edad = max_edad
+
+    def validar(self, registro):
+        """
+        Valida un registro (diccionario con las columnas de CAMPOS_CLIENTE) y retorna la lista de ErrorCampo,
+        vacía si es válido. Primero van los campos faltantes. Deja Edad como int y Telefono como str.
+        """
+        faltantes = [ErrorCampo(campo, "falta", f"Falta el campo {campo}") for campo in CAMPOS_CLIENTE if registro.get(campo) in (None, "")]
+        errores = []
+        presentes = set(CAMPOS_CLIENTE).difference(error.campo for error in faltantes)
+
+        for campo in ("Nombre", "Apellido"):
+            if campo in presentes:
+                valor = str(registro[campo])
+                if len(valor) > MAX_LEN_NOMBRE_APELLIDO:
+                    errores.append(ErrorCampo(campo, "largo", f"{campo} inválido: máximo {MAX_LEN_NOMBRE_APELLIDO} caracteres"))
+                elif not validar_solo_letras(valor):
+                    errores.append(ErrorCampo(campo, "formato", f"{campo} inválido: solo se permiten letras"))
+
+        if "Edad" in presentes:
+            try:
+                edad = int(registro["Edad"])
+            except (TypeError, ValueError):
+                errores.append(ErrorCampo("Edad", "formato", "Edad inválida"))
+            else:
+                if self.min_edad <= edad <= self.max_edad:
+                    registro["Edad"] = edad
+                else:
+                    errores.append(ErrorCampo("Edad", "rango", f"Edad fuera de rango ({self.min_edad} a {self.max_edad})"))
+
+        if "Email" in presentes:
+            email = str(registro["Email"])
+            if len(email) > MAX_LEN_EMAIL:
+                errores.append(ErrorCampo("Email", "largo", f"Email inválido: máximo {MAX_LEN_EMAIL} caracteres"))
+            elif not validar_email(email):
+                errores.append(ErrorCampo("Email", "formato", "Email inválido"))
+
+        if "Telefono" in presentes:
+            telefono = str(registro["Telefono"])
+            if len(telefono) > MAX_LEN_TELEFONO:
+                errores.append(ErrorCampo("Telefono", "largo", f"Teléfono inválido: máximo {MAX_LEN_TELEFONO} dígitos"))
+            elif not validar_telefono(telefono):
+                errores.append(ErrorCampo("Telefono", "formato", "Teléfono inválido: solo se permiten dígitos"))
+            else:
+                registro["Telefono"] = telefono
+
+        if "Fuero" in presentes:
+            tipos = self.tipos_por_fuero.get(registro["Fuero"])
+            if tipos is None:
+                errores.append(ErrorCampo("Fuero", "valor", "Fuero inválido"))
+            elif "Tipo_de_caso" in presentes and registro["Tipo_de_caso"] not in tipos:
+                errores.append(ErrorCampo("Tipo_de_caso", "valor", "Tipo de caso inválido para el fuero"))
+        return faltantes + errores
+
+
+_validador = None
+
+def validador_por_defecto():
+    """Validador con los fueros de gestor_clientes, creado una vez por proceso."""
+    global _validador
+    if _validador is None:
+        _validador = ValidadorClientes()
+    return _validador
+
+def validar_cliente(registro):
+    """Valida un registro con el validador por defecto. Retorna la lista de ErrorCampo (vacía si es válido)."""
+    return validador_por_defecto().validar(registro)
+
+def _validar_bloque(validador, pares):
+    """Tarea de un proceso: retorna [(clave, errores)] de los registros inválidos del bloque."""
+    resultado = []
+    for clave, registro in pares:
+        errores = validador.validar(registro)
+        if errores:
+            resultado.append((clave, errores))
+    return resultado
+
+def _bloques(pares, tamano):
+    bloque = []
+    for par in pares:
+        bloque.append(par)
+        if len(bloque) >= tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+def validar_clientes(pares, procesos=1, validador=None, tamano_bloque=TAMANO_BLOQUE_VALIDACION):
+    """
+    Valida muchos registros sin cargarlos todos en memoria. `pares` es un iterable de (clave, registro), donde
+    la clave identifica al registro en los resultados (por ejemplo, el número de línea del archivo).
+    Genera (clave, [ErrorCampo, ...]) solo para los registros inválidos, en el orden de entrada.
+    Con procesos > 1 reparte bloques de `tamano_bloque` registros entre procesos, con a lo sumo dos bloques
+    por proceso en vuelo (memoria acotada aunque la entrada tenga millones de filas). En ese caso Edad y
+    Telefono se normalizan en la copia del proceso hijo, no en los registros originales.
+    """
+    validador = validador or validador_por_defecto()
+    if procesos <= 1:
+        yield from _validar_bloque(validador, pares)
+        return
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn")) as pool:
+        en_vuelo = deque()
+        for bloque in _bloques(pares, tamano_bloque):
+            en_vuelo.append(pool.submit(_validar_bloque, validador, bloque))
+            if len(en_vuelo) >= procesos * 2:
+                yield from en_vuelo.popleft().result()
+        while en_vuelo:
+            yield from en_vuelo.popleft().result()
+
 # Funciones de Utilidad para la Gestión de Errores y Excepciones
 
 def pedir_entrada_no_vacia(mensaje, mensaje_error=" ❌ Este campo no puede estar vacío. Intente de nuevo.", solo_letras=False, max_len=255):
@@ -48,7 +188,7 @@ def pedir_entrada_no_vacia(mensaje, mensaje_error=" ❌ Este campo no puede esta
             print(Fore.RED + f"❌ Entrada demasiado larga. Máximo {max_len} caracteres." + Style.RESET_ALL)
             continue
 
-        if solo_letras and not valor.replace(' ', '').isalpha():
+        if solo_letras and not validar_solo_letras(valor):
             print(Fore.RED + "❌ Entrada inválida. Solo se permiten letras." + Style.RESET_ALL)
             continue
         return valor
@@ -95,7 +235,7 @@ def pedir_numero_entero(mensaje, mensaje_error="Entrada inválida. Por favor, in
         except ValueError:
             print(Fore.RED + mensaje_error + Style.RESET_ALL)
 
-def pedir_edad_valida(mensaje, min_edad=0, max_edad=120):
+def pedir_edad_valida(mensaje, min_edad=EDAD_MINIMA, max_edad=EDAD_MAXIMA):
     """
     Pide al usuario una edad y valida que sea un número entero dentro de un rango razonable.
     """
@@ -106,54 +246,90 @@ def pedir_edad_valida(mensaje, min_edad=0, max_edad=120):
         else:
             print(Fore.RED + f"❌ Edad inválida. Debe estar entre {min_edad} y {max_edad}." + Style.RESET_ALL)
 
-def registrar_opcion(opcion_texto, datos_adicionales=None, opciones_seleccionadas_list=None):
+def registrar_opcion(opcion_texto, datos_adicionales=None, cliente_id=None):
     """
-    Registra la opción del menú seleccionada por el usuario,
-    opcionalmente con datos adicionales y una marca de tiempo.
-    Requiere pasar la lista de opciones_seleccionadas explícitamente.
+    Registra la opción del menú seleccionada por el usuario, opcionalmente con datos adicionales
+    y el ID del cliente afectado. Se guarda en el historial persistente (ver auditoria.py).
     """
-    if opciones_seleccionadas_list is None:
-        print(Fore.RED + "Error: La lista de opciones_seleccionadas no fue proporcionada a registrar_opcion." + Style.RESET_ALL)
+    if hasattr(datos_adicionales, "a_dict"): # Registro Cliente: se guarda como diccionario
+        datos_adicionales = datos_adicionales.a_dict()
+    auditoria.registrar_accion(opcion_texto, datos_adicionales, cliente_id)
+
+def _mostrar_registro_historial(i, registro):
+    """Imprime una entrada del historial de acciones."""
+    accion = registro["accion"]
+    datos = registro.get("datos")
+    timestamp = registro.get("timestamp", "Fecha/Hora no disponible")
+
+    try:
+        dt_object = datetime.datetime.fromisoformat(timestamp)
+        timestamp_formateado = dt_object.strftime("%d-%m-%Y %H:%M:%S") #fecha formato usado por mi
+    except ValueError:
+        timestamp_formateado = timestamp
+
+    if accion == "Agregar cliente" and datos:
+        print(f"{i}. " + Fore.GREEN + f"{accion}:" + Style.RESET_ALL)
+        print(f"   - ID: {datos.get('ID', 'N/A')}")
+        print(f"   - Cliente: {datos.get('Nombre', '')} {datos.get('Apellido', '')}")
+        print(f"   - Edad: {datos.get('Edad', 'N/A')}") # Agregado al historial
+        print(f"   - Fuero: {datos.get('Fuero', '')}")
+        print(f"   - Tipo de caso: {datos.get('Tipo_de_caso', '')}")
+        print(f"   - Fecha: {timestamp_formateado}")
+    elif registro.get("cliente_id") is not None:
+        print(f"{i}. {accion} - Cliente ID {registro['cliente_id']} (Fecha: {timestamp_formateado})")
+    else:
+        print(f"{i}. {accion} (Fecha: {timestamp_formateado})")
+
+def consultar_historial_guardado(tamano_pagina=20):
+    """Consulta el historial persistente (todas las sesiones) filtrando por acción, cliente y/o rango de fechas."""
+    acciones = auditoria.acciones_registradas()
+    if not acciones:
+        print(Fore.YELLOW + "No hay acciones guardadas en el historial." + Style.RESET_ALL)
         return
+    print(Fore.CYAN + "\nAcciones registradas:" + Style.RESET_ALL)
+    for idx, (accion, cantidad) in enumerate(acciones, 1):
+        print(f"{idx}. {accion} ({cantidad})")
+    eleccion = input("Número de acción a filtrar (Enter para todas): ").strip()
+    accion = acciones[int(eleccion) - 1][0] if eleccion.isdigit() and 1 <= int(eleccion) <= len(acciones) else None
+    cliente = input("ID de cliente (Enter para todos): ").strip()
+    cliente_id = int(cliente) if cliente.isdigit() else None
+    desde = input("Desde (AAAA-MM-DD, Enter para omitir): ").strip() or None
+    hasta = input("Hasta (AAAA-MM-DD, Enter para omitir): ").strip() or None
+    for fecha in (desde, hasta):
+        if fecha:
+            try:
+                datetime.date.fromisoformat(fecha)
+            except ValueError:
+                print(Fore.RED + "❌ Fecha inválida. Use el formato AAAA-MM-DD." + Style.RESET_ALL)
+                return
 
-    timestamp = datetime.datetime.now().isoformat()
-    registro = {
-        "accion": opcion_texto,
-        "timestamp": timestamp
-    }
-    if datos_adicionales:
-        registro["datos"] = datos_adicionales
-    opciones_seleccionadas_list.append(registro)
+    antes_de, numero = None, 0
+    while True:
+        pagina = auditoria.consultar_historial(desde, hasta, accion, cliente_id, antes_de, tamano_pagina)
+        if not pagina:
+            if numero == 0:
+                print(Fore.YELLOW + "No hay acciones que coincidan con el filtro." + Style.RESET_ALL)
+            return
+        for registro in pagina:
+            numero += 1
+            _mostrar_registro_historial(numero, registro)
+        if len(pagina) < tamano_pagina or input("[M]ás resultados / Enter para terminar: ").strip().lower() != 'm':
+            return
+        antes_de = (pagina[-1]["timestamp"], pagina[-1]["id"])
 
-def mostrar_opciones_seleccionadas(opciones_seleccionadas_list):
+def mostrar_opciones_seleccionadas():
     """
-    Muestra el historial de las opciones del menú seleccionadas por el usuario,
-    incluyendo detalles adicionales y la marca de tiempo.
+    Muestra las últimas opciones del menú seleccionadas en esta sesión (buffer en memoria),
+    incluyendo detalles adicionales y la marca de tiempo, y permite consultar el historial guardado.
     """
-    if not opciones_seleccionadas_list:
+    recientes = auditoria.acciones_recientes()
+    if not recientes:
         print(Fore.YELLOW + "\n ❌ No se ha seleccionado ninguna opción todavía en esta sesión." + Style.RESET_ALL)
     else:
         print(Fore.MAGENTA + "\n--- Historial Opciones Seleccionadas📝 ---" + Style.RESET_ALL)
-        for i, registro in enumerate(opciones_seleccionadas_list, 1):
-            accion = registro["accion"]
-            datos = registro.get("datos")
-            timestamp = registro.get("timestamp", "Fecha/Hora no disponible")
-
-            try:
-                dt_object = datetime.datetime.fromisoformat(timestamp)
-                timestamp_formateado = dt_object.strftime("%d-%m-%Y %H:%M:%S") #fecha formato usado por mi
-            except ValueError:
-                timestamp_formateado = timestamp
-
-            if accion == "Agregar cliente" and datos:
-                print(f"{i}. " + Fore.GREEN + f"{accion}:" + Style.RESET_ALL)
-                print(f"   - ID: {datos.get('ID', 'N/A')}")
-                print(f"   - Cliente: {datos.get('Nombre', '')} {datos.get('Apellido', '')}")
-                print(f"   - Edad: {datos.get('Edad', 'N/A')}") # Agregado al historial
-                print(f"   - Fuero: {datos.get('Fuero', '')}")
-                print(f"   - Tipo de caso: {datos.get('Tipo de caso', '')}")
-                print(f"   - Fecha: {timestamp_formateado}")
-            else:
-                print(f"{i}. {accion} (Fecha: {timestamp_formateado})")
+        for i, registro in enumerate(recientes, 1):
+            _mostrar_registro_historial(i, registro)
         print(Fore.MAGENTA + "------------------------------------------" + Style.RESET_ALL)
+    if input("¿Desea consultar el historial guardado (todas las sesiones)? (s/n): ").strip().lower() == 's':
+        consultar_historial_guardado()
     input("Presione Enter para continuar...")
\ No newline at end of file